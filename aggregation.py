@@ -0,0 +1,131 @@
+"""국가/지역/분류/월별 기사 수 집계 (개요 지도와 통계용).
+
+기사 표(article_table.compact_articles 형식)를 세 개의 작은 개수 표로 줄여 둔다.
+    articles : (대분류, 월) -> 기사 수
+    countries: (국가, 대분류, 월) -> 기사 수 (한 기사가 같은 국가를 여러 번 언급해도 1)
+    locations: (지역, 대분류, 월) -> 기사 수 (한 기사의 같은 지역은 1)
+모든 값이 기사 단위 개수라 더하고 뺄 수 있으므로, 기사가 추가/변경/삭제되면 updated()로
+바뀐 기사 몫만 빼고 더한 새 집계를 만든다(기존 집계는 그대로). 개요 지도는 기사/마커 수가 아니라
+고유 지역/국가 수만큼의 개수로 그리므로(map_render.build_overview_map) 기사가 늘어도 브라우저로 보내는 양이 늘지 않는다.
+
+집계 확인: python aggregation.py sampledata
+"""
+import pandas as pd
+
+from article_table import explode_locations
+from date_index import article_dates
+from geocoding import country_of
+
+CATEGORY_COLUMN = '대분류'
+UNKNOWN = "정보 없음"
+LEVELS = {'articles': ['category', 'month'], 'countries': ['country', 'category', 'month'], 'locations': ['location', 'category', 'month']}
+
+
+def article_months(df):
+    """기사별 'YYYY-MM' (보도 일자는 date_index.article_dates 기준, 알 수 없으면 '정보 없음')"""
+    return article_dates(df).dt.strftime('%Y-%m').fillna(UNKNOWN)
+
+
+def count_articles(df):
+    """기사 표 하나의 {'articles', 'countries', 'locations'} 개수 표 (각각 MultiIndex Series)"""
+    keys = pd.DataFrame({'category': df[CATEGORY_COLUMN].astype(str) if CATEGORY_COLUMN in df.columns else UNKNOWN,
+                         'month': article_months(df)}, index=df.index)
+    pairs = explode_locations(df)[['article', 'location']].drop_duplicates()
+    pairs = pairs.assign(country=pairs['location'].map(country_of)).join(keys, on='article')
+    return {
+        'articles': keys.groupby(LEVELS['articles']).size(),
+        'countries': pairs.drop_duplicates(['article', 'country']).groupby(LEVELS['countries']).size(),
+        'locations': pairs.groupby(LEVELS['locations']).size(),
+    }
+
+
+def country_coords_with_fallback(location_coords, country_coords):
+    """{국가명: 좌표}. country_coords에 없는 국가는 그 국가 지역들({지역명: 좌표})의 평균 좌표를 사용"""
+    by_country = {}
+    for loc, (lat, lon) in location_coords.items(): by_country.setdefault(country_of(loc), []).append((lat, lon))
+    coords = dict(country_coords)
+    for country, points in by_country.items():
+        coords.setdefault(country, (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points)))
+    return coords
+
+
+def _select(counts, categories=None, months=None):
+    """분류 목록 / (시작 월, 끝 월)로 개수 표의 행을 고름 (None이면 전체)"""
+    if categories is not None:
+        counts = counts[counts.index.get_level_values('category').isin(list(categories))]
+    if months is not None:
+        month = counts.index.get_level_values('month')
+        counts = counts[(month != UNKNOWN) & (month >= months[0]) & (month <= months[1])]
+    return counts
+
+
+class ArticleAggregates:
+    """기사 수 집계. 만든 뒤에는 바꾸지 않고, updated()가 새 집계를 돌려준다."""
+
+    def __init__(self, df=None, tables=None):
+        self.tables = tables if tables is not None else count_articles(df)
+
+    def updated(self, removed=None, added=None):
+        """removed(빠질 기사 행들)의 몫을 빼고 added(새 기사 행들)의 몫을 더한 새 집계"""
+        tables = dict(self.tables)
+        for rows, sign in ((removed, -1), (added, 1)):
+            if rows is None or rows.empty: continue
+            for name, counts in count_articles(rows).items():
+                merged = tables[name].add(sign * counts, fill_value=0)
+                tables[name] = merged[merged > 0].astype('int64')
+        return ArticleAggregates(tables=tables)
+
+    def total(self, categories=None, months=None):
+        return int(_select(self.tables['articles'], categories, months).sum())
+
+    def by(self, table, level, categories=None, months=None):
+        """table('articles'/'countries'/'locations')을 level별로 합친 기사 수 (많은 순)"""
+        counts = _select(self.tables[table], categories, months)
+        return counts.groupby(level=level).sum().sort_values(ascending=False, kind='stable')
+
+    def by_country(self, categories=None, months=None):
+        return self.by('countries', 'country', categories, months)
+
+    def by_location(self, categories=None, months=None):
+        return self.by('locations', 'location', categories, months)
+
+    def by_category(self, months=None):
+        return self.by('articles', 'category', months=months)
+
+    def by_month(self, categories=None):
+        counts = _select(self.tables['articles'], categories)
+        return counts.groupby(level='month').sum().sort_index()
+
+    def categories(self):
+        return sorted(self.tables['articles'].index.get_level_values('category').unique())
+
+    def months(self):
+        return sorted(m for m in self.tables['articles'].index.get_level_values('month').unique() if m != UNKNOWN)
+
+
+def main():
+    import argparse
+
+    from article_store import DEFAULT_INDEX_PATH, ArticleStore
+    from article_table import compact_articles
+
+    parser = argparse.ArgumentParser(description="기사 인덱스를 국가/분류/월별로 집계해 출력합니다.")
+    parser.add_argument("folder", nargs="?", default="sampledata", help="PDF 폴더 (기본값: sampledata)")
+    parser.add_argument("--db", default=str(DEFAULT_INDEX_PATH), help=f"기사 인덱스 경로 (기본값: {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--top", type=int, default=10, help="상위 몇 개를 보여줄지 (기본값: 10)")
+    args = parser.parse_args()
+
+    df = compact_articles(ArticleStore(args.db).load_dataframe(args.folder))
+    aggregates = ArticleAggregates(df)
+    print(f"기사 {aggregates.total()}개, 집계 행 " + ", ".join(f"{name} {len(counts)}" for name, counts in aggregates.tables.items()))
+    for title, counts in (("국가", aggregates.by_country()), ("지역", aggregates.by_location()), ("대분류", aggregates.by_category())):
+        print(f"\n[{title}별 기사 수]")
+        for name, count in counts.head(args.top).items(): print(f"  {name}: {count}")
+    print("\n[연도별 기사 수]")
+    by_month = aggregates.by_month()
+    by_month = by_month[by_month.index != UNKNOWN]
+    for year, count in by_month.groupby(by_month.index.str.slice(0, 4)).sum().items(): print(f"  {year}: {count}")
+
+
+if __name__ == "__main__":
+    main()
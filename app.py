@@ -1,25 +1,25 @@
 import streamlit as st
 import pandas as pd
-import folium
 from streamlit_folium import st_folium
-from geopy.geocoders import Nominatim
-# (★★★ 수정됨 ★★★) RateLimiter를 직접 임포트하지 않고 geocode 함수를 감싸는 방식으로 변경
-from geopy.extra.rate_limiter import RateLimiter as GeopyRateLimiter  # 예전 방식을 시도해보고
-
-try:
-    from geopy.adapters import RateLimiter  # 최신 방식을 시도
-except ImportError:
-    RateLimiter = GeopyRateLimiter  # 예전 방식 사용 (하위 호환성)
-
 import openai
 from openai import OpenAI
-import fitz  # PyMuPDF
 import os
-import re
-from pathlib import Path
-import requests
-import json
 import time
+from pathlib import Path
+
+from article_store import ArticleStore
+from aggregation import country_coords_with_fallback
+from article_table import REQUIRED_COLUMNS, column_values, has_column, has_locations, prepare_articles, searchable_articles, unique_locations
+from data_watcher import ArticleSnapshot, BackgroundGeocoder, LiveArticles
+from date_index import WINDOW_LABELS, time_windows
+from geo_resolver import AsyncResolver
+from geocoding import METHOD_LABELS, Gazetteer, make_nominatim_provider, make_openai_provider
+from map_render import MAP_MODE_LABELS, OVERVIEW_LAYER_LABELS, build_map, build_map_data, build_overview_map, records_at
+from metrics import DEFAULT_METRICS_PATH, REGISTRY, timer
+from pdf_parser import extract_pdf_text
+from query_cache import QueryResultCache, estimate_result_bytes, normalize_query
+from similar_articles import LANGUAGE_LABELS, SimilarArticleFinder
+from spatial_index import SpatialIndex
 
 # --- 1. 초기 설정 (Serper 키 추가) ---
 
@@ -39,13 +39,17 @@ except:
     # 📌 여기에 실제 Serper 키를 입력하세요 (배포 시에는 secrets 사용)
     serper_api_key = "YOUR SERPER API KEY" # 실제 키로 교체 필요
 
-# OpenAI 클라이언트 설정
+# (★★★ 수정됨 ★★★) OpenAI 클라이언트 설정: 재실행마다 새로 만들지 않고 연결 풀을 재사용
+@st.cache_resource
+def get_openai_client(api_key):
+    return OpenAI(api_key=api_key)
+
 if openai_api_key == "YOUR_OPENAI_API_KEY" or not openai_api_key:
     st.warning("OpenAI API 키가 설정되지 않았습니다. '더 알아보기' 및 '좌표 검색' 기능이 작동하지 않습니다.")
     client = None
 else:
     try:
-        client = OpenAI(api_key=openai_api_key)
+        client = get_openai_client(openai_api_key)
     except Exception as e:
         st.error(f"OpenAI 클라이언트 초기화 실패: {e}")
         client = None
@@ -54,350 +58,364 @@ else:
 if serper_api_key == "YOUR_SERPER_API_KEY" or not serper_api_key:
     st.warning("Serper (Google 검색) API 키가 설정되지 않았습니다. '더 알아보기' 기능이 작동하지 않습니다.")
 
-# --- 2. 수동 위치 캐시 (이전과 동일) ---
-MANUAL_LOCATION_CACHE = {
-    "페루, 리마, Plaza San Martín": (-12.0505, -77.0339),
-    "페루, 리마": (-12.0464, -77.0428),
-    "페루, 리마, Comas": (-11.9333, -77.0500),
-    "페루, 리마 & Callao": (-12.0464, -77.0428),
-    "볼리비아, 라파스": (-16.4897, -68.1193),
-    "미국, 콜로라도, Aurora": (39.7294, -104.8319),
-    "아르헨티나": (-38.4161, -63.6167),
-    "벨리즈": (17.1899, -88.4976),
-    "볼리비아": (-16.2902, -63.5887),
-    "브라질": (-14.2350, -51.9253),
-    "칠레": (-35.6751, -71.5430),
-    "콜롬비아": (4.5709, -74.2973),
-    "코스타리카": (9.7489, -83.7534),
-    "쿠바": (21.5218, -77.7812),
-    "도미니카 공화국": (18.7357, -70.1627),
-    "에콰도르": (-1.8312, -78.1834),
-    "엘살바도르": (13.7942, -88.8965),
-    "과테말라": (15.7835, -90.2308),
-    "온두라스": (15.2000, -86.2419),
-    "멕시코": (23.6345, -102.5528),
-    "니카라과": (12.8654, -85.2072),
-    "파나마": (8.5380, -80.7821),
-    "파라과이": (-23.4425, -58.4438),
-    "페루": (-9.1900, -75.0152),
-    "우루과이": (-32.5228, -55.7658),
-    "베네수엘라": (6.4238, -66.5897),
-    "아이티": (18.9712, -72.2852),
-    "자메이카": (18.1096, -77.2975),
-    "푸에르토리코": (18.2208, -66.5901),
-    "트리니다드 토바고": (10.6918, -61.2225),
-    "가이아나": (4.8604, -58.9302),
-    "수리남": (3.9193, -56.0278),
-    "프랑스령 기아나": (3.9339, -53.1258),
-}
-
-
-# --- 3. (★★★ 수정됨 ★★★) PDF 파싱 및 데이터 로딩 함수 ---
-def parse_pdf_text(text):
-    data = {}
-
-    def extract_field(field_name_variations, text_block):
-        """(수정) 필드 이름(키)에 줄바꿈이 있는 경우도 처리"""
-        for field_name in field_name_variations:
-            # 1. 쉼표/따옴표 기반 패턴
-            pattern_csv = rf'"[^"]*"\s*,\s*"{re.escape(field_name)}"\s*,\s*"([^"]*)"'
-            match_csv = re.search(pattern_csv, text_block)
-            if match_csv: return match_csv.group(1).strip().strip('""')
-            # 2. 줄바꿈 기반 패턴 (키 이름 자체의 줄바꿈 처리)
-            newline_safe_field_name = re.escape(field_name).replace(r'\\\n', r'\s*\\n\s*')
-            pattern_newline = rf'\n\d{{1,2}}\n{newline_safe_field_name}\n(.*?)(?=\n\d{{1,2}}\n|\n--- PAGE|\Z)'
-            match_newline = re.search(pattern_newline, text_block, re.DOTALL)
-            if match_newline:
-                value = re.sub(r'\s*\n\s*', ' ', match_newline.group(1)).strip()
-                return value
-        return "정보 없음"
-
-    data['대분류'] = extract_field(["갈등 대분류"], text)
-    data['중분류'] = extract_field(["갈등 중분류"], text)
-    data['소분류'] = extract_field(["갈등 소분류"], text)
-
-    # (★★★ 수정됨 ★★★) 위치 정보 처리: 슬래시(/)로 분리하여 리스트로 저장
-    location_str = extract_field(["위치"], text)
-    if location_str != "정보 없음" and "/" in location_str:
-        data['지역정보'] = [loc.strip() for loc in location_str.split('/') if loc.strip()]
-    elif location_str != "정보 없음":
-        data['지역정보'] = [location_str.strip()] # 단일 위치도 리스트로 저장
-    else:
-        data['지역정보'] = [] # 정보 없으면 빈 리스트
-
-    data['기사제목'] = extract_field(["제목"], text)
-    data['이벤트'] = extract_field(["보도 일자"], text)
-    data['original_title'] = extract_field(["원문 기사 제목", "원문 기사 제 목", "원문 기사 제\n목"], text)
-
-    url = "링크 없음"; found_url = False
-    for field_name in ["출처(URL)"]:
-        url_key_match_csv = re.search(rf'"{re.escape(field_name)}"', text)
-        if url_key_match_csv:
-            text_after_key = text[url_key_match_csv.end():]; url_match = re.search(r'(https?://[^\s)]+)', text_after_key)
-            if url_match: url = url_match.group(1).strip().strip(')"'); found_url = True; break
-    if not found_url:
-        for field_name in ["출처(URL)"]:
-            newline_safe_field_name = re.escape(field_name).replace(r'\\\n', r'\s*\\n\s*');
-            pattern_newline_url = rf'\n12\n{newline_safe_field_name}\n[^\n]*\n\((https?://[^\)]+)\)';
-            match_newline_url = re.search(pattern_newline_url, text, re.DOTALL)
-            if match_newline_url: url = match_newline_url.group(1).strip(); found_url = True; break
-    data['기사링크'] = url
-
-    summary = "요약 정보 없음"; summary_key_variations = [r'기사 텍스트\s*\(\s*600자\s*이내\s*축약\s*\)', r'기사\s*텍스트\s*\(600자\s*이내\s*\n\s*축약\)', r'"관련 이벤트"']; summary_key_pattern = f'({"|".join(summary_key_variations)})'; summary_key_match = re.search(summary_key_pattern, text, re.DOTALL | re.IGNORECASE)
-    if summary_key_match:
-        text_after_key = text[summary_key_match.end():]
-        summary_content_match = re.search(r'^\s*(.*?[\uAC00-\uD7A3]\s*다\.)\s*(?=\n[A-ZÀ-ÿa-z]|\n--- PAGE|\Z)', text_after_key, re.DOTALL | re.MULTILINE)
-        if summary_content_match:
-            summary_raw = summary_content_match.group(1).strip(); summary = re.sub(r'^,,', '', summary_raw.strip(), flags=re.MULTILINE); summary = re.sub(r'\s*\n\s*', ' ', summary); summary = summary.strip().strip('"')
-        elif '"관련 이벤트"' in summary_key_match.group(1):
-            summary_match_arg = re.search(r'^\s*,\s*,(.*?)(?=\n"\d{1,2}"\s*,|\n,,"기사 텍스트")', text_after_key, re.DOTALL)
-            if summary_match_arg:
-                summary_raw = summary_match_arg.group(1); summary_test = re.sub(r'^\s*,,', '', summary_raw, flags=re.MULTILINE).strip().strip('"'); summary_test = re.sub(r'\s*\n\s*', ' ', summary_test)
-                if summary_test.endswith('다.'): summary = summary_test
-    data['요약'] = summary; data['번역'] = summary
-    for key, value in data.items():
-        # 지역정보는 리스트이므로 is False 대신 not value 사용
-        if key != '지역정보' and not value: data[key] = "정보 없음"
-        elif key == '지역정보' and not value: data[key] = [] # 빈 리스트 유지
-    return data
-
-
-@st.cache_data
+
+# (★★★ 수정됨 ★★★) 처리 단계/외부 호출/캐시 지표 (metrics.py)
+# 프로세스당 한 번 지표 파일(.cache/metrics.prom) 기록 스레드를 시작하고, 주소 뒤에 ?admin=1을 붙이면 사이드바에 표로 보여줌
+@st.cache_resource
+def start_metrics_writer():
+    return REGISTRY.start_textfile_writer(DEFAULT_METRICS_PATH)
+
+
+def show_metrics_panel():
+    """관리자 패널: 단계/외부 호출별 소요 시간, 캐시 적중률, 좌표 변환 방법별 수 (이 프로세스 시작 이후 누적)"""
+    with st.sidebar:
+        st.header("📈 처리 지표")
+        st.caption(f"프로세스 시작 이후 누적, 지표 파일: `{DEFAULT_METRICS_PATH}`")
+        for title, name in (("처리 단계별 소요 시간 (초)", 'stage'), ("외부 API 호출 (초)", 'external_call')):
+            st.subheader(title)
+            rows = REGISTRY.histogram_rows(name)
+            if rows: st.dataframe(pd.DataFrame(rows), hide_index=True)
+            else: st.caption("기록 없음")
+        st.subheader("캐시 적중률")
+        caches = {}
+        for labels, value in REGISTRY.counter_values('cache_requests').items():
+            labels = dict(labels)
+            caches.setdefault(labels['cache'], {'hit': 0, 'miss': 0})[labels['result']] += value
+        if caches:
+            st.dataframe(pd.DataFrame([{'cache': name, **counts, 'hit_rate': counts['hit'] / (counts['hit'] + counts['miss'])}
+                                       for name, counts in sorted(caches.items())]), hide_index=True)
+        else: st.caption("기록 없음")
+        geocoded = {dict(labels)['method']: value for labels, value in REGISTRY.counter_values('geocode_results').items()}
+        if geocoded:
+            st.subheader("새로 변환한 장소")
+            st.dataframe(pd.DataFrame([{'방법': METHOD_LABELS.get(method, method), '장소 수': value} for method, value in sorted(geocoded.items())]), hide_index=True)
+
+
+start_metrics_writer()
+if st.query_params.get("admin") == "1": show_metrics_panel()
+
+# --- 2. (★★★ 수정됨 ★★★) 데이터 로딩 (PDF 파싱은 pdf_parser.py, 디스크 인덱스는 article_store.py, 폴더 감시는 data_watcher.py) ---
+# 기사 표와 검색 색인은 모든 세션이 공유하며, 폴더에 PDF가 추가/변경/삭제되면 해당 파일만 다시 파싱해 반영
+# 필수 컬럼 기본값 채우기(prepare_articles)와 검색 대상 필터(searchable_articles)는 내보내기(export.py)와 공유 (article_table.py)
+DATA_POLL_SECONDS = 5
+DEBUG_TEXT_CHARS = 2000 # 파싱 실패 시 보여줄 첫 PDF 원본 텍스트 길이
+
+
+@st.cache_resource
+def get_live_articles(folder_path, _on_new_locations=None):
+    """첫 실행에서 디스크 인덱스를 동기화(추가/변경된 PDF만 파싱)하고 폴더 감시 스레드를 시작"""
+    progress_bar = st.progress(0, text="PDF 인덱스 확인 중...")
+    live = LiveArticles(
+        folder_path, ArticleStore(), prepare=prepare_articles, searchable=searchable_articles,
+        on_new_locations=_on_new_locations,
+        on_progress=lambda done, total, name: progress_bar.progress(done / total, text=f"PDF 파일 로딩 중: {name}"),
+        on_error=lambda name, e: st.warning(f"'{name}' 파일 처리 중 오류 발생: {e}"),
+    )
+    progress_bar.empty()
+    live.start_watching(DATA_POLL_SECONDS)
+    return live
+
+
+@st.cache_data(max_entries=4)
+def has_valid_columns(_df, data_version):
+    """데이터 버전별로 한 번만 검사: 필수 컬럼 중 유효한 값이 하나도 없는 컬럼이 있으면 False"""
+    for col in REQUIRED_COLUMNS:
+        if col != '지역정보' and ((column_values(_df, col) == "정보 없음").all() or column_values(_df, col).isnull().all()): return False
+        # 지역정보가 모든 행에서 비어 있는 경우도 실패로 간주
+        elif col == '지역정보' and not has_locations(_df).any(): return False
+    return True
+
+
 def load_data_from_pdfs(folder_path="sampledata"):
-    all_articles = []; data_folder = Path(folder_path); first_pdf_text = None
-    if not data_folder.exists() or not data_folder.is_dir(): st.error(f"'{folder_path}' 폴더를 찾을 수 없습니다."); return pd.DataFrame(), None
-    pdf_files = list(data_folder.glob("*.pdf"))
-    if not pdf_files: st.error(f"'{folder_path}' 폴더에 PDF 파일이 없습니다."); return pd.DataFrame(), None
-    progress_bar = st.progress(0, text="PDF 파일 로딩 중...")
-    for i, pdf_path in enumerate(pdf_files):
-        try:
-            doc = fitz.open(pdf_path); full_text = "".join(page.get_text("text", sort=False) for page in doc); doc.close()
-            if i == 0: first_pdf_text = full_text
-            article_data = parse_pdf_text(full_text); article_data['filename'] = pdf_path.name; all_articles.append(article_data)
-            progress_bar.progress((i + 1) / len(pdf_files), text=f"PDF 파일 로딩 중: {pdf_path.name}")
-        except Exception as e: st.warning(f"'{pdf_path.name}' 파일 처리 중 오류 발생: {e}")
+    """(ArticleSnapshot(기사 표, 검색 색인, 기사 수 집계, 보도 일자 색인), 디버깅 텍스트). 디버깅 텍스트는 파싱이 실패했을 때만 채워짐"""
+    empty = ArticleSnapshot(pd.DataFrame(), None, None, None)
+    data_folder = Path(folder_path)
+    if not data_folder.exists() or not data_folder.is_dir(): st.error(f"'{folder_path}' 폴더를 찾을 수 없습니다."); return empty, None
+    pdf_files = sorted(data_folder.glob("*.pdf"))
+    if not pdf_files: st.error(f"'{folder_path}' 폴더에 PDF 파일이 없습니다."); return empty, None
+
+    def first_pdf_text():
+        # 디버깅용 원본 텍스트는 파싱 실패 시에만 추출
+        try: return extract_pdf_text(pdf_files[0], max_chars=DEBUG_TEXT_CHARS) # 화면에 보여줄 만큼만 페이지를 읽음
+        except Exception as e: return f"'{pdf_files[0].name}' 텍스트 추출 실패: {e}"
+
+    with timer('stage', stage='load_data'):
+        snapshot = get_live_articles(folder_path, _on_new_locations=geocode_queue.submit).snapshot()
+    if snapshot.df.empty or not has_valid_columns(snapshot.df, snapshot.df.attrs.get('data_version')): return snapshot, first_pdf_text()
+    return snapshot, None
+
+
+# --- 3. (★★★ 수정됨 ★★★) 지오코딩 로직: 영구 좌표 저장소(geocoding.py) 사용 ---
+# 한 번 변환한 장소는 .cache/geocode.sqlite에 남으므로 새 프로세스도 네트워크를 다시 타지 않음
+# (python geocoding.py sampledata 로 모든 지역정보를 미리 변환 가능)
+gazetteer = Gazetteer()
+# (★★★ 수정됨 ★★★) 미변환 장소는 asyncio로 동시에 변환 (geo_resolver.py)
+# 호출 간격은 제공자별 토큰 버킷이 관리하므로 제공자 자체의 지연은 0으로 둠
+geo_resolver = AsyncResolver(
+    gazetteer,
+    nominatim=make_nominatim_provider(user_agent="Mozilla/5.0", min_delay_seconds=0),
+    openai=make_openai_provider(client, delay_seconds=0) if client else None,
+)
+
+
+# (★★★ 수정됨 ★★★) 폴더 감시로 새로 들어온 기사의 지역명은 백그라운드에서 미리 변환 (data_watcher.py)
+@st.cache_resource
+def get_geocode_queue(_resolver):
+    return BackgroundGeocoder(_resolver)
+
+
+geocode_queue = get_geocode_queue(geo_resolver)
+
+
+# (★★★ 수정됨 ★★★) 검색어별 결과 캐시 (query_cache.py): 모든 세션이 공유하며 LRU + 메모리 한도로 정리
+@st.cache_resource
+def get_query_cache():
+    return QueryResultCache()
+
+
+def search_and_build_map(df, search_index, keyword, map_mode):
+    """검색 → 좌표 변환 → 마커 표/지도 생성.
+
+    반환: {'filtered_df', 'map_data', 'map', 'map_mode', 'geocode_log'} (지도에 표시할 위치가 없으면 map은 None)
+    """
+    # 미리 만든 역색인으로 검색 (분류/제목/원문 제목/지역정보/요약, 점수순 정렬)
+    with timer('stage', stage='search'):
+        filtered_df = df.loc[search_index.search(keyword)].copy()
+    result = {'filtered_df': filtered_df, 'map_data': build_map_data(filtered_df, {}), 'map': None, 'map_mode': map_mode, 'geocode_log': []}
+    if filtered_df.empty: return result
+
+    st.info("검색된 지역의 좌표를 변환 중입니다...")
+    log_messages = result['geocode_log']; location_cache = {}
+
+    # 고유 위치 목록 생성: 압축 형식의 지역 번호 배열에서 바로 중복 제거 (article_table.py)
+    locations = unique_locations(filtered_df)
+    total_locations = len(locations)
+    pending_locations = set(gazetteer.pending(locations)) # 저장소에 없어 네트워크 조회가 필요한 장소
+
+    progress_bar = st.progress(0, text=f"좌표 변환 시작... (새로 조회할 장소 {len(pending_locations)}개)")
+    def on_geocoded(location_str, lat, lon, method):
+        location_cache[location_str] = (lat, lon) # 결과를 캐시에 저장
+        progress_text = f"변환 중 ({len(location_cache)}/{total_locations}): {location_str}"
+        progress_text += " (Geopy/OpenAI 조회)" if location_str in pending_locations else " (저장된 좌표 사용)"
+        progress_bar.progress(len(location_cache) / total_locations, text=progress_text)
+        method_used = METHOD_LABELS[method]
+        if lat is not None: log_messages.append(f"✅ **[성공]** `{location_str}` -> `({lat:.4f}, {lon:.4f})` (방법: {method_used})")
+        else: log_messages.append(f"❌ **[실패]** `{location_str}` -> 모든 방법(수동, Geopy, OpenAI, 국가명) 실패")
+    with timer('stage', stage='geocode'):
+        geo_resolver.resolve(locations, on_result=on_geocoded)
     progress_bar.empty()
-    if not all_articles: return pd.DataFrame(), first_pdf_text
-    df = pd.DataFrame(all_articles);
-    # 지역정보는 리스트이므로 검사 방식 변경
-    required_cols = ['대분류', '중분류', '소분류', '지역정보', '기사제목', 'original_title', '이벤트', '번역', '요약']; all_cols_valid = True
-    for col in required_cols:
-        if col not in df.columns: df[col] = [] if col == '지역정보' else "정보 없음"; all_cols_valid = False
-        elif col != '지역정보' and ((df[col] == "정보 없음").all() or df[col].isnull().all()): all_cols_valid = False
-        # 지역정보 컬럼이 존재하지만 모든 행이 빈 리스트인 경우도 실패로 간주
-        elif col == '지역정보' and all(not x for x in df[col]): all_cols_valid = False
-
-    if not all_cols_valid: return df, first_pdf_text
-    return df, None
-
-
-# --- 4. 지오코딩 로직 (이전과 동일) ---
-geolocator = Nominatim(user_agent="Mozilla/5.0")
-# RateLimiter가 import되지 않았으면 수동 지연 사용
-geocode_nominatim = RateLimiter(geolocator.geocode, min_delay_seconds=1.1) if RateLimiter else geolocator.geocode
-
-def get_coords_via_openai(location_str):
-    if not client: print("OpenAI client not initialized."); return None, None
-    prompt = f"다음 장소의 위도(latitude)와 경도(longitude)를 'latitude, longitude' 형식으로 소수점 4자리까지 알려주세요. 모르면 'None, None'이라고 답해주세요.\n장소: \"{location_str}\"\n좌표:"
-    try:
-        response = client.chat.completions.create(model="gpt-4o", messages=[{"role": "system", "content": "You provide geographical coordinates."}, {"role": "user", "content": prompt}], max_tokens=20, temperature=0.0)
-        time.sleep(1.1) # OpenAI 호출 후에도 약간의 지연 추가 (API 호출 제한 방지)
-        result_text = response.choices[0].message.content.strip()
-        coords = result_text.split(',')
-        if len(coords) == 2:
-            lat_str, lon_str = coords[0].strip(), coords[1].strip()
-            try:
-                if lat_str.lower() != 'none' and lon_str.lower() != 'none':
-                    lat, lon = float(lat_str), float(lon_str); print(f"OpenAI Geocoding SUCCESS for '{location_str}': ({lat}, {lon})"); return lat, lon
-                else: print(f"OpenAI Geocoding: Could not find coordinates for '{location_str}'"); return None, None
-            except ValueError: print(f"OpenAI Geocoding: Could not parse coordinates from '{result_text}' for '{location_str}'"); return None, None
-        else: print(f"OpenAI Geocoding: Unexpected response format for '{location_str}': {result_text}"); return None, None
-    except Exception as e: print(f"OpenAI Geocoding Error for '{location_str}': {e}"); return None, None
-
-@st.cache_data
-def get_lat_lon(location_str):
-    if location_str == "정보 없음" or not location_str: return None, None
-    if location_str in MANUAL_LOCATION_CACHE: return MANUAL_LOCATION_CACHE[location_str]
-
-    clean_str = re.sub(r'\s*&.*', '', location_str).strip()
-    lat_openai, lon_openai = None, None # OpenAI 결과를 저장할 변수
 
-    try:
-        # RateLimiter 적용 (import 성공 시) 또는 직접 호출 (실패 시)
-        location = geocode_nominatim(clean_str, timeout=10)
-        if not RateLimiter: # RateLimiter 없으면 수동 지연
-            time.sleep(1.1)
-        if location:
-            print(f"Geopy SUCCESS for '{location_str}': ({location.latitude}, {location.longitude})"); return location.latitude, location.longitude
-        else:
-            print(f"Geopy: Location not found for '{location_str}'")
-            lat_openai, lon_openai = get_coords_via_openai(location_str)
-            if lat_openai is not None: return lat_openai, lon_openai
+    # 지역정보를 펼쳐 좌표표와 붙인 마커 표 (map_render.build_map_data)
+    with timer('stage', stage='map_build'):
+        result['map_data'] = build_map_data(filtered_df, location_cache)
+        if not result['map_data'].empty:
+            result['map'], result['map_mode'] = build_map(result['map_data'], filtered_df, mode=map_mode)
+    return result
+
+
+# (★★★ 수정됨 ★★★) 보도 일자 구간별 결과 (date_index.py): 타임라인 재생 중에도 구간마다 한 번만 만듦
+TIMELINE_STEP_SECONDS = 1.5 # 타임라인 재생 시 구간 하나를 보여주는 시간
+
+
+def filter_result_by_date(result, date_index, start, end, map_mode):
+    """검색 결과를 보도 일자 [start, end]로 거른 결과. 좌표는 이미 변환된 마커 표에서 고르므로 네트워크 조회 없음"""
+    labels = date_index.filter(result['filtered_df'].index.tolist(), start, end)
+    filtered_df = result['filtered_df'].loc[labels]
+    map_data = result['map_data'][result['map_data']['article'].isin(labels)]
+    view = {'filtered_df': filtered_df, 'map_data': map_data, 'map': None, 'map_mode': map_mode, 'geocode_log': result['geocode_log']}
+    if not map_data.empty:
+        with timer('stage', stage='map_build'):
+            view['map'], view['map_mode'] = build_map(map_data, filtered_df, mode=map_mode)
+    return view
+
+
+# (★★★ 수정됨 ★★★) 지도 영역 검색용 공간 색인 (spatial_index.py)
+# 데이터 버전이나 변환된 좌표 수가 바뀔 때만 다시 만들고, 지도를 움직일 때는 색인 질의만 실행
+AREA_RESULT_LIMIT = 200 # 지도 영역 검색 결과 표에 보여줄 최대 기사 수
 
-    except Exception as e:
-        print(f"Geopy Error for '{location_str}': {e}")
-        lat_openai, lon_openai = get_coords_via_openai(location_str)
-        if lat_openai is not None: return lat_openai, lon_openai
-
-    if lat_openai is None:
-        try:
-            country_name = location_str.split(',')[0].strip()
-            if country_name in MANUAL_LOCATION_CACHE: return MANUAL_LOCATION_CACHE[country_name]
-            location_country = geocode_nominatim(country_name, timeout=10)
-            if not RateLimiter: # RateLimiter 없으면 수동 지연
-                time.sleep(1.1)
-            if location_country:
-                print(f"Geopy Country Fallback SUCCESS for '{location_str}' -> '{country_name}': ({location_country.latitude}, {location_country.longitude})"); return location_country.latitude, location_country.longitude
-        except Exception as e: print(f"Geopy Country Fallback Error for '{country_name}': {e}")
-
-    print(f"All Geocoding attempts FAILED for '{location_str}'")
-    return None, None
-
-
-# --- 5. Serper Google 검색 함수 (이전과 동일) ---
-def call_google_search(query, api_key):
-    url = "https://google.serper.dev/search"; payload = json.dumps({"q": query, "gl": "us", "hl": "ko"}); headers = {'X-API-KEY': api_key, 'Content-Type': 'application/json'}
-    try:
-        response = requests.post(url, headers=headers, data=payload, timeout=10); response.raise_for_status(); results = response.json(); organic_results = results.get('organic', []); formatted_results = []
-        for item in organic_results[:5]: formatted_results.append({"title": item.get('title'), "link": item.get('link'), "snippet": item.get('snippet')})
-        return formatted_results
-    except requests.exceptions.RequestException as e: st.error(f"Google 검색 API(Serper) 호출 중 오류 발생: {e}"); return None
 
+@st.cache_resource(max_entries=2)
+def get_spatial_index(_df, data_version, resolved_count):
+    """(공간 색인, 전체 위치 클러스터 지도). 좌표가 아직 없는 지역명은 백그라운드 변환 큐로 보냄"""
+    locations = unique_locations(_df)
+    coords = gazetteer.known_coords(locations) # 저장된 좌표만 사용 (네트워크 조회 없음)
+    geocode_queue.submit([loc for loc in locations if loc not in coords])
+    spatial_index = SpatialIndex(build_map_data(_df, coords))
+    overview_map = build_map(spatial_index.points, _df, mode="clustered")[0] if len(spatial_index) else None
+    return spatial_index, overview_map
 
-# --- 6. (★★★ 수정됨 ★★★) 메인 애플리케이션 실행 ---
 
-df, debug_text = load_data_from_pdfs("sampledata")
+# (★★★ 수정됨 ★★★) 전체 개요: 기사 마커 대신 국가/지역별 기사 수 집계(aggregation.py)로 그리는 지도
+@st.cache_resource(max_entries=2)
+def get_overview_coords(_aggregates, data_version, resolved_count):
+    """({지역명: 좌표}, {국가명: 좌표}). 국가 좌표가 저장소에 없으면 그 국가 지역들의 평균 좌표를 사용"""
+    location_coords = gazetteer.known_coords(_aggregates.by_location().index.tolist())
+    country_coords = gazetteer.known_coords(_aggregates.by_country().index.tolist())
+    return location_coords, country_coords_with_fallback(location_coords, country_coords)
+
+
+@st.cache_resource(max_entries=16)
+def get_overview_map(_aggregates, data_version, resolved_count, layer, categories, months):
+    """분류/기간 조건별 개요 지도 (조건이 같으면 재실행 시 다시 만들지 않음)"""
+    location_coords, country_coords = get_overview_coords(_aggregates, data_version, resolved_count)
+    if layer == "heatmap": return build_overview_map(_aggregates.by_location(categories, months), location_coords, layer)
+    return build_overview_map(_aggregates.by_country(categories, months), country_coords, layer)
+
+
+# --- 4. (★★★ 수정됨 ★★★) 유사 기사 검색 (번역/Serper 검색/요약은 similar_articles.py) ---
+# 독립적인 호출은 동시에 실행하고, 번역/검색/요약 결과는 TTL 캐시에 보관해 반복 클릭 시 API를 다시 호출하지 않음
+@st.cache_resource
+def get_similar_article_finder(_client, openai_api_key, serper_api_key):
+    return SimilarArticleFinder(_client, serper_api_key)
+
+
+# --- 5. (★★★ 수정됨 ★★★) 메인 애플리케이션 실행 ---
+
+(df, search_index, aggregates, date_index), debug_text = load_data_from_pdfs("sampledata")
 
 if debug_text:
     st.error("데이터 파싱에 실패했습니다. 파싱 로직이 PDF 구조와 맞는지 확인해주세요.")
     st.subheader("디버깅 정보: 첫 번째 PDF 추출 원본 텍스트 (일부)")
-    st.text_area("Raw Text", debug_text[:2000], height=300)
+    st.text_area("Raw Text", debug_text[:DEBUG_TEXT_CHARS], height=300)
     # 지역정보 포함하여 실패한 컬럼 표시
     for col in ['대분류', '중분류', '소분류', '지역정보', '기사제목', 'original_title', '이벤트', '요약']:
-        if col not in df: st.warning(f"경고: '{col}' 컬럼 자체가 없습니다.")
-        elif col != '지역정보' and ((df[col] == "정보 없음").all() or df[col].isnull().all()): st.warning(f"경고: '{col}' 컬럼의 유효한 데이터를 찾지 못했습니다.")
-        elif col == '지역정보' and all(not x for x in df[col]): st.warning(f"경고: '{col}' 컬럼의 유효한 데이터를 찾지 못했습니다.")
+        if not has_column(df, col): st.warning(f"경고: '{col}' 컬럼 자체가 없습니다.")
+        elif col != '지역정보' and ((column_values(df, col) == "정보 없음").all() or column_values(df, col).isnull().all()): st.warning(f"경고: '{col}' 컬럼의 유효한 데이터를 찾지 못했습니다.")
+        elif col == '지역정보' and not has_locations(df).any(): st.warning(f"경고: '{col}' 컬럼의 유효한 데이터를 찾지 못했습니다.")
 
 
-elif df.empty or all(not x for x in df['지역정보']): # 지역정보가 모든 행에서 빈 리스트인 경우
+elif df.empty or not has_locations(df).any(): # 지역정보가 모든 행에서 비어 있는 경우
     st.error("데이터 로딩에 실패했거나 유효한 '지역정보'를 찾지 못했습니다. 앱을 실행할 수 없습니다.")
 else:
     st.success(f"총 {len(df)}개의 PDF 기사를 성공적으로 로드하고 파싱했습니다.")
-    keyword = st.text_input("키워드를 입력하세요 (예: 페루, 인플레이션, 리마 등)", "")
+    # (★★★ 수정됨 ★★★) 검색 방식: 키워드 검색 또는 지도에 보이는 영역(클릭 지점 반경) 검색
+    search_mode = st.radio("검색 방식", ["키워드", "지도 영역", "전체 개요"], horizontal=True)
+    if search_mode == "전체 개요":
+        # 집계 표만 사용하므로 기사 수와 관계없이 빠름 (기사가 추가되면 집계도 증분 갱신됨)
+        filter_columns = st.columns(2)
+        categories = tuple(filter_columns[0].multiselect("대분류 (비우면 전체)", aggregates.categories())) or None
+        all_months = aggregates.months()
+        months = filter_columns[1].select_slider("기간", all_months, value=(all_months[0], all_months[-1])) if len(all_months) > 1 else None
+        layer = OVERVIEW_LAYER_LABELS[st.radio("개요 지도", list(OVERVIEW_LAYER_LABELS), horizontal=True)]
+        by_country = aggregates.by_country(categories, months)
+        st.subheader(f"기사 {aggregates.total(categories, months)}개 / 국가 {len(by_country)}개")
+        overview_map = get_overview_map(aggregates, df.attrs.get('data_version'), gazetteer.resolved_count(), layer, categories, months)
+        if overview_map is None: st.warning("조건에 맞는 기사 중 좌표가 있는 위치가 없습니다.")
+        else: st_folium(overview_map, width='100%', height=500, returned_objects=[])
+        chart_columns = st.columns(2)
+        chart_columns[0].markdown("**국가별 기사 수 (상위 15)**"); chart_columns[0].bar_chart(by_country.head(15))
+        chart_columns[1].markdown("**대분류별 기사 수**"); chart_columns[1].bar_chart(aggregates.by_category(months))
+        st.markdown("**월별 기사 수**"); st.bar_chart(aggregates.by_month(categories).drop("정보 없음", errors='ignore'))
+    if search_mode == "지도 영역":
+        searchable_df = searchable_articles(df)
+        spatial_index, overview_map = get_spatial_index(searchable_df, df.attrs.get('data_version'), gazetteer.resolved_count())
+        if overview_map is None:
+            st.warning("좌표가 변환된 기사 위치가 아직 없습니다. 백그라운드에서 변환 중이니 잠시 후 다시 시도해주세요.")
+        else:
+            area_keyword = st.text_input("영역 안에서 찾을 키워드 (선택)", "")
+            radius_km = st.number_input("클릭한 지점 반경 (km, 0이면 지도에 보이는 영역)", min_value=0, max_value=5000, value=0, step=50)
+            st.caption(f"좌표가 있는 위치 {len(spatial_index)}개. 지도를 움직이거나 확대하면 보이는 영역의 기사로 결과가 바뀝니다.")
+            map_state = st_folium(overview_map, width='100%', height=500, returned_objects=["bounds", "last_clicked"]) or {}
+            bounds, clicked = map_state.get("bounds") or {}, map_state.get("last_clicked")
+            south_west, north_east = bounds.get("_southWest") or {}, bounds.get("_northEast") or {}
+            box = (south_west.get('lat'), south_west.get('lng'), north_east.get('lat'), north_east.get('lng')) # 남, 서, 북, 동
+            if radius_km and clicked:
+                area_points = spatial_index.radius(clicked['lat'], clicked['lng'], radius_km)
+                area_label = f"({clicked['lat']:.2f}, {clicked['lng']:.2f}) 반경 {radius_km}km"
+            elif None not in box:
+                area_points = spatial_index.bbox(*box)
+                area_label = "지도에 보이는 영역"
+            else: # 지도가 아직 영역을 알려주지 않은 첫 실행
+                area_points, area_label = spatial_index.points, "전체"
+            if area_keyword:
+                area_points = area_points[area_points['article'].isin(search_index.search(area_keyword))]
+            area_locations = area_points.groupby('article', sort=False)['location'].agg(", ".join)
+            st.subheader(f"{area_label}: {len(area_locations)}개 기사 / {len(area_points)}개 위치")
+            if len(area_locations):
+                area_table = df.loc[area_locations.index[:AREA_RESULT_LIMIT], ['기사제목', '이벤트', '대분류', '중분류', '기사링크']]
+                area_table = area_table.assign(지역=area_locations.iloc[:AREA_RESULT_LIMIT].to_numpy())
+                area_table.attrs = {} # 화면 표에는 지역 번호 표(attrs)가 필요 없음
+                st.dataframe(area_table, hide_index=True)
+                if len(area_locations) > AREA_RESULT_LIMIT: st.caption(f"처음 {AREA_RESULT_LIMIT}개 기사만 표시합니다. 지도를 확대해 범위를 좁혀주세요.")
+    keyword = "" if search_mode != "키워드" else st.text_input("키워드를 입력하세요 (예: 페루, 인플레이션, 리마 등 / 여러 단어는 모두 포함, OR로 구분하면 하나라도 포함)", "")
 
     if keyword:
-        # (수정) 검색 가능 필터: 지역정보는 리스트가 비어있지 않은지만 확인
-        df_searchable = df[
-            (df['대분류'] != "정보 없음") &
-            (df['기사제목'] != "정보 없음") &
-            (df['original_title'] != "정보 없음") &
-            (df['지역정보'].apply(lambda x: bool(x))) # 지역정보 리스트가 비어있지 않은 행만
-        ]
-        # (수정) 검색 조건(mask): 지역정보는 리스트 내 각 항목에 대해 검색
-        mask = (
-                df_searchable['대분류'].str.contains(keyword, case=False, na=False) |
-                df_searchable['중분류'].str.contains(keyword, case=False, na=False) |
-                df_searchable['소분류'].str.contains(keyword, case=False, na=False) |
-                df_searchable['기사제목'].str.contains(keyword, case=False, na=False) |
-                df_searchable['original_title'].str.contains(keyword, case=False, na=False) |
-                # 지역정보 리스트 내 각 항목에 대해 keyword 포함 여부 확인
-                df_searchable['지역정보'].apply(lambda loc_list: any(keyword.lower() in loc.lower() for loc in loc_list))
-        )
-        filtered_df = df_searchable[mask].copy()
+        map_mode_label = st.radio("지도 표시 방식", list(MAP_MODE_LABELS), horizontal=True)
+        # (★★★ 수정됨 ★★★) 같은 검색어/데이터/지도 방식이면 저장된 결과 사용 (버튼 클릭 등 재실행 시 즉시 표시)
+        # 좌표 저장소의 성공 건수도 키에 넣어, 백그라운드 변환/재시도로 새 좌표가 생기면 지도를 다시 만듦
+        query_cache = get_query_cache()
+        query_base = (normalize_query(keyword), df.attrs.get('data_version'), MAP_MODE_LABELS[map_mode_label])
+        query_key = (*query_base, gazetteer.resolved_count())
+        result = query_cache.get(query_key)
+        if result is None:
+            result = search_and_build_map(df, search_index, keyword, MAP_MODE_LABELS[map_mode_label])
+            query_key = (*query_base, gazetteer.resolved_count()) # 이번 검색이 변환한 좌표까지 반영된 상태로 저장
+            query_cache.put(query_key, result, estimate_result_bytes(result['filtered_df'], result['map_data'], result['map_mode']))
+
+        # (★★★ 수정됨 ★★★) 보도 일자로 거르기: 기간 선택 또는 타임라인(구간별로 지도를 넘겨 봄)
+        date_mode = st.radio("보도 일자", ["전체 기간", "기간 선택", "타임라인"], horizontal=True)
+        result_dates = date_index.dates_of(result['filtered_df'].index).dropna()
+        date_range, date_label, playing = None, None, False
+        if date_mode == "기간 선택" and not result_dates.empty:
+            first_date, last_date = result_dates.min().date(), result_dates.max().date()
+            if first_date < last_date:
+                date_range = st.slider("기간", first_date, last_date, (first_date, last_date), format="YYYY-MM-DD")
+                date_range = (pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]) + pd.Timedelta(days=1) - pd.Timedelta(1))
+                date_label = f"{date_range[0]:%Y-%m-%d} ~ {date_range[1]:%Y-%m-%d}"
+        elif date_mode == "타임라인" and not result_dates.empty:
+            window_unit = st.radio("구간 단위", list(WINDOW_LABELS), horizontal=True)
+            windows = {name: (start, end) for name, start, end in time_windows(result_dates, WINDOW_LABELS[window_unit])}
+            window_names = list(windows)
+            window_key = f"timeline_window_{window_unit}"
+            # 재생 중 다음 구간은 위젯을 만들기 전에 반영해야 함
+            if "timeline_next" in st.session_state: st.session_state[window_key] = st.session_state.pop("timeline_next")
+            if st.session_state.get(window_key) not in windows: st.session_state[window_key] = window_names[0]
+            playing = st.session_state.get("timeline_playing", False)
+            play_column, slider_column = st.columns([1, 6])
+            if play_column.button("⏸ 정지" if playing else "▶ 재생", disabled=len(window_names) < 2):
+                playing = st.session_state["timeline_playing"] = not playing
+                if playing and st.session_state[window_key] == window_names[-1]: st.session_state["timeline_next"] = window_names[0]; st.rerun()
+            date_label = slider_column.select_slider("구간", window_names, key=window_key) if len(window_names) > 1 else window_names[0]
+            date_range = windows[date_label]
+        if date_range is not None:
+            view_key = (*query_key, 'date', date_range[0].isoformat(), date_range[1].isoformat())
+            view = query_cache.get(view_key)
+            if view is None:
+                view = filter_result_by_date(result, date_index, *date_range, MAP_MODE_LABELS[map_mode_label])
+                query_cache.put(view_key, view, estimate_result_bytes(view['filtered_df'], view['map_data'], view['map_mode']))
+            result = view
+        filtered_df, map_data, m, map_mode = result['filtered_df'], result['map_data'], result['map'], result['map_mode']
 
         if filtered_df.empty:
-            st.warning("검색 결과가 없습니다.")
+            st.warning("검색 결과가 없습니다." if date_label is None else f"{date_label}에 해당하는 검색 결과가 없습니다.")
         else:
-            st.info("검색된 지역의 좌표를 변환 중입니다...")
-            geocoding_placeholder = st.empty(); log_messages = []; location_cache = {}
-
-            # (★★★ 수정됨 ★★★) 고유 위치 목록 생성: 리스트를 펼쳐서 생성
-            unique_locations = set()
-            for loc_list in filtered_df['지역정보']:
-                unique_locations.update(loc_list) # set에 추가하여 자동 중복 제거
-            unique_locations = list(unique_locations) # 다시 리스트로 변환
-            total_locations = len(unique_locations)
-
-            progress_bar = st.progress(0, text="좌표 변환 시작...")
-            for i, location_str in enumerate(unique_locations):
-                progress_text = f"변환 중 ({i+1}/{total_locations}): {location_str}"
-                if location_str in MANUAL_LOCATION_CACHE: progress_text += " (수동 캐시 사용)"
-                else: progress_text += " (Geopy/OpenAI 시도 중...)"
-                progress_bar.progress((i + 1) / total_locations, text=progress_text)
-                lat, lon = get_lat_lon(location_str); location_cache[location_str] = (lat, lon) # 결과를 캐시에 저장
-                method_used = "수동 캐시" if location_str in MANUAL_LOCATION_CACHE else "Geopy/OpenAI"
-                if lat is not None: log_messages.append(f"✅ **[성공]** `{location_str}` -> `({lat:.4f}, {lon:.4f})` (방법: {method_used})")
-                else: log_messages.append(f"❌ **[실패]** `{location_str}` -> 모든 방법(수동, Geopy, OpenAI, 국가명) 실패")
-            geocoding_placeholder.expander("좌표 변환 로그 보기", expanded=True).markdown("\n".join(log_messages))
-            progress_bar.empty()
-
-            # (★★★ 수정됨 ★★★) 지도 표시 로직: 각 기사의 각 위치에 마커 생성
-            map_data = [] # 지도에 표시할 데이터 (마커 중복 방지용)
-            has_valid_location = False # 유효한 좌표가 하나라도 있는지 확인
-
-            for idx, row in filtered_df.iterrows():
-                for location_str in row['지역정보']:
-                    coords = location_cache.get(location_str)
-                    if coords and coords[0] is not None:
-                        has_valid_location = True
-                        # 동일 기사, 동일 위치에 마커 중복 생성 방지
-                        map_key = f"{idx}_{location_str}"
-                        if map_key not in [d['key'] for d in map_data]:
-                            map_data.append({
-                                'key': map_key,
-                                'latitude': coords[0],
-                                'longitude': coords[1],
-                                'popup_data': row # 마커 생성에 필요한 전체 행 데이터
-                            })
+            has_valid_location = not map_data.empty # 유효한 좌표가 하나라도 있는지 확인
 
             if not has_valid_location:
+                st.expander("좌표 변환 로그 보기", expanded=True).markdown("\n".join(result['geocode_log']))
                 st.warning("키워드에 해당하는 기사는 있으나, 지도에 표시할 위치 정보를 찾지 못했습니다. (위의 '좌표 변환 로그'를 확인하여 모든 위치가 ❌[실패]했는지 확인하세요.)")
             else:
-                geocoding_placeholder.empty()
-
-                # 7. Folium 지도 시각화 (마커 생성 로직 수정)
-                # (수정) 지도 중심 계산: map_data에 있는 모든 유효 좌표 사용
-                avg_lat = sum(d['latitude'] for d in map_data) / len(map_data)
-                avg_lon = sum(d['longitude'] for d in map_data) / len(map_data)
-                m = folium.Map(location=[avg_lat, avg_lon], zoom_start=4)
-
-                color_map = {'국내(사회)': 'red', '국내(경제)': 'green', '국내(범죄)': 'black', '국제(국제관계)': 'purple', '정치': 'blue'}
-
-                # (수정) map_data를 순회하며 마커 생성
-                for data_point in map_data:
-                    row_data = data_point['popup_data'] # 해당 마커의 원본 기사 데이터
-                    popup_html = f"""
-                    <h4>{row_data['기사제목']}</h4>
-                    <i>{row_data['original_title']}</i><br><br>
-                    <b>시간:</b> {row_data['이벤트']}<br>
-                    <b>분류:</b> {row_data['대분류']} > {row_data['중분류']} > {row_data['소분류']}<br>
-                    <a href="{row_data['기사링크']}" target="_blank">기사 원문 보기</a>
-                    <hr>
-                    <div id="details_{data_point['key']}" style="display:none; max-height: 150px; overflow-y: auto;">
-                        <b>요약:</b><p>{row_data['요약']}</p>
-                    </div>
-                    <button onclick="
-                        var el = document.getElementById('details_{data_point['key']}');
-                        if (el.style.display == 'none') {{
-                            el.style.display = 'block'; this.textContent = '요약 닫기';
-                        }} else {{
-                            el.style.display = 'none'; this.textContent = '요약 보기';
-                        }}
-                    ">요약 보기</button>
-                    """
-                    iframe = folium.IFrame(popup_html, width=350, height=280)
-                    popup = folium.Popup(iframe, max_width=350)
-                    folium.Marker(
-                        location=[data_point['latitude'], data_point['longitude']],
-                        popup=popup,
-                        icon=folium.Icon(color=color_map.get(row_data['대분류'], 'gray')),
-                        tooltip=row_data['기사제목'] # 툴팁은 한국어 제목 유지
-                    ).add_to(m)
-
-                st.subheader(f"'{keyword}' 검색 결과: {len(filtered_df)}개 기사 / {len(map_data)}개 위치") # 표시 정보 수정
-                st_folium(m, width='100%', height=500)
-
-                # 8. OpenAI + Serper 연동 (검색어 로직: 한국어/스페인어 분리)
+                # 6. Folium 지도 시각화 (★★★ 수정됨 ★★★ map_render.py)
+                # 마커가 많으면 요약을 팝업에 미리 넣지 않고 클러스터로 그린 뒤, 클릭한 위치의 기사만 아래에 표시
+                st.subheader(f"'{keyword}' 검색 결과{f' ({date_label})' if date_label else ''}: {len(filtered_df)}개 기사 / {len(map_data)}개 위치") # 표시 정보 수정
+                if map_mode == "clustered":
+                    st.caption("마커를 클릭하면 해당 위치의 기사 요약이 지도 아래에 표시됩니다.")
+                    map_state = st_folium(m, width='100%', height=500, returned_objects=["last_object_clicked"])
+                    clicked = (map_state or {}).get("last_object_clicked")
+                    clicked_records = records_at(map_data, clicked['lat'], clicked['lng']) if clicked else map_data.iloc[0:0]
+                    if not clicked_records.empty:
+                        with st.expander(f"📍 선택한 위치의 기사 {len(clicked_records)}건", expanded=True):
+                            for article_label in clicked_records['article']:
+                                row_data = filtered_df.loc[article_label]
+                                st.markdown(f"**{row_data['기사제목']}**  \n*{row_data['original_title']}*  \n"
+                                            f"**시간:** {row_data['이벤트']} · **분류:** {row_data['대분류']} > {row_data['중분류']} > {row_data['소분류']} · "
+                                            f"[기사 원문 보기]({row_data['기사링크']})")
+                                st.write(row_data['요약'])
+                else:
+                    # 요약이 팝업에 모두 들어 있으므로 지도 조작으로 앱을 다시 실행할 필요 없음
+                    st_folium(m, width='100%', height=500, returned_objects=[])
+
+                # 7. OpenAI + Serper 연동 (검색어 로직: 한국어/스페인어 분리)
                 st.markdown("---")
                 if st.button("🤖 AI로 유사 기사 더 알아보기 (실제 검색)"):
                     if not client:
@@ -405,104 +423,54 @@ else:
                     elif serper_api_key == "YOUR_SERPER_API_KEY" or not serper_api_key:
                         st.error("Serper (Google 검색) API 키가 설정되지 않았습니다.")
                     else:
-                        with st.spinner("AI가 Google에서 유사한 기사를 검색하고 요약 중입니다..."):
-                            # 1) 소분류 키워드 최대 5개 수집
-                            sub_categories = set()
-                            try:
-                                if '소분류' in filtered_df.columns:
-                                    sub_categories.update(filtered_df['소분류'].dropna().unique().tolist())
-                            except Exception:
-                                pass
-                            sub_category_keywords_ko = [cat.strip() for cat in sub_categories if cat and cat != "정보 없음"]
-                            sub_category_keywords_ko = sub_category_keywords_ko[:5]
-
-                            # 2) 한국어 검색어
-                            search_query_ko = f"라틴아메리카, 중남미, 뉴스, 기사, {keyword}".strip().strip(",")
-
-
-                            # 3) 스페인어 검색용: keyword + 소분류를 간단 번역
-                            def translate_to_es(text_list):
-                                if not text_list:
-                                    return []
-                                try:
-                                    msg = [
-                                        {"role": "system",
-                                         "content": "You are a concise translator from Korean to Spanish."},
-                                        {"role": "user",
-                                         "content": "다음 항목들을 스페인어로만 자연스럽게 번역해 주세요. 쉼표로 구분해서 반환: " + ", ".join(
-                                             text_list)}
-                                    ]
-                                    tr = client.chat.completions.create(
-                                        model="gpt-4o",
-                                        messages=msg,
-                                        temperature=0
-                                    )
-                                    out = tr.choices[0].message.content or ""
-                                    # 쉼표 기준 분리 & 공백 트리밍
-                                    return [t.strip() for t in out.split(",") if t.strip()]
-                                except Exception:
-                                    # 번역 실패 시 원문 사용
-                                    return text_list
-
-
-                            keyword_es_list = translate_to_es([str(keyword)]) if keyword else []
-                            sub_category_keywords_es = translate_to_es(sub_category_keywords_ko)
-
-                            keyword_es = keyword_es_list[0] if keyword_es_list else ""
-                            base_es_terms = ["América Latina", "Latinoamérica", "noticias", "artículo"]
-                            # 4) 스페인어 검색어
-                            search_query_es = f"{', '.join(base_es_terms)}, {keyword_es} " + " ".join(
-                                sub_category_keywords_es)
-
-
-                            # 5) 공통: 검색 실행 함수
-                            def run_search_and_summarize(search_query, lang_label="KO"):
-                                st.markdown(f"### {'🇰🇷 한국어' if lang_label == 'KO' else '🇪🇸 스페인어'} 검색")
-                                st.text(f"(검색어: {search_query})")
-
-                                results = call_google_search(search_query, serper_api_key)
-                                if not results:
-                                    st.error("Google 검색 결과가 없습니다.")
-                                    return
-
-                                search_context = ""
-                                for i, res in enumerate(results):
-                                    title = res.get('title', '')
-                                    link = res.get('link', '')
-                                    snippet = res.get('snippet', '')
-                                    search_context += f"--- Result {i + 1} ---\nTitle: {title}\nLink: {link}\nSnippet: {snippet}\n"
-
-                                # 프롬프트: 출력은 한국어 요약 유지 (원하시면 스페인어 섹션만 스페인어 요약으로 바꿔도 됩니다)
-                                prompt = f"""당신은 라틴아메리카 전문 뉴스 큐레이터입니다. 사용자가 '{keyword}' 키워드로 검색했으며, 아래는 Google 검색 결과입니다.
-                <Google 검색 결과>
-                {search_context}
-                </Google 검색 결과>
-                위 결과를 바탕으로 유사 기사 3개를 추천해주세요. 다음 형식을 지켜주세요.
-                - **기사 제목:** [실제 제목]
-                - **기사 링크:** [실제 링크]
-                - **번역 및 요약:** [Snippet 바탕 AI 생성 한국어 요약]
-                ---"""
-
-                                try:
-                                    response = client.chat.completions.create(
-                                        model="gpt-4o",
-                                        messages=[
-                                            {"role": "system",
-                                             "content": "You are a helpful assistant specializing in Latin American news."},
-                                            {"role": "user", "content": prompt}
-                                        ],
-                                        temperature=0.2
-                                    )
-                                    result_text = response.choices[0].message.content
-                                    st.subheader("AI 추천 유사 기사 (실제 검색 결과)")
-                                    st.markdown(result_text)
-                                except Exception as e:
-                                    st.error(f"OpenAI API 호출 중 오류가 발생했습니다: {e}")
-
-
-                            # 6) 두 언어 검색 각각 실행
-                            run_search_and_summarize(search_query_ko, lang_label="KO")
-                            run_search_and_summarize(search_query_es, lang_label="ES")
+                        # 1) 소분류 키워드 최대 5개 수집
+                        sub_categories = set()
+                        try:
+                            if '소분류' in filtered_df.columns:
+                                sub_categories.update(filtered_df['소분류'].dropna().unique().tolist())
+                        except Exception:
+                            pass
+                        sub_category_keywords_ko = sorted(cat.strip() for cat in sub_categories if cat and cat != "정보 없음") # 순서를 고정해 캐시 키로 사용
+                        sub_category_keywords_ko = sub_category_keywords_ko[:5]
+
+                        # 2) (★★★ 수정됨 ★★★) 두 언어 영역을 나란히 만들어 두고, 요약 조각이 도착하는 대로 채움 (similar_articles.py)
+                        finder = get_similar_article_finder(client, openai_api_key, serper_api_key)
+                        slots = {}
+                        for lang_label, column in zip(LANGUAGE_LABELS, st.columns(len(LANGUAGE_LABELS))):
+                            with column:
+                                st.markdown(f"### {LANGUAGE_LABELS[lang_label]} 검색")
+                                slots[lang_label] = {'query': st.empty(), 'status': st.container(), 'body': st.empty(), 'timing': st.empty(), 'text': ""}
+                                slots[lang_label]['query'].text("(검색어 준비 중...)")
+
+                        # 3) 이벤트 처리: 첫 요약 조각이 표시되기까지의 시간을 언어별로 기록
+                        started = time.perf_counter()
+                        for lang_label, kind, value in finder.stream(keyword, sub_category_keywords_ko):
+                            slot = slots[lang_label]
+                            if kind == 'query':
+                                slot['query'].text(f"(검색어: {value})")
+                                slot['body'].caption("Google 검색 및 AI 요약 중...")
+                            elif kind == 'search_error':
+                                slot['status'].error(f"Google 검색 API(Serper) 호출 중 오류 발생: {value}")
+                            elif kind == 'no_results':
+                                slot['body'].empty(); slot['status'].error("Google 검색 결과가 없습니다.")
+                            elif kind == 'token':
+                                if not slot['text']:
+                                    slot['first_content_seconds'] = time.perf_counter() - started
+                                    slot['status'].subheader("AI 추천 유사 기사 (실제 검색 결과)")
+                                slot['text'] += value
+                                slot['body'].markdown(slot['text'])
+                            elif kind == 'summary_error':
+                                slot['body'].empty(); slot['status'].error(f"OpenAI API 호출 중 오류가 발생했습니다: {value}")
+                            elif kind == 'done' and 'first_content_seconds' in slot:
+                                slot['timing'].caption(f"첫 내용 표시 {slot['first_content_seconds']:.2f}초 / 완료 {time.perf_counter() - started:.2f}초")
+
+        # 타임라인 재생: 화면을 다 그린 뒤 잠시 기다렸다가 다음 구간으로 (구간별 결과는 캐시에서 바로 나옴)
+        if playing:
+            time.sleep(TIMELINE_STEP_SECONDS)
+            next_position = window_names.index(date_label) + 1
+            if next_position < len(window_names): st.session_state["timeline_next"] = window_names[next_position]
+            else: st.session_state["timeline_playing"] = False # 마지막 구간에서 멈춤
+            st.rerun()
 
     # --- 앱 하단 저작권 정보 (이전과 동일) ---
     st.markdown("---")
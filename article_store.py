@@ -0,0 +1,202 @@
+"""파싱된 PDF 기사를 SQLite에 보관하는 디스크 인덱스.
+
+(폴더, 파일명, mtime, 크기)가 그대로인 PDF는 다시 파싱하지 않고 저장된 결과를 사용한다.
+파싱에 실패한 PDF는 그 (mtime, 크기)로 failures 표에 기록해 두고, 파일이 다시 바뀔 때까지 재시도하지 않는다.
+오프라인 빌드: python article_store.py sampledata
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from pdf_parser import PARSER_VERSION, parse_pdf_files
+
+DEFAULT_INDEX_PATH = Path(".cache") / "articles.sqlite"
+
+# 대량 수집 중 중단돼도 진행분이 남도록 이 개수마다 커밋
+WRITE_BATCH_SIZE = 200
+# load_dataframe(filenames=...)에서 한 번에 조회하는 파일 수
+LOAD_BATCH_SIZE = 500
+
+
+class ArticleStore:
+    def __init__(self, db_path=DEFAULT_INDEX_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    @contextmanager
+    def _connect(self):
+        """with 블록 = 트랜잭션 하나 (정상 종료 시 커밋, 예외 시 롤백). 끝나면 연결을 바로 닫음"""
+        # 여러 Streamlit 워커가 같은 파일을 공유하므로 WAL + 넉넉한 잠금 대기
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn: yield conn
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS articles (
+                    folder TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    parser_version INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (folder, filename)
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS failures (
+                    folder TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    parser_version INTEGER NOT NULL,
+                    error TEXT NOT NULL,
+                    PRIMARY KEY (folder, filename)
+                )"""
+            )
+
+    @staticmethod
+    def _folder_key(folder):
+        return str(Path(folder).resolve())
+
+    def _stored_stats(self, conn, folder_key, table="articles"):
+        rows = conn.execute(
+            f"SELECT filename, mtime_ns, size, parser_version FROM {table} WHERE folder = ?",
+            (folder_key,),
+        )
+        return {name: (mtime_ns, size, version) for name, mtime_ns, size, version in rows}
+
+    def sync(self, folder, on_progress=None, on_error=None, workers=None):
+        """폴더와 인덱스를 맞춤: 추가/변경된 PDF만 파싱하고 사라진 PDF는 삭제.
+
+        파싱은 pdf_parser.parse_pdf_files로 workers개 프로세스에 나눠 실행하며 결과는 파일 순서대로 반영된다.
+        on_progress(done, total, filename), on_error(filename, exception) 콜백으로 진행/오류를 알린다.
+        변경 후 파싱에 실패한 PDF는 예전 기사를 인덱스에서 빼고(removed_files에 포함) 실패로 기록하며,
+        같은 (mtime, 크기)인 동안은 다시 파싱하지 않는다 (on_error도 변경당 한 번).
+        반환값: {'parsed': n, 'removed': n, 'unchanged': n, 'failed': n,
+                 'parsed_files': [새로 저장한 파일명], 'removed_files': [인덱스에서 뺀 파일명 (삭제/파싱 실패)]}
+        """
+        folder = Path(folder)
+        folder_key = self._folder_key(folder)
+        pdf_files = sorted(folder.glob("*.pdf"))
+
+        with self._connect() as conn:
+            stored = self._stored_stats(conn, folder_key)
+            known_failures = self._stored_stats(conn, folder_key, table="failures")
+
+        stale = {}
+        for pdf_path in pdf_files:
+            stat = pdf_path.stat()
+            current = (stat.st_mtime_ns, stat.st_size, PARSER_VERSION)
+            if stored.get(pdf_path.name) != current and known_failures.get(pdf_path.name) != current:
+                stale[pdf_path] = stat
+        names = {p.name for p in pdf_files}
+        removed = set(stored) - names
+
+        pending_rows = []; parsed_files = []; failed = 0
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM articles WHERE folder = ? AND filename = ?",
+                             [(folder_key, name) for name in removed])
+            conn.executemany("DELETE FROM failures WHERE folder = ? AND filename = ?",
+                             [(folder_key, name) for name in set(known_failures) - names])
+            for i, (pdf_path, article_data, error) in enumerate(parse_pdf_files(stale, workers=workers)):
+                stat = stale[pdf_path]
+                if error is not None:
+                    failed += 1
+                    # 예전 기사를 계속 보여주지 않도록 빼고, 파일이 다시 바뀔 때까지 재시도하지 않도록 기록
+                    if pdf_path.name in stored:
+                        conn.execute("DELETE FROM articles WHERE folder = ? AND filename = ?", (folder_key, pdf_path.name))
+                        removed.add(pdf_path.name)
+                    conn.execute("INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?, ?, ?)",
+                                 (folder_key, pdf_path.name, stat.st_mtime_ns, stat.st_size, PARSER_VERSION, str(error)))
+                    if on_error: on_error(pdf_path.name, error)
+                else:
+                    pending_rows.append((folder_key, pdf_path.name, stat.st_mtime_ns, stat.st_size, PARSER_VERSION,
+                                         json.dumps(article_data, ensure_ascii=False)))
+                if len(pending_rows) >= WRITE_BATCH_SIZE:
+                    parsed_files += self._write_rows(conn, pending_rows); pending_rows = []
+                if on_progress: on_progress(i + 1, len(stale), pdf_path.name)
+            parsed_files += self._write_rows(conn, pending_rows)
+
+        return {'parsed': len(parsed_files), 'removed': len(removed),
+                'unchanged': len(pdf_files) - len(stale), 'failed': failed,
+                'parsed_files': parsed_files, 'removed_files': sorted(removed)}
+
+    @staticmethod
+    def _write_rows(conn, rows):
+        conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("DELETE FROM failures WHERE folder = ? AND filename = ?", [row[:2] for row in rows])
+        conn.commit()
+        return [row[1] for row in rows]
+
+    def load_dataframe(self, folder, filenames=None):
+        """인덱스에 저장된 기사들을 파일명 순서의 DataFrame으로 반환 (인덱스 = 파일명). filenames를 주면 그 파일들만.
+
+        df.attrs['data_version']에는 폴더 전체의 (파일명, mtime, 크기, 파서 버전) 목록 해시(data_version())를 넣어
+        검색 색인 등 DataFrame에서 파생된 캐시의 키로 쓸 수 있게 한다.
+        """
+        query = "SELECT filename, data FROM articles WHERE folder = ?"
+        folder_key = self._folder_key(folder)
+        with self._connect() as conn:
+            if filenames is None:
+                rows = conn.execute(query, (folder_key,)).fetchall()
+            else:
+                filenames = list(filenames); rows = []
+                # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회
+                for start in range(0, len(filenames), LOAD_BATCH_SIZE):
+                    chunk = filenames[start:start + LOAD_BATCH_SIZE]
+                    rows += conn.execute(query + f" AND filename IN ({', '.join('?' * len(chunk))})", (folder_key, *chunk)).fetchall()
+        rows.sort(key=lambda row: row[0])
+        df = pd.DataFrame([json.loads(data) for _, data in rows], index=pd.Index([name for name, _ in rows], name='filename'))
+        df.attrs['data_version'] = self.data_version(folder)
+        return df
+
+    def data_version(self, folder):
+        """폴더 전체의 (파일명, mtime, 크기, 파서 버전) 목록 해시 (기사 내용은 읽지 않음)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT filename, mtime_ns, size, parser_version FROM articles WHERE folder = ? ORDER BY filename",
+                (self._folder_key(folder),),
+            ).fetchall()
+        return hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+
+    def clear(self, folder):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM articles WHERE folder = ?", (self._folder_key(folder),))
+            conn.execute("DELETE FROM failures WHERE folder = ?", (self._folder_key(folder),))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 기사 인덱스를 오프라인으로 빌드합니다.")
+    parser.add_argument("folder", nargs="?", default="sampledata", help="PDF 폴더 (기본값: sampledata)")
+    parser.add_argument("--db", default=str(DEFAULT_INDEX_PATH), help=f"인덱스 파일 경로 (기본값: {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--rebuild", action="store_true", help="기존 인덱스를 지우고 전부 다시 파싱")
+    parser.add_argument("--workers", type=int, default=None, help="파싱 프로세스 수 (기본값: CPU 개수, 1이면 순차 처리)")
+    args = parser.parse_args()
+
+    store = ArticleStore(args.db)
+    if args.rebuild: store.clear(args.folder)
+    started = time.perf_counter()
+    stats = store.sync(
+        args.folder,
+        on_progress=lambda done, total, name: print(f"[{done}/{total}] {name}"),
+        on_error=lambda name, e: print(f"'{name}' 파일 처리 중 오류 발생: {e}"),
+        workers=args.workers,
+    )
+    print(f"완료 ({time.perf_counter() - started:.2f}s): 파싱 {stats['parsed']}, 유지 {stats['unchanged']}, "
+          f"삭제 {stats['removed']}, 실패 {stats['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""메모리를 적게 쓰는 기사 표 형식 (compact_articles).
+
+- 대/중분류: category dtype (종류가 적은 값을 한 번씩만 저장). 소분류는 기사마다 다른 키워드 목록이라 문자열로 둠
+- 지역정보: 리스트 셀 대신 지역명 사전 + 정수 배열. df.attrs['locations'](LocationTable)의 ids 배열에
+  모든 기사의 지역 번호를 이어 두고, 각 기사는 location_start/location_count 정수 열로 자기 구간을 가리킨다.
+  df.loc[...] 등으로 행을 골라도 두 열과 attrs가 함께 따라가므로 지역 정보가 유지된다.
+- 번역: 파서가 요약과 같은 값을 넣으므로 메모리에는 두지 않고 필요하면 요약 열을 쓴다 (column_values)
+- filename: 인덱스(파일명)와 같으므로 두지 않음
+
+메모리 비교: python article_table.py sampledata
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ['대분류', '중분류']
+LOCATION_COLUMN = '지역정보'
+LOCATION_START = 'location_start'
+LOCATION_COUNT = 'location_count'
+# 메모리에서 빼는 열 -> 같은 내용의 열
+DUPLICATE_COLUMNS = {'번역': '요약'}
+# 인덱스와 같은 내용이라 메모리에서 빼는 열
+INDEX_COLUMN = 'filename'
+# 앱/내보내기가 기대하는 열 (없으면 prepare_articles가 기본값으로 채움)
+REQUIRED_COLUMNS = ['대분류', '중분류', '소분류', '지역정보', '기사제목', 'original_title', '이벤트', '번역', '요약']
+# 값을 찾지 못했을 때 넣는 기본값 (pdf_parser: 필드 "정보 없음", 요약 "요약 정보 없음", 링크 "링크 없음" / prepare_articles: "정보 없음")
+PLACEHOLDER_VALUES = frozenset(["정보 없음", "요약 정보 없음", "링크 없음"])
+
+
+class LocationTable:
+    """지역명 사전(names)과 기사들의 지역 번호를 이어 붙인 배열(ids). 만든 뒤에는 바꾸지 않는다."""
+
+    def __init__(self, names=(), ids=(), codes=None):
+        self.names = np.asarray(names, dtype=object)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.codes = codes if codes is not None else {name: code for code, name in enumerate(self.names)}
+
+    def __deepcopy__(self, memo):
+        # DataFrame.attrs는 연산마다 deepcopy되지만 바뀌지 않는 객체이므로 그대로 공유
+        return self
+
+    def extended(self, location_lists):
+        """기사별 지역명 리스트를 뒤에 덧붙인 (새 표, 기사별 시작 위치, 기사별 개수)"""
+        names = list(self.names); codes = dict(self.codes); new_ids = []
+        for loc_list in location_lists:
+            for name in loc_list:
+                code = codes.get(name)
+                if code is None:
+                    code = codes[name] = len(names); names.append(name)
+                new_ids.append(code)
+        counts = np.fromiter((len(loc_list) for loc_list in location_lists), dtype=np.int64, count=len(location_lists))
+        starts = len(self.ids) + np.cumsum(counts) - counts
+        table = LocationTable(names, np.concatenate([self.ids, np.asarray(new_ids, dtype=np.int32)]), codes)
+        return table, starts.astype(np.int32), counts.astype(np.int16)
+
+    def nbytes(self):
+        return int(self.ids.nbytes + self.names.nbytes + sum(sys.getsizeof(name) for name in self.names) + sys.getsizeof(self.codes))
+
+
+def compact_articles(df, locations=None):
+    """리스트 셀 형식의 기사 표(ArticleStore.load_dataframe)를 압축 형식으로 변환.
+
+    locations(LocationTable)를 주면 그 표 뒤에 지역을 덧붙이므로, 기존 표와 합칠 행(concat_articles)을 만들 때 쓴다.
+    """
+    duplicates = [col for col, same in DUPLICATE_COLUMNS.items()
+                  if col in df.columns and same in df.columns and df[col].equals(df[same])]
+    if INDEX_COLUMN in df.columns and (df[INDEX_COLUMN] == df.index).all(): duplicates.append(INDEX_COLUMN)
+    df = df.drop(columns=duplicates)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns: df[col] = df[col].astype('category')
+    location_lists = df[LOCATION_COLUMN].tolist() if LOCATION_COLUMN in df.columns else [[]] * len(df)
+    table, starts, counts = (locations or LocationTable()).extended(location_lists)
+    df = df.drop(columns=[LOCATION_COLUMN], errors='ignore')
+    df[LOCATION_START] = starts
+    df[LOCATION_COUNT] = counts
+    df.attrs['locations'] = table
+    return df
+
+
+def concat_articles(frames, locations):
+    """압축 형식 표들을 합침. locations는 모든 표의 지역 구간을 담은(가장 나중에 덧붙인) LocationTable"""
+    frames = list(frames)
+    for col in CATEGORY_COLUMNS:
+        present = [frame[col] for frame in frames if col in frame.columns]
+        if not present: continue
+        categories = pd.api.types.union_categoricals(present).categories
+        frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) if col in frame.columns else frame for frame in frames]
+    df = pd.concat(frames)
+    df.attrs['locations'] = locations
+    return df
+
+
+def repack_locations(df):
+    """삭제된 기사의 지역 번호를 ids 배열에서 걷어낸 표 (행 순서대로 다시 채움)"""
+    lists = location_lists(df)
+    return compact_articles(df.drop(columns=[LOCATION_START, LOCATION_COUNT]).assign(**{LOCATION_COLUMN: lists}))
+
+
+def _location_offsets(df):
+    counts = df[LOCATION_COUNT].to_numpy(dtype=np.int64)
+    starts = df[LOCATION_START].to_numpy(dtype=np.int64)
+    # 기사별 구간 [start, start + count)를 이어 붙인 ids 배열 위치
+    return np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum()), counts
+
+
+def explode_locations(df):
+    """(기사 라벨, 지역명) 쌍을 기사 순서대로 펼친 DataFrame. 열: article, location_id, location"""
+    table = df.attrs['locations']
+    offsets, counts = _location_offsets(df)
+    ids = table.ids[offsets]
+    return pd.DataFrame({'article': np.repeat(df.index.to_numpy(), counts), 'location_id': ids,
+                         'location': table.names[ids].astype(str)})
+
+
+def location_lists(df):
+    """기사별 지역명 리스트 (원래의 지역정보 열과 같은 형태)"""
+    table = df.attrs['locations']
+    return [table.names[table.ids[start:start + count]].tolist()
+            for start, count in zip(df[LOCATION_START].tolist(), df[LOCATION_COUNT].tolist())]
+
+
+def unique_locations(df):
+    """표에 나오는 고유 지역명 목록 (처음 나온 순서)"""
+    table = df.attrs['locations']
+    ids = pd.unique(table.ids[_location_offsets(df)[0]])
+    return table.names[ids].tolist()
+
+
+def has_locations(df):
+    """기사별로 지역정보가 하나라도 있는지 (bool Series)"""
+    return df[LOCATION_COUNT] > 0
+
+
+def prepare_articles(df):
+    """필수 컬럼이 없으면 기본값으로 채움 (지역정보는 빈 리스트). 압축 전 기사 표에 사용"""
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns: df[col] = [[] for _ in range(len(df))] if col == '지역정보' else "정보 없음"
+    return df
+
+
+def searchable_articles(df):
+    """검색/지도 대상 행 (압축 형식): 분류와 제목이 있고 지역정보가 하나라도 있는 기사"""
+    return df[
+        (df['대분류'] != "정보 없음") &
+        (df['기사제목'] != "정보 없음") &
+        (df['original_title'] != "정보 없음") &
+        has_locations(df)
+    ]
+
+
+def has_column(df, column):
+    if column in df.columns: return True
+    if column == LOCATION_COLUMN: return LOCATION_START in df.columns
+    if column == INDEX_COLUMN: return df.index.name == INDEX_COLUMN
+    return DUPLICATE_COLUMNS.get(column) in df.columns
+
+
+def column_values(df, column):
+    """압축으로 빠진 열(지역정보, 번역, filename)도 원래 값 형태로 돌려주는 df[column]"""
+    if column in df.columns: return df[column]
+    if column == LOCATION_COLUMN: return pd.Series(location_lists(df), index=df.index, dtype=object)
+    if column == INDEX_COLUMN: return pd.Series(df.index, index=df.index, name=INDEX_COLUMN)
+    return df[DUPLICATE_COLUMNS[column]]
+
+
+def _value_bytes(value):
+    if isinstance(value, (list, tuple)): return sys.getsizeof(value) + sum(_value_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def memory_report(df):
+    """열별 메모리 바이트 수 {열: 바이트, ..., 'locations': 지역 사전, 'index': 인덱스, 'total': 합계}.
+
+    리스트 셀은 리스트 안의 문자열까지 센다 (pandas memory_usage(deep=True)는 리스트 객체 크기만 셈).
+    """
+    report = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object and series.map(lambda v: isinstance(v, (list, tuple))).any():
+            report[col] = int(series.memory_usage(index=False)) + sum(_value_bytes(v) for v in series)
+        else:
+            report[col] = int(series.memory_usage(index=False, deep=True))
+    if 'locations' in df.attrs: report['locations'] = df.attrs['locations'].nbytes()
+    report['index'] = int(df.index.memory_usage(deep=True))
+    report['total'] = sum(report.values())
+    return report
+
+
+def main():
+    import argparse
+
+    from article_store import DEFAULT_INDEX_PATH, ArticleStore
+
+    parser = argparse.ArgumentParser(description="기사 표의 메모리 사용량을 기존 형식과 압축 형식으로 비교합니다.")
+    parser.add_argument("folder", nargs="?", default="sampledata", help="PDF 폴더 (기본값: sampledata)")
+    parser.add_argument("--db", default=str(DEFAULT_INDEX_PATH), help=f"기사 인덱스 경로 (기본값: {DEFAULT_INDEX_PATH})")
+    args = parser.parse_args()
+
+    raw = ArticleStore(args.db).load_dataframe(args.folder)
+    before, after = memory_report(raw), memory_report(compact_articles(raw))
+    print(f"기사 {len(raw)}개")
+    print(f"{'열':<16}{'기존':>12}{'압축':>12}")
+    for col in dict.fromkeys([*before, *after]):
+        if col == 'total': continue
+        print(f"{col:<16}{before.get(col, 0):>12,}{after.get(col, 0):>12,}")
+    print(f"{'합계':<16}{before['total']:>12,}{after['total']:>12,}  ({after['total'] / max(1, before['total']):.0%})")
+
+
+if __name__ == "__main__":
+    main()
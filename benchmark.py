@@ -0,0 +1,444 @@
+"""합성 PDF 코퍼스로 적재/검색/좌표 변환/지도 생성 성능을 측정하고 이전 실행과 비교.
+
+sampledata와 같은 번호 표 형식('\\n<번호>\\n<필드 이름>\\n<값>')의 PDF를 원하는 개수만큼 만들어
+(.cache/bench/corpus-<개수>-seed<시드>, 같은 설정이면 다시 만들지 않음) 앱과 같은 경로로 처리 시간을 잰다.
+    ingest            ArticleStore.sync: PDF 추출 + 파싱(프로세스 풀) + 인덱스 저장
+    parse_text        parse_pdf_text 문서 하나 (추출한 텍스트 기준, 정규식 회귀 확인용)
+    load / index      기사 표 불러오기+압축 / 검색 색인·집계·보도 일자 색인 생성
+    refresh           폴더 감시 갱신 (PDF 1% 추가 후 LiveArticles.refresh)
+    search            SearchIndex.search 질의 하나
+    geocode_cold/warm 고유 지역명 전체 변환 (로컬 스텁 Nominatim 서버) / 저장소 적중만으로 다시 변환
+    render_query      검색 결과 하나의 마커 표 + folium 지도 HTML
+    render_area       좌표가 있는 전체 위치의 클러스터 지도 HTML (지도 영역 검색 화면)
+    render_overview   국가별 개요 지도 HTML
+    area_<화면>       SpatialIndex 사각 범위 질의 하나 (city/country/continent 크기 화면)
+    area_<화면>_cells 같은 질의를 전체 비교 전환(SCAN_FRACTION) 없이 격자 후보만으로 (전환 기준 확인용)
+결과는 .cache/bench/history.jsonl에 쌓이고, 같은 크기·같은 컴퓨터의 최근 실행 중앙값보다
+허용 비율 이상 느려진 항목이 있으면 종료 코드 1로 끝난다 (CI에서 회귀 확인용).
+
+실행: python benchmark.py --sizes 1000,10000   (100000은 코퍼스 생성에 수 분 걸림)
+"""
+import argparse
+import contextlib
+import gc
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import fitz  # PyMuPDF
+
+from geocoding import MANUAL_LOCATION_CACHE, country_of
+
+BENCH_DIR = Path(".cache") / "bench"
+DEFAULT_HISTORY_PATH = BENCH_DIR / "history.jsonl"
+# 생성 형식이 바뀌면 올려서 이전 코퍼스를 다시 만들게 함
+GENERATOR_VERSION = 1
+
+# 회귀 판정: 최근 HISTORY_WINDOW번 실행의 중앙값보다 REGRESSION_TOLERANCE 비율 이상, MIN_REGRESSION_SECONDS 이상 느리면 회귀
+REGRESSION_TOLERANCE = 0.5
+MIN_REGRESSION_SECONDS = 0.01
+HISTORY_WINDOW = 5
+
+# 스텁 Nominatim: 응답 지연과 '찾지 못함' 비율 (찾지 못한 장소는 국가명 단계로 넘어감)
+DEFAULT_STUB_LATENCY_MS = 5
+STUB_NOT_FOUND_RATIO = 0.1
+# 스텁 서버에는 이용 정책이 없으므로 제공자 예산을 크게 (초당 호출 수, 버스트)
+STUB_BUDGET = (2000.0, 64)
+
+DEFAULT_REPEAT = 3  # 반복 가능한 항목은 이만큼 실행해 가장 짧은 시간을 기록
+RENDER_QUERIES = 5  # render_query를 잴 검색어 수 (SEARCH_QUERIES 앞에서부터)
+REFRESH_FRACTION = 0.01
+# 지도 영역 검색 화면 크기 (세로 범위 도, 가로는 두 배)와 화면별 질의 수
+AREA_VIEWS = {'city': 1.0, 'country': 10.0, 'continent': 60.0}
+AREA_QUERIES = 50
+
+# --- 합성 기사 어휘 ---
+COUNTRIES = {
+    "페루": "Peru", "칠레": "Chile", "브라질": "Brazil", "멕시코": "Mexico", "콜롬비아": "Colombia",
+    "아르헨티나": "Argentina", "볼리비아": "Bolivia", "에콰도르": "Ecuador", "베네수엘라": "Venezuela",
+    "과테말라": "Guatemala", "온두라스": "Honduras", "니카라과": "Nicaragua",
+}
+MAJOR_CATEGORIES = ["국내(정치)", "국내(사회)", "국내(경제)", "국내(범죄)", "국제(국제관계)"]
+MIDDLE_CATEGORIES = ["시민 항쟁", "노동 분쟁", "선거 갈등", "자원 개발", "원주민 권리", "치안 불안", "이주 문제", "외교 마찰"]
+KEYWORDS = ["시위", "파업", "선거", "부패", "광산", "토지", "원주민", "마약", "이주민", "국경", "인권", "개헌",
+            "물가", "연금", "환경", "댐 건설", "치안", "탄핵", "무역", "군부"]
+SUBJECTS = ["시민들이", "노동자들이", "원주민 공동체가", "학생들이", "야당이", "농민 단체가", "주민들이"]
+ACTIONS = ["정부 정책에 반대하는 집회를 열었", "대규모 행진을 벌였", "장관의 사퇴를 요구했", "법안 철회를 촉구했",
+           "도로를 점거했", "국제 사회의 관심을 호소했"]
+OUTCOMES = ["정부는 대화를 제안했", "경찰이 강경 진압에 나섰", "의회가 조사를 약속했", "양측의 협상은 결렬됐",
+            "사태는 장기화될 전망이"]
+# 스페인어 줄도 한글 글꼴 하나로 쓰므로(write_article_pdf) 악센트 없는 단어만 사용
+SPANISH_WORDS = ["gobierno", "protesta", "ciudadanos", "comunidad", "derechos", "elecciones", "mineria", "reforma",
+                 "policia", "congreso", "presidente", "movimiento", "indigena", "trabajadores", "crisis", "acuerdo"]
+START_DATE, DATE_SPAN_DAYS = date(2005, 1, 1), 20 * 365
+
+# 검색 질의 (앞쪽 RENDER_QUERIES개는 지도 생성 측정에도 사용)
+SEARCH_QUERIES = ["페루", "시위", "칠레 OR 페루", "국내(정치)", "광산 원주민", "선거", "브라질 파업", "마약 OR 치안",
+                  "도시1", "개헌 탄핵", "멕시코 이주민", "환경"]
+
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 50
+FONT_SIZE, LINE_HEIGHT, WRAP_CHARS = 9, 12, 42
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+_page_template = None  # 한글 글꼴이 등록된 빈 페이지 (프로세스마다 한 번 만듦)
+
+
+def cities_per_country(count):
+    """기사 수에 비례한 국가별 도시 수 (고유 지역명이 대략 기사 수의 1/4이 되도록)"""
+    return max(5, count // (4 * len(COUNTRIES)))
+
+
+def synthetic_article(i, count, seed=0):
+    """i번째 합성 기사의 필드 dict (같은 (i, count, seed)면 항상 같음)"""
+    rng = random.Random(f"{seed}-{i}")
+    country = rng.choice(list(COUNTRIES))
+    cities = cities_per_country(count)
+    locations = [country if rng.random() < 0.2 else f"{country}, 도시{rng.randrange(cities)}" for _ in range(rng.randint(1, 3))]
+    if rng.random() < 0.1:  # 이웃 국가도 함께 언급
+        other = rng.choice(list(COUNTRIES)); locations.append(f"{other}, 도시{rng.randrange(cities)}")
+    keywords = rng.sample(KEYWORDS, 4)
+    sentences = [f"{country}에서 {rng.choice(SUBJECTS)} {keywords[0]} 문제로 {rng.choice(ACTIONS)}다."]
+    sentences += [f"{rng.choice(['이후', '한편', '결국'])} {rng.choice(OUTCOMES)}다." for _ in range(rng.randint(1, 3))]
+    sentences.append(f"이번 사태는 {keywords[1]}와 {keywords[2]} 논란을 다시 불러일으켰다.")
+    return {
+        'date': START_DATE + timedelta(days=rng.randrange(DATE_SPAN_DAYS)),
+        'country': country,
+        'major': rng.choice(MAJOR_CATEGORIES),
+        'middle': rng.choice(MIDDLE_CATEGORIES),
+        'keywords': keywords,
+        'locations': list(dict.fromkeys(locations)),
+        'title': f"{country}: {keywords[0]}을 둘러싼 {rng.choice(MIDDLE_CATEGORIES)} {i}",
+        'original_title': " ".join(rng.choice(SPANISH_WORDS) for _ in range(6)).capitalize(),
+        'summary': " ".join(sentences),
+        'body': [" ".join(rng.choice(SPANISH_WORDS) for _ in range(7)).capitalize() + "." for _ in range(rng.randint(20, 60))],
+    }
+
+
+def article_filename(i, article):
+    return f"{article['date'].isoformat()}-{COUNTRIES[article['country']]}-{i:06d}-C.pdf"
+
+
+def _wrap(text, width=WRAP_CHARS):
+    return [text[start:start + width] for start in range(0, len(text), width)] or [""]
+
+
+def article_lines(i, article):
+    """PDF 표를 추출했을 때와 같은 줄 목록 (sampledata의 번호 표 형식)"""
+    en = COUNTRIES[article['country']]
+    rows = [
+        ("분류기호", [f"{en}-정치-C"]),
+        ("식별기호", [f"{article['date'].isoformat()}-{en}-{i:06d}-C"]),
+        ("제목", [article['title']]),
+        ("이벤트", [f"{article['keywords'][0]} 관련 {article['middle']}"]),
+        ("주제", [", ".join(article['keywords'][:3])]),
+        ("갈등 대분류", [article['major']]),
+        ("갈등 중분류", [article['middle']]),
+        ("갈등 소분류", [", ".join(article['keywords'])]),
+        ("위치", [" / ".join(article['locations'])]),
+        ("보도 일자", [article['date'].isoformat()]),
+        ("작성자", ["Redaccion"]),
+        ("출처(URL)", [f"Noticias de prueba #{i}", f"(https://example.org/bench/{i})"]),
+        ("원문 기사 제\n목", [article['original_title']]),
+        ("관련 이벤트", []),
+    ]
+    lines = ["메타 항목", "내용"]
+    for number, (name, values) in enumerate(rows, 1):
+        lines += [str(number), *name.split("\n"), *values]
+    lines += ["15", "기사 ", "텍스트", "(600자 ", "이내 ", "축약)", *_wrap(article['summary']), *article['body']]
+    return lines
+
+
+def write_article_pdf(path, lines):
+    """줄 목록을 페이지마다 한 번에 넣은 PDF.
+
+    PyMuPDF 내장 한글 글꼴(파일에 포함하지 않음)을 쓰고, 글꼴 등록이 문서마다 수 ms 걸리므로
+    등록해 둔 빈 페이지를 복사해 시작한다 (파일 하나 약 5ms, 4KB).
+    """
+    global _page_template
+    if _page_template is None:
+        _page_template = fitz.open()
+        _page_template.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT).insert_font(fontname="korea")
+    doc = fitz.open()
+    starts = range(0, len(lines), LINES_PER_PAGE)
+    for _ in starts: doc.insert_pdf(_page_template)
+    for page, start in zip(doc, starts):
+        page.insert_text((MARGIN, MARGIN), lines[start:start + LINES_PER_PAGE], fontname="korea", fontsize=FONT_SIZE,
+                         lineheight=LINE_HEIGHT / FONT_SIZE)
+    doc.save(path, garbage=1, deflate=True)
+    doc.close()
+
+
+def _write_range(folder, start, stop, count, seed):
+    for i in range(start, stop):
+        article = synthetic_article(i, count, seed)
+        write_article_pdf(Path(folder) / article_filename(i, article), article_lines(i, article))
+    return stop - start
+
+
+def generate_corpus(count, seed=0, folder=None, workers=None):
+    """(합성 PDF count개가 든 폴더, 이번에 새로 만들었는지). 같은 설정으로 이미 만든 폴더가 있으면 그대로 사용"""
+    folder = Path(folder or BENCH_DIR / f"corpus-{count}-seed{seed}")
+    marker = folder / ".corpus.json"
+    settings = {'count': count, 'seed': seed, 'version': GENERATOR_VERSION}
+    if marker.exists() and json.loads(marker.read_text()) == settings: return folder, False
+    if folder.exists(): shutil.rmtree(folder)
+    folder.mkdir(parents=True)
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, min(500, count // (workers * 4) or 1))
+    ranges = [(folder, first, min(first + chunk, count), count, seed) for first in range(0, count, chunk)]
+    if workers <= 1 or len(ranges) == 1:
+        for args in ranges: _write_range(*args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            list(executor.map(_write_range, *zip(*ranges)))
+    marker.write_text(json.dumps(settings))
+    return folder, True
+
+
+# --- 스텁 Nominatim 서버 (geopy가 그대로 접속하는 /search JSON 응답) ---
+def stub_coords(query):
+    """검색어별로 항상 같은 좌표 (국가 좌표 주변) 또는 STUB_NOT_FOUND_RATIO 비율로 None"""
+    digest = hashlib.sha1(query.encode()).digest()
+    if digest[0] < 256 * STUB_NOT_FOUND_RATIO: return None
+    lat, lon = MANUAL_LOCATION_CACHE.get(country_of(query), (0.0, -60.0))
+    return lat + (digest[1] / 255 - 0.5) * 4, lon + (digest[2] / 255 - 0.5) * 4
+
+
+@contextlib.contextmanager
+def stub_nominatim_server(latency_seconds=DEFAULT_STUB_LATENCY_MS / 1000):
+    """로컬 스텁 서버를 띄우고 'host:port'를 돌려줌 (make_nominatim_provider(domain=..., scheme='http')에 사용)"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # 실제 서버처럼 연결 재사용 (geopy 세션의 연결 풀)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query).get('q', [""])[0]
+            if latency_seconds: time.sleep(latency_seconds)
+            coords = stub_coords(query)
+            places = [{'lat': str(coords[0]), 'lon': str(coords[1]), 'display_name': query}] if coords else []
+            body = json.dumps(places).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown(); server.server_close()
+
+
+# --- 측정 ---
+def _timed(func, *args):
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started
+
+
+def _best_of(repeat, func, *args):
+    """repeat번 실행한 (마지막 결과, 가장 짧은 시간). 다른 프로세스 부하로 인한 흔들림을 줄임.
+
+    timeit과 같이 실행 중에는 순환 참조 GC를 끈다 (앞 단계가 남긴 객체 수에 따라 시간이 흔들리지 않도록).
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        gc.collect(); gc.disable()
+        try:
+            value, seconds = _timed(func, *args)
+        finally:
+            gc.enable()
+        best = seconds if best is None else min(best, seconds)
+    return value, best
+
+
+def _render_html(m):
+    return m.get_root().render()
+
+
+def run_benchmark(folder, count, seed=0, stub_latency_ms=DEFAULT_STUB_LATENCY_MS, workers=None, repeat=DEFAULT_REPEAT, parse_sample=2000):
+    """코퍼스 폴더 하나의 {측정 항목: 초}. 기사 인덱스/좌표 저장소는 임시 폴더에 새로 만들어 매번 처음부터 측정.
+
+    상태를 바꾸는 ingest/refresh/geocode_cold는 한 번, 나머지는 repeat번 중 가장 짧은 시간.
+    """
+    # pandas/folium을 쓰는 모듈은 측정할 때만 불러옴 (코퍼스 생성 워커 프로세스가 가볍게 뜨도록)
+    from aggregation import ArticleAggregates
+    from article_store import ArticleStore
+    from article_table import compact_articles, prepare_articles, searchable_articles, unique_locations
+    from data_watcher import LiveArticles
+    from date_index import DateIndex
+    from geo_resolver import AsyncResolver
+    from geocoding import Gazetteer, GeocodeStore, make_nominatim_provider
+    from map_render import build_map, build_map_data, build_overview_map
+    from pdf_parser import extract_pdf_text, parse_pdf_text
+    from search_index import SearchIndex
+    from spatial_index import SCAN_FRACTION, SpatialIndex
+
+    results = {}
+    # 좌표 변환 등의 진행 로그는 버림
+    with tempfile.TemporaryDirectory(prefix="newsmap-bench-") as work_dir, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        work_dir = Path(work_dir)
+        store = ArticleStore(work_dir / "articles.sqlite")
+        stats, results['ingest'] = _timed(store.sync, folder, None, None, workers)
+        if stats['failed']: raise RuntimeError(f"합성 PDF {stats['failed']}개 파싱 실패")
+
+        pdf_paths = sorted(Path(folder).glob("*.pdf"))[:parse_sample]
+        texts = [extract_pdf_text(pdf_path) for pdf_path in pdf_paths]
+        _, elapsed = _best_of(repeat, lambda: [parse_pdf_text(text) for text in texts])
+        results['parse_text'] = elapsed / len(texts)
+
+        df, results['load'] = _best_of(repeat, lambda: compact_articles(prepare_articles(store.load_dataframe(folder))))
+        searchable = searchable_articles(df)
+        (search_index, _, _), results['index'] = _best_of(repeat, lambda: (SearchIndex(searchable), ArticleAggregates(searchable), DateIndex(searchable)))
+
+        # 폴더 감시 갱신: 코퍼스 뒤 번호로 1%를 더 만들어 반영하고, 측정 후 지움
+        live = LiveArticles(folder, store, prepare=prepare_articles, searchable=searchable_articles)
+        extra = max(1, int(count * REFRESH_FRACTION))
+        extra_paths = []
+        for i in range(count, count + extra):
+            article = synthetic_article(i, count, seed)
+            extra_paths.append(Path(folder) / article_filename(i, article))
+            write_article_pdf(extra_paths[-1], article_lines(i, article))
+        try:
+            _, results['refresh'] = _timed(live.refresh)
+        finally:
+            for path in extra_paths: path.unlink(missing_ok=True)
+
+        labels_by_query, elapsed = _best_of(repeat, lambda: {query: search_index.search(query) for query in SEARCH_QUERIES})
+        results['search'] = elapsed / len(SEARCH_QUERIES)
+
+        locations = unique_locations(searchable)
+        with stub_nominatim_server(stub_latency_ms / 1000) as domain:
+            gazetteer = Gazetteer(GeocodeStore(work_dir / "geocode.sqlite"))
+            resolver = AsyncResolver(gazetteer, nominatim=make_nominatim_provider(domain=domain, scheme="http", min_delay_seconds=0),
+                                     nominatim_budget=STUB_BUDGET)
+            resolved, results['geocode_cold'] = _timed(resolver.resolve, locations)
+            _, results['geocode_warm'] = _best_of(repeat, resolver.resolve, locations)
+        coords = {loc: (lat, lon) for loc, (lat, lon, _) in resolved.items() if lat is not None}
+
+        def render_queries():
+            for query in SEARCH_QUERIES[:RENDER_QUERIES]:
+                articles = df.loc[labels_by_query[query]]
+                map_data = build_map_data(articles, coords)
+                if not map_data.empty: _render_html(build_map(map_data, articles)[0])
+        _, elapsed = _best_of(repeat, render_queries)
+        results['render_query'] = elapsed / RENDER_QUERIES
+
+        def render_area():
+            map_data = build_map_data(searchable, coords)
+            return _render_html(build_map(map_data, searchable, mode="clustered")[0])
+        _, results['render_area'] = _best_of(repeat, render_area)
+
+        aggregates = ArticleAggregates(searchable)
+        country_coords = gazetteer.known_coords(aggregates.by_country().index.tolist())
+        _, results['render_overview'] = _best_of(repeat, lambda: _render_html(build_overview_map(aggregates.by_country(), country_coords)))
+
+        # 지도 영역 검색: 좌표가 있는 위치 중 임의의 점을 가운데로 한 화면들
+        area_points = build_map_data(searchable, coords)
+        rng = random.Random(seed)
+        centers = [rng.randrange(len(area_points)) for _ in range(AREA_QUERIES)]
+        for suffix, scan_fraction in (("", SCAN_FRACTION), ("_cells", math.inf)):
+            index = SpatialIndex(area_points, scan_fraction=scan_fraction)
+            for view, span in AREA_VIEWS.items():
+                boxes = [(lat - span / 2, lon - span, lat + span / 2, lon + span)
+                         for lat, lon in area_points[['latitude', 'longitude']].to_numpy()[centers]]
+                _, elapsed = _best_of(repeat, lambda: [index.bbox_positions(*box) for box in boxes])
+                results[f'area_{view}{suffix}'] = elapsed / len(boxes)
+    return results
+
+
+# --- 기록과 회귀 판정 ---
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_history(path):
+    path = Path(path)
+    if not path.exists(): return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def append_history(path, record):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f: f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def compare(results, history, conditions, tolerance=REGRESSION_TOLERANCE, window=HISTORY_WINDOW):
+    """항목별 [(이름, 현재, 기준값 또는 None, 회귀 여부)].
+
+    기준값은 conditions(크기, 컴퓨터, 스텁 지연 등)가 같은 최근 window번 실행의 중앙값
+    """
+    previous = [record['results'] for record in history if all(record.get(key) == value for key, value in conditions.items())][-window:]
+    rows = []
+    for name, seconds in results.items():
+        values = [record[name] for record in previous if name in record]
+        baseline = statistics.median(values) if values else None
+        regressed = baseline is not None and seconds > baseline * (1 + tolerance) and seconds - baseline > MIN_REGRESSION_SECONDS
+        rows.append((name, seconds, baseline, regressed))
+    return rows
+
+
+def _format_seconds(seconds):
+    return f"{seconds * 1000:10.2f} ms" if seconds < 1 else f"{seconds:10.2f} s "
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 PDF 코퍼스로 적재/검색/좌표 변환/지도 생성 시간을 재고 이전 실행과 비교합니다.")
+    parser.add_argument("--sizes", default="1000", help="코퍼스 크기(기사 수) 목록 (기본값: 1000, 예: 1000,10000,100000)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 기사 시드 (기본값: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="PDF 생성/파싱 프로세스 수 (기본값: CPU 개수)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"반복 가능한 항목의 실행 횟수 (기본값: {DEFAULT_REPEAT})")
+    parser.add_argument("--stub-latency-ms", type=float, default=DEFAULT_STUB_LATENCY_MS, help=f"스텁 Nominatim 응답 지연 (기본값: {DEFAULT_STUB_LATENCY_MS})")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY_PATH), help=f"결과 기록 파일 (기본값: {DEFAULT_HISTORY_PATH})")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help=f"회귀로 볼 느려짐 비율 (기본값: {REGRESSION_TOLERANCE})")
+    parser.add_argument("--no-record", action="store_true", help="결과를 기록 파일에 추가하지 않음")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    host = platform.node()
+    regressions = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        (folder, built), generated = _timed(generate_corpus, size, args.seed, None, args.workers)
+        print(f"\n[기사 {size:,}개] 코퍼스 {folder} ({f'생성 {generated:.1f}s' if built else '기존 코퍼스 사용'})")
+        results = run_benchmark(folder, size, args.seed, args.stub_latency_ms, args.workers, args.repeat)
+        conditions = {'host': host, 'size': size, 'seed': args.seed, 'stub_latency_ms': args.stub_latency_ms}
+        for name, seconds, baseline, regressed in compare(results, history, conditions, args.tolerance):
+            change = f"기준 {_format_seconds(baseline).strip():>10} ({seconds / baseline:5.2f}배)" if baseline else "기준 없음"
+            print(f"  {name:<22}{_format_seconds(seconds)}  {change}{'  ← 회귀' if regressed else ''}")
+            if regressed: regressions.append(f"{size}:{name}")
+        record = {'time': datetime.now().isoformat(timespec='seconds'), 'commit': _git_commit(), 'cpus': os.cpu_count(),
+                  **conditions, 'results': results}
+        if not args.no_record: append_history(args.history, record)
+        history.append(record)
+
+    if regressions:
+        print(f"\n회귀 {len(regressions)}건: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""데이터 폴더 감시: 추가/변경/삭제된 PDF만 다시 파싱해 메모리의 기사 표와 검색 색인에 반영.
+
+LiveArticles는 (기사 표, 검색 색인, 기사 수 집계, 보도 일자 색인) 묶음(ArticleSnapshot)을 들고 있다가 바뀐 파일이 있으면 새 묶음을 만들어 통째로 교체한다.
+이미 이전 묶음을 받아 간 세션은 그대로 계속 쓰고, 다음 실행부터 새 묶음을 받는다(잠금은 갱신끼리만).
+새로 나온 지역명은 BackgroundGeocoder 큐로 넘겨 검색 전에 미리 좌표를 변환해 둔다.
+파일 변경 감지는 별도 의존성 없이 ArticleStore.sync의 (mtime, 크기) 비교를 주기적으로 실행하는 방식이다.
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from aggregation import ArticleAggregates
+from article_table import compact_articles, concat_articles, repack_locations, unique_locations
+from date_index import DateIndex
+from search_index import SearchIndex
+
+DEFAULT_POLL_SECONDS = 5.0
+# 삭제로 비어 있는 색인 위치가 이 비율을 넘으면 색인을 새로 만듦
+INDEX_REBUILD_DEAD_RATIO = 0.5
+# 검색 색인의 변경분 조각(delta)이 전체의 이 비율을 넘으면 한 조각으로 합침 (updated 비용이 delta 크기에 비례하므로)
+INDEX_MERGE_DELTA_RATIO = 0.05
+
+# 한 데이터 버전의 기사 표와 그로부터 만든 색인/집계 (검색 색인, 집계, 날짜 색인은 searchable 행 기준)
+ArticleSnapshot = namedtuple('ArticleSnapshot', ['df', 'search_index', 'aggregates', 'date_index'])
+
+
+class BackgroundGeocoder:
+    """지역명 목록을 받아 백그라운드 스레드에서 AsyncResolver로 변환하는 큐 (저장소에 없는 장소만)"""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="geocode-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, locations):
+        if locations: self._queue.put(list(locations))
+
+    def _run(self):
+        while True:
+            locations = self._queue.get()
+            # 밀려 있는 요청은 한 번에 모아서 변환
+            while not self._queue.empty():
+                locations += self._queue.get_nowait()
+            try:
+                pending = self.resolver.gazetteer.pending(locations)
+                if pending: self.resolver.resolve(pending)
+            except Exception as e:
+                print(f"백그라운드 좌표 변환 중 오류: {e}")
+
+
+class LiveArticles:
+    """폴더의 기사 표와 색인/집계(ArticleSnapshot). refresh()나 감시 스레드가 바뀐 PDF만 반영한다.
+
+    기사 표는 article_table.compact_articles 형식으로 보관한다.
+    prepare(df)는 불러온 기사 표(전체 또는 바뀐 파일분, 압축 전)를 정리하는 함수, searchable(df)는 검색 대상 행만 고르는 함수.
+    on_new_locations(지역명 목록)은 갱신으로 추가된 기사의 지역명을 받는다.
+    """
+
+    def __init__(self, folder, store, prepare=None, searchable=None, on_new_locations=None, on_progress=None, on_error=None):
+        self.folder = Path(folder)
+        self.store = store
+        self.prepare = prepare or (lambda df: df)
+        self.searchable = searchable or (lambda df: df)
+        self.on_new_locations = on_new_locations
+        self.last_update = None  # 마지막으로 반영한 변경 {'parsed_files', 'removed_files', 'failed', 'at', 'seconds'}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        store.sync(self.folder, on_progress=on_progress, on_error=on_error)
+        df = compact_articles(self.prepare(store.load_dataframe(self.folder)))
+        searchable = self.searchable(df)
+        self._snapshot = ArticleSnapshot(df, SearchIndex(searchable), ArticleAggregates(searchable), DateIndex(searchable))
+
+    def snapshot(self):
+        """현재 ArticleSnapshot. 항목들은 항상 같은 데이터 버전이며 받은 뒤에는 바뀌지 않는다."""
+        return self._snapshot
+
+    def refresh(self):
+        """폴더를 다시 확인해 바뀐 PDF만 파싱하고 반영. 반환: ArticleStore.sync 통계"""
+        with self._lock:
+            started = time.perf_counter()
+            stats = self.store.sync(self.folder, on_error=lambda name, e: print(f"'{name}' 파일 처리 중 오류 발생: {e}"))
+            changed, removed = stats['parsed_files'], stats['removed_files']
+            if not changed and not removed: return stats
+
+            old_df, old_index, old_aggregates, old_dates = self._snapshot
+            # 바뀐 기사의 지역은 기존 지역 표 뒤에 덧붙임 (기존 표를 쓰는 세션에는 영향 없음)
+            added = compact_articles(self.prepare(self.store.load_dataframe(self.folder, filenames=changed)),
+                                     locations=old_df.attrs['locations'])
+            dropped = [label for label in [*changed, *removed] if label in old_df.index]
+            df = concat_articles([old_df.drop(index=dropped), added], added.attrs['locations']).sort_index()
+            df.attrs['data_version'] = added.attrs['data_version']
+
+            searchable_added = self.searchable(added)
+            search_index = old_index.updated(removed_labels=[*changed, *removed], added=searchable_added)
+            # 집계는 빠진 기사 몫을 빼고 새 기사 몫을 더함 (지역명 기준이라 지역 번호를 다시 매겨도 그대로)
+            aggregates = old_aggregates.updated(removed=self.searchable(old_df.loc[dropped]), added=searchable_added)
+            date_index = old_dates.updated(removed_labels=[*changed, *removed], added=searchable_added)
+            if search_index.dead > len(search_index.base) * INDEX_REBUILD_DEAD_RATIO:
+                # 삭제가 많이 쌓이면 색인과 지역 번호 배열을 새로 만듦
+                df = repack_locations(df)
+                search_index = SearchIndex(self.searchable(df))
+            elif len(search_index.delta) > len(search_index) * INDEX_MERGE_DELTA_RATIO:
+                search_index = search_index.merged()
+            self._snapshot = ArticleSnapshot(df, search_index, aggregates, date_index)
+            self.last_update = {'parsed_files': changed, 'removed_files': removed, 'failed': stats['failed'],
+                                'at': time.time(), 'seconds': time.perf_counter() - started}
+
+        if self.on_new_locations and not added.empty:
+            self.on_new_locations(sorted(unique_locations(added)))
+        return stats
+
+    def start_watching(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        """poll_seconds마다 refresh()를 실행하는 데몬 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._thread and self._thread.is_alive(): return
+
+        def watch():
+            while not self._stop.wait(poll_seconds):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"데이터 폴더 갱신 중 오류: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=watch, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
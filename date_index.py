@@ -0,0 +1,97 @@
+"""보도 일자 색인 (기간 검색과 타임라인 재생용).
+
+기사별 날짜는 이벤트 열(보도 일자, 'YYYY-MM-DD...')에서, 없거나 잘못된 값이면 파일명 앞의 날짜
+('2015-06-08-Peru-01-C.pdf')에서 읽는다. 날짜순으로 정렬한 datetime64 배열과 같은 순서의 기사 라벨을 들고 있어
+기간 질의는 이진 탐색(np.searchsorted) 두 번으로 구간을 찾는다.
+SearchIndex와 같이 기사가 추가/변경/삭제되면 updated()로 새 색인을 만들고 기존 색인은 그대로 둔다.
+"""
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = '이벤트'
+_DATE_RE = r'^(\d{4}-\d{2}(?:-\d{2})?)'
+
+# 타임라인 구간 단위: 화면 선택지 -> pandas 기간 빈도
+WINDOW_LABELS = {"월": "M", "분기": "Q", "연": "Y"}
+
+
+def _parse_dates(values):
+    return pd.to_datetime(values.str.extract(_DATE_RE, expand=False), format='ISO8601', errors='coerce')
+
+
+def article_dates(df):
+    """기사별 보도 일자 Series (datetime64, 알 수 없으면 NaT)"""
+    from_index = _parse_dates(pd.Series(df.index.astype(str), index=df.index))
+    if DATE_COLUMN not in df.columns: return from_index
+    return _parse_dates(df[DATE_COLUMN].astype(str)).fillna(from_index)
+
+
+def time_windows(dates, freq):
+    """날짜들이 속한 기간 목록 [(이름, 시작 시각, 끝 시각)] (기사가 있는 기간만, 시간순)"""
+    periods = pd.PeriodIndex(dates.dropna(), freq=freq).unique().sort_values()
+    return [(str(period), period.start_time, period.end_time) for period in periods]
+
+
+class DateIndex:
+    """날짜순으로 정렬한 (보도 일자, 기사 라벨) 배열. 만든 뒤에는 바꾸지 않는다."""
+
+    def __init__(self, df=None, dates=None):
+        dates = (article_dates(df) if dates is None else dates).dropna()
+        order = np.argsort(dates.to_numpy(), kind='stable')
+        self.dates = dates.to_numpy()[order]
+        self.labels = dates.index.to_numpy()[order]
+        self.by_label = dates  # 라벨 -> 날짜 (검색 결과를 기간으로 거를 때 사용)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def bounds(self):
+        """(가장 이른 날짜, 가장 늦은 날짜) 또는 날짜가 하나도 없으면 None"""
+        if not len(self.dates): return None
+        return pd.Timestamp(self.dates[0]), pd.Timestamp(self.dates[-1])
+
+    def _span(self, start, end):
+        """start 이상 end 이하인 구간의 정렬 배열 위치 [lo, hi) (이진 탐색 두 번)"""
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), side='right')
+        return lo, hi
+
+    def range_labels(self, start, end):
+        """start 이상 end 이하인 기사 라벨 (날짜순)"""
+        lo, hi = self._span(start, end)
+        return self.labels[lo:hi].tolist()
+
+    def filter(self, labels, start, end):
+        """labels(검색 결과 등) 중 날짜가 start 이상 end 이하인 것만 원래 순서대로 (날짜가 없는 기사는 빠짐).
+
+        기간 구간은 이진 탐색으로 찾고, 구간이 labels보다 작으면(타임라인 구간 등) 구간의 라벨과 교집합을 구한다.
+        구간이 더 크면(전체에 가까운 기간) 구간을 펼치지 않고 labels의 날짜를 구간 경계와 비교한다.
+        """
+        lo, hi = self._span(start, end)
+        if hi - lo <= len(labels):
+            in_range = set(self.labels[lo:hi].tolist())
+            return [label for label in labels if label in in_range]
+        if lo >= hi: return []
+        first, last = self.dates[lo], self.dates[hi - 1]
+        dates = self.by_label.reindex(labels).to_numpy()
+        keep = (dates >= first) & (dates <= last)
+        return [label for label, ok in zip(labels, keep) if ok]
+
+    def dates_of(self, labels):
+        return self.by_label.reindex(labels)
+
+    def updated(self, removed_labels=(), added=None):
+        """removed_labels를 빼고 added(새 기사 행들)의 날짜를 넣은 새 색인 (정렬 배열에 끼워 넣음)"""
+        by_label = self.by_label.drop(index=[label for label in removed_labels if label in self.by_label.index])
+        keep = ~np.isin(self.labels, list(removed_labels)) if len(removed_labels) else np.ones(len(self.labels), dtype=bool)
+        dates, labels = self.dates[keep], self.labels[keep]
+        if added is not None and not added.empty:
+            new = article_dates(added).dropna().sort_values(kind='stable')
+            # 같은 날짜면 기존 기사 뒤에 오도록 side='right'
+            positions = np.searchsorted(dates, new.to_numpy(), side='right')
+            dates = np.insert(dates, positions, new.to_numpy())
+            labels = np.insert(labels.astype(object), positions, new.index.to_numpy().astype(object))
+            by_label = pd.concat([by_label, new])
+        index = DateIndex.__new__(DateIndex)
+        index.dates, index.labels, index.by_label = dates, labels, by_label
+        return index
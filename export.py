@@ -0,0 +1,247 @@
+"""헤드리스 일괄 내보내기: 기사 위치 GeoJSON, 대분류별 GeoJSON, 자주 쓰는 검색어의 지도 HTML.
+
+Streamlit 없이 앱과 같은 경로(ArticleStore로 PDF 파싱 → 영구 좌표 저장소/AsyncResolver로 좌표 변환 →
+map_render로 지도 생성)를 거쳐 CDN에 올리거나 바로 열 수 있는 정적 파일을 만든다.
+버전은 기사 데이터 버전 + 좌표 + 검색어 + 내보내기 형식의 해시라 입력이 같으면 같은 버전이 되고 다시 만들지 않는다.
+임시 폴더에 모두 쓴 뒤 <출력 폴더>/<버전>으로 옮기고 latest.json을 바꾸므로, 읽는 쪽은 반쯤 쓴 묶음을 보지 않는다.
+--force로 같은 버전을 다시 만들면 '<버전>-<생성 시각>' 폴더에 만들고 latest.json을 바꾼 뒤에야 예전 폴더를 지운다.
+    latest.json                      {'version', 'bundle', 'created', 'path'} (가장 최근 묶음, path는 manifest 경로)
+    <버전>/manifest.json             생성 정보, 기사/위치 수, 파일별 크기와 sha256, 검색어 -> 지도 파일
+    <버전>/articles.geojson          기사의 위치 하나 = Point Feature 하나 (속성: 기사 정보)
+    <버전>/categories/<대분류>.geojson
+    <버전>/maps/query-<검색어>.html  검색 결과 지도 (앱의 '자동' 표시 방식)
+    <버전>/maps/overview-*.html      국가별 기사 수 원 지도 / 지역 열지도
+
+실행: python export.py sampledata --out dist --queries "페루,칠레 OR 페루,시위"
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+from aggregation import ArticleAggregates, country_coords_with_fallback
+from article_store import DEFAULT_INDEX_PATH, ArticleStore
+from article_table import column_values, compact_articles, prepare_articles, searchable_articles, unique_locations
+from geo_resolver import AsyncResolver
+from geocoding import DEFAULT_GAZETTEER_PATH, Gazetteer, GeocodeStore, make_nominatim_provider, make_openai_provider
+from map_render import OVERVIEW_LAYER_LABELS, build_map, build_map_data, build_overview_map
+from search_index import SearchIndex
+
+# 파일 형식이나 속성이 바뀌면 올려서 같은 입력이라도 새 버전을 만들게 함
+EXPORT_FORMAT_VERSION = 1
+DEFAULT_OUTPUT_DIR = Path("dist")
+# --queries를 주지 않으면 기사가 많은 국가 이름들을 검색어로 사용
+DEFAULT_TOP_COUNTRIES = 10
+# GeoJSON Feature 속성으로 내보내는 기사 열
+PROPERTY_COLUMNS = ['기사제목', 'original_title', '대분류', '중분류', '소분류', '이벤트', '기사링크', '요약']
+
+
+def slugify(name):
+    """파일 이름에 쓸 수 있는 이름 (한글은 그대로, 기호/공백은 '-')"""
+    return re.sub(r'[^\w]+', '-', str(name)).strip('-').lower() or "unknown"
+
+
+def unique_slugs(names):
+    """{이름: 겹치지 않는 slug} ('국내(정치)'와 '국내 정치'처럼 같은 slug가 되면 뒤에 번호를 붙임)"""
+    slugs, used = {}, set()
+    for name in names:
+        slug = base = slugify(name)
+        n = 2
+        while slug in used: slug = f"{base}-{n}"; n += 1
+        slugs[name] = slug; used.add(slug)
+    return slugs
+
+
+def article_features(articles, map_data):
+    """마커 표(map_render.build_map_data) 한 행 = Point Feature 하나. 속성은 기사 열 + article/location"""
+    columns = [col for col in PROPERTY_COLUMNS if col in articles.columns or col == '기사링크']
+    info = {col: column_values(articles, col).reindex(map_data['article']).astype(str).tolist() for col in columns}
+    features = []
+    for i, (article, location, lat, lon) in enumerate(zip(map_data['article'], map_data['location'], map_data['latitude'], map_data['longitude'])):
+        properties = {'article': article, 'location': location, **{col: values[i] for col, values in info.items()}}
+        # GeoJSON 좌표 순서는 [경도, 위도]
+        features.append({'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [round(lon, 6), round(lat, 6)]}, 'properties': properties})
+    return features
+
+
+def feature_collection(features, **metadata):
+    return {'type': 'FeatureCollection', 'metadata': metadata, 'features': features}
+
+
+def write_json(path, obj):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj, ensure_ascii=False, separators=(',', ':')), encoding="utf-8")
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""): digest.update(block)
+    return digest.hexdigest()
+
+
+def export_version(data_version, coords, queries):
+    """입력(기사 데이터 버전, 좌표, 검색어, 형식)이 같으면 같은 값"""
+    key = json.dumps([EXPORT_FORMAT_VERSION, data_version, sorted(coords.items()), list(queries)], ensure_ascii=False)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def resolve_coords(gazetteer, locations, resolver=None):
+    """{지역명: (lat, lon)}. resolver가 있으면 저장소에 없는 장소를 먼저 변환해 저장 (없으면 저장된 좌표만)"""
+    if resolver is not None:
+        pending = gazetteer.pending(locations)
+        if pending:
+            print(f"좌표 변환: 새로 조회할 장소 {len(pending)}개")
+            resolver.resolve(pending)
+    return gazetteer.known_coords(locations)
+
+
+def default_queries(aggregates, top=DEFAULT_TOP_COUNTRIES):
+    return aggregates.by_country().head(top).index.tolist()
+
+
+def build_bundle(df, coords, bundle_dir, queries):
+    """bundle_dir에 GeoJSON/지도 파일을 쓰고 manifest에 넣을 내용(dict)을 반환"""
+    searchable = searchable_articles(df)
+    map_data = build_map_data(searchable, coords)
+    files = {}
+
+    started = time.perf_counter()
+    features = article_features(searchable, map_data)
+    write_json(bundle_dir / "articles.geojson", feature_collection(features, articles=int(map_data['article'].nunique())))
+    files['articles'] = "articles.geojson"
+    categories = {}
+    category_of = column_values(searchable, '대분류').astype(str).reindex(map_data['article']).tolist()
+    by_category = {}
+    for feature, category in zip(features, category_of): by_category.setdefault(category, []).append(feature)
+    for category, slug in unique_slugs(sorted(by_category)).items():
+        path = f"categories/{slug}.geojson"
+        write_json(bundle_dir / path, feature_collection(by_category[category], category=category))
+        categories[category] = path
+    print(f"GeoJSON: 위치 {len(features)}개, 대분류 {len(categories)}개 ({time.perf_counter() - started:.2f}s)")
+
+    started = time.perf_counter()
+    (bundle_dir / "maps").mkdir(parents=True, exist_ok=True)
+    search_index = SearchIndex(searchable)
+    maps = {}
+    for query, slug in unique_slugs(queries).items():
+        articles = df.loc[search_index.search(query)]
+        query_map_data = build_map_data(articles, coords)
+        if query_map_data.empty: print(f"  '{query}': 지도에 표시할 위치 없음"); continue
+        path = f"maps/query-{slug}.html"
+        m, mode = build_map(query_map_data, articles)
+        m.save(bundle_dir / path)
+        maps[query] = {'path': path, 'articles': len(articles), 'locations': len(query_map_data), 'mode': mode}
+
+    aggregates = ArticleAggregates(searchable)
+    location_coords = {loc: coords[loc] for loc in aggregates.by_location().index if loc in coords}
+    country_coords = country_coords_with_fallback(location_coords, {c: coords[c] for c in aggregates.by_country().index if c in coords})
+    overviews = {}
+    for label, layer in OVERVIEW_LAYER_LABELS.items():
+        counts, layer_coords = (aggregates.by_location(), location_coords) if layer == "heatmap" else (aggregates.by_country(), country_coords)
+        m = build_overview_map(counts, layer_coords, layer)
+        if m is None: continue
+        path = f"maps/overview-{layer}.html"
+        m.save(bundle_dir / path)
+        overviews[layer] = {'path': path, 'label': label}
+    print(f"지도 HTML: 검색어 {len(maps)}개, 개요 {len(overviews)}개 ({time.perf_counter() - started:.2f}s)")
+
+    return {'articles': len(searchable), 'locations': len(map_data), 'files': files, 'categories': categories,
+            'queries': maps, 'overviews': overviews}
+
+
+def bundle_dirs(out_dir, version):
+    """이 버전의 완성된(manifest가 있는) 묶음 폴더들, 오래된 것부터"""
+    dirs = [Path(out_dir) / version, *sorted(Path(out_dir).glob(f"{version}-*"))]
+    return [d for d in dirs if (d / "manifest.json").is_file()]
+
+
+def export_bundle(df, coords, out_dir=DEFAULT_OUTPUT_DIR, queries=(), force=False):
+    """<out_dir>/<버전>/에 묶음을 만들고 latest.json을 갱신. 반환: manifest dict (이미 있는 버전이면 기존 manifest)"""
+    out_dir = Path(out_dir)
+    version = export_version(df.attrs.get('data_version'), coords, queries)
+    existing = bundle_dirs(out_dir, version)
+    if existing and not force:
+        print(f"버전 {version}은 이미 있습니다 (--force로 다시 생성)")
+        bundle_dir = existing[-1]
+        manifest = json.loads((bundle_dir / "manifest.json").read_text(encoding="utf-8"))
+        existing = []
+    else:
+        # 같은 버전이 이미 있으면 새 이름으로 만들어, latest.json을 바꿀 때까지 기존 묶음을 그대로 둠
+        bundle_dir = out_dir / version
+        if bundle_dir.exists(): bundle_dir = out_dir / f"{version}-{datetime.now():%Y%m%dT%H%M%S%f}"
+        tmp_dir = out_dir / f".{bundle_dir.name}.tmp"
+        if tmp_dir.exists(): shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+        contents = build_bundle(df, coords, tmp_dir, queries)
+        manifest = {'version': version, 'format': EXPORT_FORMAT_VERSION, 'created': datetime.now().isoformat(timespec='seconds'),
+                    'bundle': bundle_dir.name, 'data_version': df.attrs.get('data_version'), **contents}
+        manifest['sizes'] = {str(path.relative_to(tmp_dir)): {'bytes': path.stat().st_size, 'sha256': file_digest(path)}
+                             for path in sorted(tmp_dir.rglob("*")) if path.is_file()}
+        write_json(tmp_dir / "manifest.json", manifest)
+        os.replace(tmp_dir, bundle_dir)
+
+    latest = out_dir / "latest.json"
+    tmp_latest = out_dir / f".latest.{os.getpid()}.tmp"
+    write_json(tmp_latest, {'version': version, 'bundle': bundle_dir.name, 'created': manifest['created'],
+                            'path': f"{bundle_dir.name}/manifest.json"})
+    os.replace(tmp_latest, latest)
+    # 다시 만든 경우, latest.json이 새 묶음을 가리킨 뒤에 예전 묶음을 지움
+    for old_dir in existing: shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기사 위치 GeoJSON과 지도 HTML을 정적 파일 묶음으로 내보냅니다.")
+    parser.add_argument("folder", nargs="?", default="sampledata", help="PDF 폴더 (기본값: sampledata)")
+    parser.add_argument("--out", default=str(DEFAULT_OUTPUT_DIR), help=f"출력 폴더 (기본값: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--queries", default=None, help=f"지도를 미리 만들 검색어 (쉼표로 구분, 기본값: 기사가 많은 국가 {DEFAULT_TOP_COUNTRIES}개)")
+    parser.add_argument("--articles-db", default=str(DEFAULT_INDEX_PATH), help=f"기사 인덱스 경로 (기본값: {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--db", default=str(DEFAULT_GAZETTEER_PATH), help=f"좌표 저장소 경로 (기본값: {DEFAULT_GAZETTEER_PATH})")
+    parser.add_argument("--offline", action="store_true", help="네트워크 좌표 조회 없이 저장된 좌표만 사용")
+    parser.add_argument("--no-openai", action="store_true", help="OpenAI 좌표 검색을 사용하지 않음")
+    parser.add_argument("--nominatim-domain", default=None, help="Nominatim 서버 주소 (예: localhost:8080 스텁 서버)")
+    parser.add_argument("--nominatim-scheme", default=None, help="Nominatim 접속 scheme (http/https)")
+    parser.add_argument("--force", action="store_true", help="같은 버전이 있어도 다시 생성")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    article_store = ArticleStore(args.articles_db)
+    stats = article_store.sync(args.folder, on_error=lambda name, e: print(f"'{name}' 파일 처리 중 오류 발생: {e}"))
+    df = compact_articles(prepare_articles(article_store.load_dataframe(args.folder)))
+    print(f"기사 {len(df)}개 (새로 파싱 {stats['parsed']}개, 실패 {stats['failed']}개) ({time.perf_counter() - started:.2f}s)")
+
+    gazetteer = Gazetteer(GeocodeStore(args.db))
+    resolver = None
+    if not args.offline:
+        openai_provider = None
+        if not args.no_openai and os.environ.get("OPENAI_API_KEY"):
+            from openai import OpenAI
+            openai_provider = make_openai_provider(OpenAI(api_key=os.environ["OPENAI_API_KEY"]), delay_seconds=0)
+        # 제공자 호출 간격은 AsyncResolver의 토큰 버킷이 관리
+        resolver = AsyncResolver(
+            gazetteer,
+            nominatim=make_nominatim_provider(domain=args.nominatim_domain, scheme=args.nominatim_scheme, min_delay_seconds=0),
+            openai=openai_provider,
+        )
+    searchable = searchable_articles(df)
+    locations = unique_locations(searchable)
+    aggregates = ArticleAggregates(searchable)
+    # 국가 이름도 개요 지도에 쓰므로 함께 변환
+    coords = resolve_coords(gazetteer, [*locations, *aggregates.by_country().index], resolver)
+    print(f"좌표: 지역정보 {len(locations)}개 중 {sum(loc in coords for loc in locations)}개")
+
+    queries = [q.strip() for q in args.queries.split(",") if q.strip()] if args.queries else default_queries(aggregates)
+    manifest = export_bundle(df, coords, args.out, queries, force=args.force)
+    total = sum(entry['bytes'] for entry in manifest['sizes'].values())
+    print(f"내보내기 완료: {Path(args.out) / manifest.get('bundle', manifest['version'])} (파일 {len(manifest['sizes'])}개, {total / 1e6:.1f}MB, "
+          f"총 {time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""asyncio 기반 동시 좌표 변환기.
+
+저장소에 없는 장소들을 한꺼번에 변환한다. 장소마다 geocoding.RESOLVE_STAGES 단계(Nominatim → OpenAI → 국가명)를 독립적으로 진행하므로
+한 장소가 OpenAI 단계에 있는 동안 다른 장소는 Nominatim 단계를 진행할 수 있다.
+제공자별 호출 빈도는 각자의 토큰 버킷으로 제한하고, 같은 (제공자, 검색어) 호출이 진행 중이면 그 결과를 공유한다.
+토큰 버킷/스레드 풀/진행 중인 호출은 해석기 하나에 하나씩이므로, 여러 스레드가 동시에 resolve를 호출해도 같은 예산을 나눠 쓴다.
+"""
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from geocoding import MANUAL_LOCATION_CACHE, resolve_stages, stage_result
+from metrics import increment
+
+# 제공자별 기본 호출 예산 (초당 호출 수, 버스트 크기). Nominatim 이용 정책은 초당 1회
+NOMINATIM_BUDGET = (1 / 1.1, 1)
+OPENAI_BUDGET = (5.0, 5)
+
+# 동기 제공자(geopy, openai 동기 클라이언트)를 동시에 실행할 스레드 수. 실제 호출 빈도는 토큰 버킷이 제한
+MAX_PROVIDER_THREADS = 32
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷.
+
+    토큰이 모자라면 미리 예약(잔량을 음수로)하고 그 차례까지 기다리므로, 여러 이벤트 루프/스레드가 한 버킷을 나눠 써도 된다.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """토큰 하나를 예약하고 그 토큰을 쓸 수 있을 때까지 남은 초를 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait: await asyncio.sleep(wait)
+
+
+class AsyncResolver:
+    """Gazetteer 저장소를 공유하면서 미변환 장소들을 동시에 변환하는 해석기.
+
+    nominatim/openai 제공자는 query -> (lat, lon) 또는 None 인 일반 함수(스레드에서 실행) 또는 async 함수.
+    내부 지연이 있는 제공자를 넘기면 예산이 이중으로 적용되므로 지연 없이 만든 제공자를 넘긴다.
+    """
+
+    def __init__(self, gazetteer, nominatim=None, openai=None, nominatim_budget=NOMINATIM_BUDGET, openai_budget=OPENAI_BUDGET):
+        self.gazetteer = gazetteer
+        self.providers = {'nominatim': nominatim, 'openai': openai}
+        self.budgets = {'nominatim': nominatim_budget, 'openai': openai_budget}
+        # 모든 resolve 호출이 공유하는 상태: 제공자별 토큰 버킷, 스레드 풀, 진행 중인 호출 {(제공자, 검색어): Future}
+        self._buckets = {name: TokenBucket(*budget) for name, budget in self.budgets.items()}
+        self._executor = ThreadPoolExecutor(max_workers=MAX_PROVIDER_THREADS, thread_name_prefix="geocode-provider")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    async def _call_provider(self, name, query, run):
+        # 같은 (제공자, 검색어) 호출은 resolve 한 번 안에서 한 번만 실행하고 결과(또는 진행 중인 작업)를 공유
+        key = (name, query)
+        if key not in run:
+            run[key] = asyncio.ensure_future(self._shared_call(name, query))
+        return await run[key]
+
+    async def _shared_call(self, name, query):
+        # 다른 resolve 호출(다른 스레드의 이벤트 루프)이 같은 호출을 진행 중이면 그 결과를 기다림
+        key = (name, query)
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner: future = self._in_flight[key] = Future()
+        # shield: 기다리던 쪽이 취소돼도 공유 Future는 취소하지 않음
+        if not owner: return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await self._run_provider(name, query)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock: del self._in_flight[key]
+
+    async def _run_provider(self, name, query):
+        provider = self.providers[name]
+        await self._buckets[name].acquire()
+        if inspect.iscoroutinefunction(provider): return await provider(query)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, provider, query)
+
+    async def _resolve_one(self, location_str, run):
+        """geocoding.RESOLVE_STAGES 순서대로 시도 (제공자 호출은 토큰 버킷/중복 호출 공유를 거침)"""
+        providers = {name for name, provider in self.providers.items() if provider}
+        for method, name, query in resolve_stages(location_str, providers):
+            coords, error = None, None
+            try:
+                coords = MANUAL_LOCATION_CACHE.get(query) if name is None else await self._call_provider(name, query, run)
+            except Exception as e:
+                error = e
+            result = stage_result(location_str, method, name, query, coords, error)
+            if result: return result
+        print(f"All Geocoding attempts FAILED for '{location_str}'")
+        return None, None, 'failed'
+
+    async def resolve_async(self, locations, on_result=None):
+        """{장소: (lat, lon, method)}를 반환. on_result(장소, lat, lon, method)는 끝나는 순서대로 호출"""
+        locations = list(dict.fromkeys(locations))
+        # 저장소/수동 좌표로 답할 수 있는 장소는 한 번의 조회로 가져온 기록을 그대로 사용
+        known, pending = self.gazetteer.partition(locations)
+        pending = set(pending)
+        results = {}
+        if known: increment('cache_requests', len(known), cache='gazetteer', result='hit')
+        if pending: increment('cache_requests', len(pending), cache='gazetteer', result='miss')
+        for location_str in locations:
+            if location_str in known:
+                results[location_str] = known[location_str]
+                if on_result: on_result(location_str, *results[location_str])
+
+        # 이번 resolve 호출 안의 제공자 호출 {(제공자, 검색어): Task}. 같은 국가명 등은 끝난 뒤에도 재사용
+        run = {}
+
+        async def resolve_and_store(location_str):
+            lat, lon, method = await self._resolve_one(location_str, run)
+            self.gazetteer.store.put(location_str, lat, lon, method)
+            increment('geocode_results', method=method)
+            return location_str, (lat, lon, method)
+
+        for finished in asyncio.as_completed([resolve_and_store(loc) for loc in locations if loc in pending]):
+            location_str, result = await finished
+            results[location_str] = result
+            if on_result: on_result(location_str, *result)
+        return results
+
+    def resolve(self, locations, on_result=None):
+        """동기 코드(Streamlit 스크립트)에서 쓰는 진입점"""
+        return asyncio.run(self.resolve_async(locations, on_result=on_result))
+
@@ -0,0 +1,336 @@
+"""지역정보 문자열 → 좌표 변환 (수동 캐시 → Nominatim → OpenAI → 국가명 순서)과 영구 좌표 저장소.
+
+성공/실패와 변환 방법을 SQLite(gazetteer)에 기록해 프로세스가 바뀌어도 같은 장소를 다시 조회하지 않는다.
+일괄 사전 변환: python geocoding.py sampledata
+"""
+import argparse
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from metrics import increment, timer
+
+DEFAULT_GAZETTEER_PATH = Path(".cache") / "geocode.sqlite"
+
+# 실패 기록은 이 시간이 지나면 다시 시도 (일시적인 네트워크 오류가 영구 실패로 남지 않도록)
+FAILED_RETRY_SECONDS = 24 * 60 * 60
+
+# 변환 방법 → 로그 표시용 이름
+METHOD_LABELS = {
+    'manual': "수동 캐시",
+    'nominatim': "Geopy",
+    'openai': "OpenAI",
+    'country': "국가명",
+    'failed': "실패",
+}
+
+MANUAL_LOCATION_CACHE = {
+    "페루, 리마, Plaza San Martín": (-12.0505, -77.0339),
+    "페루, 리마": (-12.0464, -77.0428),
+    "페루, 리마, Comas": (-11.9333, -77.0500),
+    "페루, 리마 & Callao": (-12.0464, -77.0428),
+    "볼리비아, 라파스": (-16.4897, -68.1193),
+    "미국, 콜로라도, Aurora": (39.7294, -104.8319),
+    "아르헨티나": (-38.4161, -63.6167),
+    "벨리즈": (17.1899, -88.4976),
+    "볼리비아": (-16.2902, -63.5887),
+    "브라질": (-14.2350, -51.9253),
+    "칠레": (-35.6751, -71.5430),
+    "콜롬비아": (4.5709, -74.2973),
+    "코스타리카": (9.7489, -83.7534),
+    "쿠바": (21.5218, -77.7812),
+    "도미니카 공화국": (18.7357, -70.1627),
+    "에콰도르": (-1.8312, -78.1834),
+    "엘살바도르": (13.7942, -88.8965),
+    "과테말라": (15.7835, -90.2308),
+    "온두라스": (15.2000, -86.2419),
+    "멕시코": (23.6345, -102.5528),
+    "니카라과": (12.8654, -85.2072),
+    "파나마": (8.5380, -80.7821),
+    "파라과이": (-23.4425, -58.4438),
+    "페루": (-9.1900, -75.0152),
+    "우루과이": (-32.5228, -55.7658),
+    "베네수엘라": (6.4238, -66.5897),
+    "아이티": (18.9712, -72.2852),
+    "자메이카": (18.1096, -77.2975),
+    "푸에르토리코": (18.2208, -66.5901),
+    "트리니다드 토바고": (10.6918, -61.2225),
+    "가이아나": (4.8604, -58.9302),
+    "수리남": (3.9193, -56.0278),
+    "프랑스령 기아나": (3.9339, -53.1258),
+}
+
+
+# --- 좌표 제공자: 모두 query -> (lat, lon) 또는 None 형태의 함수 ---
+def make_nominatim_provider(user_agent="Mozilla/5.0", domain=None, scheme=None, min_delay_seconds=1.1):
+    """geopy Nominatim을 요청 간격 제한과 함께 감싼 제공자. domain을 주면 로컬 스텁 서버로 보낼 수 있음"""
+    from geopy.extra.rate_limiter import RateLimiter
+    from geopy.geocoders import Nominatim
+
+    kwargs = {'user_agent': user_agent}
+    if domain: kwargs['domain'] = domain
+    if scheme: kwargs['scheme'] = scheme
+    # 재시도 후에도 실패하면 예외를 그대로 올려 호출 측에서 오류로 기록 (None은 '찾지 못함'만 뜻함)
+    geocode = RateLimiter(Nominatim(**kwargs).geocode, min_delay_seconds=min_delay_seconds, swallow_exceptions=False)
+
+    def nominatim(query):
+        with timer('external_call', provider='nominatim', call='geocode'):
+            location = geocode(query, timeout=10)
+        return (location.latitude, location.longitude) if location else None
+    return nominatim
+
+
+def make_openai_provider(client, model="gpt-4o", delay_seconds=1.1):
+    """OpenAI에게 좌표를 묻는 제공자. 모르는 장소거나 응답을 해석할 수 없으면 None"""
+    def openai_coords(location_str):
+        with timer('external_call', provider='openai', call='geocode'):
+            response = client.chat.completions.create(model=model, messages=coords_messages(location_str), max_tokens=20, temperature=0.0)
+        if delay_seconds: time.sleep(delay_seconds) # OpenAI 호출 후에도 약간의 지연 추가 (API 호출 제한 방지)
+        result_text = response.choices[0].message.content.strip()
+        return parse_coords_reply(result_text, location_str)
+    return openai_coords
+
+
+def coords_messages(location_str):
+    prompt = f"다음 장소의 위도(latitude)와 경도(longitude)를 'latitude, longitude' 형식으로 소수점 4자리까지 알려주세요. 모르면 'None, None'이라고 답해주세요.\n장소: \"{location_str}\"\n좌표:"
+    return [{"role": "system", "content": "You provide geographical coordinates."}, {"role": "user", "content": prompt}]
+
+
+def parse_coords_reply(result_text, location_str=""):
+    """'latitude, longitude' 형식의 모델 응답을 (lat, lon)으로 변환, 실패 시 None"""
+    coords = result_text.split(',')
+    if len(coords) != 2:
+        print(f"OpenAI Geocoding: Unexpected response format for '{location_str}': {result_text}"); return None
+    lat_str, lon_str = coords[0].strip(), coords[1].strip()
+    if lat_str.lower() == 'none' or lon_str.lower() == 'none':
+        print(f"OpenAI Geocoding: Could not find coordinates for '{location_str}'"); return None
+    try:
+        lat, lon = float(lat_str), float(lon_str)
+    except ValueError:
+        print(f"OpenAI Geocoding: Could not parse coordinates from '{result_text}' for '{location_str}'"); return None
+    return lat, lon
+
+
+def clean_location(location_str):
+    # 'A & B' 형태는 앞쪽 장소만 사용
+    return re.sub(r'\s*&.*', '', location_str).strip()
+
+
+def country_of(location_str):
+    return location_str.split(',')[0].strip()
+
+
+def as_is(location_str):
+    return location_str
+
+
+# 좌표 변환 단계 (위에서부터 시도해 처음 좌표를 얻은 단계의 방법을 기록): (방법, 제공자 이름, 장소 -> 검색어)
+# 제공자 이름이 None인 단계는 수동 좌표(MANUAL_LOCATION_CACHE)에서 찾음. 동기(resolve_location)/비동기(geo_resolver) 변환이 공유
+RESOLVE_STAGES = (
+    ('manual', None, as_is),
+    ('nominatim', 'nominatim', clean_location),
+    ('openai', 'openai', as_is),
+    ('country', None, country_of),
+    ('country', 'nominatim', country_of),
+)
+STAGE_LOG_LABELS = {'nominatim': "Geopy", 'openai': "OpenAI Geocoding"}
+
+
+def resolve_stages(location_str, providers):
+    """location_str에 시도할 [(방법, 제공자 이름, 검색어)]. providers: 사용할 수 있는 제공자 이름들"""
+    if location_str == "정보 없음" or not location_str: return []
+    return [(method, name, to_query(location_str)) for method, name, to_query in RESOLVE_STAGES if name is None or name in providers]
+
+
+def stage_result(location_str, method, name, query, coords=None, error=None):
+    """단계 하나의 결과를 로그로 남기고, 좌표를 얻었으면 (lat, lon, method) 아니면 None"""
+    if name is None: return (*coords, method) if coords else None
+    label = STAGE_LOG_LABELS[name] + (" Country Fallback" if method == 'country' else "")
+    if error is not None: print(f"{label} Error for '{location_str}' ('{query}'): {error}"); return None
+    if not coords: print(f"{label}: Location not found for '{location_str}' ('{query}')"); return None
+    print(f"{label} SUCCESS for '{location_str}' ('{query}'): {coords}")
+    return (*coords, method)
+
+
+def resolve_location(location_str, nominatim=None, openai=None):
+    """RESOLVE_STAGES 순서대로 시도해 (lat, lon, method)를 반환. 모두 실패하면 (None, None, 'failed')"""
+    providers = {name: provider for name, provider in (('nominatim', nominatim), ('openai', openai)) if provider}
+    for method, name, query in resolve_stages(location_str, providers):
+        coords, error = None, None
+        try:
+            coords = MANUAL_LOCATION_CACHE.get(query) if name is None else providers[name](query)
+        except Exception as e:
+            error = e
+        result = stage_result(location_str, method, name, query, coords, error)
+        if result: return result
+    if location_str and location_str != "정보 없음": print(f"All Geocoding attempts FAILED for '{location_str}'")
+    return None, None, 'failed'
+
+
+class GeocodeStore:
+    """지역정보 문자열별 변환 결과(성공/실패, 방법, 시각)를 보관하는 SQLite 저장소"""
+
+    def __init__(self, db_path=DEFAULT_GAZETTEER_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS locations (
+                    location TEXT PRIMARY KEY,
+                    lat REAL,
+                    lon REAL,
+                    method TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self):
+        """with 블록 = 트랜잭션 하나 (정상 종료 시 커밋, 예외 시 롤백). 끝나면 연결을 바로 닫음"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn: yield conn
+        finally:
+            conn.close()
+
+    def get(self, location_str):
+        """(lat, lon, method, updated_at) 또는 기록이 없으면 None"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT lat, lon, method, updated_at FROM locations WHERE location = ?", (location_str,)
+            ).fetchone()
+
+    def get_many(self, locations):
+        locations = list(locations); found = {}
+        with self._connect() as conn:
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(locations), 500):
+                chunk = locations[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT location, lat, lon, method, updated_at FROM locations WHERE location IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                found.update({loc: (lat, lon, method, updated_at) for loc, lat, lon, method, updated_at in rows})
+        return found
+
+    def put(self, location_str, lat, lon, method):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO locations VALUES (?, ?, ?, ?, ?)",
+                         (location_str, lat, lon, method, time.time()))
+
+    def stats(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT method, COUNT(*) FROM locations GROUP BY method").fetchall())
+
+
+class Gazetteer:
+    """저장소를 먼저 보고, 없거나 오래된 실패 기록일 때만 제공자에게 물어보는 좌표 조회기"""
+
+    def __init__(self, store=None, nominatim=None, openai=None, failed_retry_seconds=FAILED_RETRY_SECONDS):
+        self.store = store or GeocodeStore()
+        self.nominatim = nominatim
+        self.openai = openai
+        self.failed_retry_seconds = failed_retry_seconds
+
+    def is_fresh(self, record):
+        if record is None: return False
+        lat, lon, method, updated_at = record
+        return method != 'failed' or time.time() - updated_at < self.failed_retry_seconds
+
+    def lookup(self, location_str):
+        """(lat, lon, method)를 반환. 새로 변환한 결과는 성공/실패 모두 저장"""
+        if location_str == "정보 없음" or not location_str: return None, None, 'failed'
+        if location_str in MANUAL_LOCATION_CACHE:
+            increment('cache_requests', cache='gazetteer', result='hit'); return (*MANUAL_LOCATION_CACHE[location_str], 'manual')
+        record = self.store.get(location_str)
+        if self.is_fresh(record):
+            increment('cache_requests', cache='gazetteer', result='hit'); return record[:3]
+        increment('cache_requests', cache='gazetteer', result='miss')
+        lat, lon, method = resolve_location(location_str, nominatim=self.nominatim, openai=self.openai)
+        self.store.put(location_str, lat, lon, method)
+        increment('geocode_results', method=method)
+        return lat, lon, method
+
+    def partition(self, locations):
+        """({네트워크 조회 없이 답할 수 있는 장소: (lat, lon, method)}, 저장소에 유효한 기록이 없는 장소 목록).
+
+        저장소는 get_many로 한 번에 조회한다. 적중/실패 지표는 세지 않는다 (호출 측에서 셈).
+        """
+        known = {}; candidates = []
+        for loc in dict.fromkeys(locations):
+            if loc == "정보 없음" or not loc: known[loc] = (None, None, 'failed')
+            elif loc in MANUAL_LOCATION_CACHE: known[loc] = (*MANUAL_LOCATION_CACHE[loc], 'manual')
+            else: candidates.append(loc)
+        records = self.store.get_many(candidates); pending = []
+        for loc in candidates:
+            if self.is_fresh(records.get(loc)): known[loc] = records[loc][:3]
+            else: pending.append(loc)
+        return known, pending
+
+    def pending(self, locations):
+        """저장소에 유효한 기록이 없는(=네트워크 조회가 필요한) 장소 목록"""
+        return self.partition(locations)[1]
+
+    def known_coords(self, locations):
+        """수동 좌표/저장소에 이미 좌표가 있는 장소의 {지역명: (lat, lon)} (네트워크 조회 없음)"""
+        locations = list(dict.fromkeys(locations))
+        coords = {loc: MANUAL_LOCATION_CACHE[loc] for loc in locations if loc in MANUAL_LOCATION_CACHE}
+        records = self.store.get_many([loc for loc in locations if loc not in coords])
+        coords.update({loc: (lat, lon) for loc, (lat, lon, method, updated_at) in records.items() if lat is not None})
+        return coords
+
+    def resolved_count(self):
+        """저장소에서 좌표 변환에 성공한 장소 수 (새 좌표가 생겼는지 확인하는 용도)"""
+        return sum(count for method, count in self.store.stats().items() if method != 'failed')
+
+
+def main():
+    from article_store import DEFAULT_INDEX_PATH, ArticleStore
+    from geo_resolver import AsyncResolver
+
+    parser = argparse.ArgumentParser(description="기사 인덱스의 모든 지역정보를 미리 좌표로 변환해 저장합니다.")
+    parser.add_argument("folder", nargs="?", default="sampledata", help="PDF 폴더 (기본값: sampledata)")
+    parser.add_argument("--articles-db", default=str(DEFAULT_INDEX_PATH), help=f"기사 인덱스 경로 (기본값: {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--db", default=str(DEFAULT_GAZETTEER_PATH), help=f"좌표 저장소 경로 (기본값: {DEFAULT_GAZETTEER_PATH})")
+    parser.add_argument("--retry-failed", action="store_true", help="실패로 기록된 장소도 다시 시도")
+    parser.add_argument("--no-openai", action="store_true", help="OpenAI 좌표 검색을 사용하지 않음")
+    parser.add_argument("--nominatim-domain", default=None, help="Nominatim 서버 주소 (예: localhost:8080 스텁 서버)")
+    parser.add_argument("--nominatim-scheme", default=None, help="Nominatim 접속 scheme (http/https)")
+    args = parser.parse_args()
+
+    article_store = ArticleStore(args.articles_db)
+    article_store.sync(args.folder, on_error=lambda name, e: print(f"'{name}' 파일 처리 중 오류 발생: {e}"))
+    df = article_store.load_dataframe(args.folder)
+    locations = [loc for loc_list in df.get('지역정보', []) for loc in loc_list]
+
+    openai_provider = None
+    if not args.no_openai and os.environ.get("OPENAI_API_KEY"):
+        from openai import OpenAI
+        openai_provider = make_openai_provider(OpenAI(api_key=os.environ["OPENAI_API_KEY"]), delay_seconds=0)
+    gazetteer = Gazetteer(
+        GeocodeStore(args.db),
+        failed_retry_seconds=0 if args.retry_failed else FAILED_RETRY_SECONDS,
+    )
+    # 제공자 호출 간격은 AsyncResolver의 토큰 버킷이 관리
+    resolver = AsyncResolver(
+        gazetteer,
+        nominatim=make_nominatim_provider(domain=args.nominatim_domain, scheme=args.nominatim_scheme, min_delay_seconds=0),
+        openai=openai_provider,
+    )
+
+    pending = gazetteer.pending(locations)
+    print(f"고유 지역정보 {len(set(locations))}개 중 {len(pending)}개 변환 필요")
+    done = 0
+    def on_result(location_str, lat, lon, method):
+        nonlocal done; done += 1
+        print(f"[{done}/{len(pending)}] {location_str} -> {(lat, lon) if lat is not None else '실패'} ({METHOD_LABELS[method]})")
+    resolver.resolve(pending, on_result=on_result)
+    print(f"저장소 현황: {gazetteer.store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
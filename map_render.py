@@ -0,0 +1,180 @@
+"""검색 결과 folium 지도 생성.
+
+마커가 적으면 기존처럼 팝업에 요약까지 담은 마커를 그리고, 많으면 제목·날짜만 담은 압축 배열을
+브라우저에서 클러스터로 그린다(FastMarkerCluster). 후자의 요약은 마커를 클릭했을 때
+records_at()으로 해당 위치의 기사만 찾아 지도 아래에 보여준다.
+전체 개요 지도(build_overview_map)는 기사 마커 대신 aggregation.py의 지역/국가별 기사 수로 그린다.
+
+마커 표(map_data)는 build_map_data()가 만드는 DataFrame이며, 기사 내용은 article 라벨로 원본 표에서 찾는다.
+확장성 측정: python map_render.py
+"""
+import folium
+import pandas as pd
+from folium.plugins import FastMarkerCluster, HeatMap
+
+from article_table import compact_articles, explode_locations
+
+MARKER_COLORS = {'국내(사회)': 'red', '국내(경제)': 'green', '국내(범죄)': 'black', '국제(국제관계)': 'purple', '정치': 'blue'}
+DEFAULT_MARKER_COLOR = 'gray'
+
+# 화면 선택지 -> build_map의 mode
+MAP_MODE_LABELS = {"자동": "auto", "상세 마커": "detailed", "클러스터": "clustered"}
+# 화면 선택지 -> build_overview_map의 layer
+OVERVIEW_LAYER_LABELS = {"국가별 기사 수": "countries", "지역 열지도": "heatmap"}
+# 국가별 원의 반지름 범위 (px, 기사 수의 제곱근에 비례)
+BUBBLE_RADIUS = (4, 30)
+
+# 마커가 이보다 많으면 요약을 미리 넣지 않는 클러스터 모드로 그림
+DETAILED_MARKER_LIMIT = 100
+# 클러스터 모드에서 브라우저로 보내는 제목 길이
+COMPACT_TITLE_LENGTH = 60
+
+# 클러스터 모드 마커: row = [lat, lon, 제목, 색상, 보도 일자]. 제목은 textContent로 넣어 HTML로 해석되지 않게 함
+_COMPACT_MARKER_CALLBACK = """
+var callback = function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {radius: 7, color: row[3], fillColor: row[3], fillOpacity: 0.7, weight: 2});
+    var content = document.createElement('div');
+    var title = document.createElement('b'); title.textContent = row[2]; content.appendChild(title);
+    var meta = document.createElement('div'); meta.textContent = '시간: ' + row[4]; content.appendChild(meta);
+    var hint = document.createElement('i'); hint.textContent = '요약은 지도 아래에 표시됩니다'; content.appendChild(hint);
+    marker.bindPopup(content, {maxWidth: 300});
+    marker.bindTooltip(row[2]);
+    return marker;
+};
+"""
+
+
+def marker_color(category):
+    return MARKER_COLORS.get(category, DEFAULT_MARKER_COLOR)
+
+
+def build_map_data(articles, location_coords):
+    """기사별 지역정보(압축 형식, article_table.py)를 펼쳐 좌표표와 붙인 마커 표를 반환 (한 행 = 한 기사의 한 위치).
+
+    열: key, article(articles의 인덱스 라벨), location, latitude, longitude. 좌표가 없는 위치는 빠지고,
+    같은 기사의 같은 위치는 한 번만 남는다. 기사 내용은 복사하지 않고 article 라벨로 참조한다.
+    """
+    markers = explode_locations(articles)[['article', 'location']]
+    coords = pd.DataFrame(
+        [(loc, lat, lon) for loc, (lat, lon) in location_coords.items() if lat is not None and lon is not None],
+        columns=['location', 'latitude', 'longitude'],
+    ).astype({'latitude': float, 'longitude': float})
+    markers = markers.merge(coords, on='location', how='inner', sort=False)
+    # 동일 기사, 동일 위치에 마커 중복 생성 방지 (해시 기반이라 선형 시간)
+    markers = markers.drop_duplicates(['article', 'location'], ignore_index=True)
+    markers.insert(0, 'key', markers['article'].astype(str) + '_' + markers['location'].astype(str))
+    return markers
+
+
+def map_center(map_data):
+    return [float(map_data['latitude'].mean()), float(map_data['longitude'].mean())]
+
+
+def popup_html(row_data, key):
+    return f"""
+    <h4>{row_data['기사제목']}</h4>
+    <i>{row_data['original_title']}</i><br><br>
+    <b>시간:</b> {row_data['이벤트']}<br>
+    <b>분류:</b> {row_data['대분류']} > {row_data['중분류']} > {row_data['소분류']}<br>
+    <a href="{row_data['기사링크']}" target="_blank">기사 원문 보기</a>
+    <hr>
+    <div id="details_{key}" style="display:none; max-height: 150px; overflow-y: auto;">
+        <b>요약:</b><p>{row_data['요약']}</p>
+    </div>
+    <button onclick="
+        var el = document.getElementById('details_{key}');
+        if (el.style.display == 'none') {{
+            el.style.display = 'block'; this.textContent = '요약 닫기';
+        }} else {{
+            el.style.display = 'none'; this.textContent = '요약 보기';
+        }}
+    ">요약 보기</button>
+    """
+
+
+def build_detailed_map(map_data, articles):
+    """마커마다 요약이 들어간 팝업을 붙이는 기존 방식"""
+    m = folium.Map(location=map_center(map_data), zoom_start=4)
+    for marker in map_data.itertuples(index=False):
+        row_data = articles.loc[marker.article] # 해당 마커의 원본 기사 데이터
+        iframe = folium.IFrame(popup_html(row_data, marker.key), width=350, height=280)
+        popup = folium.Popup(iframe, max_width=350)
+        folium.Marker(
+            location=[marker.latitude, marker.longitude],
+            popup=popup,
+            icon=folium.Icon(color=marker_color(row_data['대분류'])),
+            tooltip=row_data['기사제목'] # 툴팁은 한국어 제목 유지
+        ).add_to(m)
+    return m
+
+
+def build_clustered_map(map_data, articles):
+    """제목/색상/날짜만 담은 배열을 브라우저에서 클러스터 마커로 그리는 방식 (요약은 클릭 시 별도 표시)"""
+    m = folium.Map(location=map_center(map_data), zoom_start=4)
+    info = articles.loc[map_data['article'], ['기사제목', '대분류', '이벤트']].astype(str)
+    titles = info['기사제목'].where(info['기사제목'].str.len() <= COMPACT_TITLE_LENGTH,
+                                   info['기사제목'].str.slice(0, COMPACT_TITLE_LENGTH - 1) + "…")
+    colors = info['대분류'].map(MARKER_COLORS).fillna(DEFAULT_MARKER_COLOR)
+    rows = [list(row) for row in zip(map_data['latitude'], map_data['longitude'], titles, colors, info['이벤트'])]
+    FastMarkerCluster(rows, callback=_COMPACT_MARKER_CALLBACK).add_to(m)
+    return m
+
+
+def build_map(map_data, articles, mode="auto"):
+    """(folium.Map, 실제 사용한 모드)를 반환. mode: 'auto' | 'detailed' | 'clustered'"""
+    if mode == "auto":
+        mode = "detailed" if len(map_data) <= DETAILED_MARKER_LIMIT else "clustered"
+    if mode == "clustered": return build_clustered_map(map_data, articles), mode
+    return build_detailed_map(map_data, articles), mode
+
+
+def build_overview_map(counts, coords, layer="countries"):
+    """이름별 기사 수(Series)와 {이름: (lat, lon)}으로 그린 개요 지도. 좌표가 없는 이름은 빠진다.
+
+    layer: 'countries'(개수에 비례한 원, 툴팁에 이름과 개수) | 'heatmap'(개수를 가중치로 한 열지도)
+    """
+    points = [(name, *coords[name], int(count)) for name, count in counts.items() if count > 0 and coords.get(name)]
+    if not points: return None
+    m = folium.Map(location=[sum(p[1] for p in points) / len(points), sum(p[2] for p in points) / len(points)], zoom_start=3)
+    if layer == "heatmap":
+        # 브라우저로는 고유 지역 수만큼의 [위도, 경도, 개수]만 보냄
+        HeatMap([[lat, lon, count] for _, lat, lon, count in points], radius=25, blur=18, min_opacity=0.3).add_to(m)
+        return m
+    largest = max(p[3] for p in points)
+    for name, lat, lon, count in points:
+        folium.CircleMarker(
+            location=[lat, lon], radius=BUBBLE_RADIUS[0] + (BUBBLE_RADIUS[1] - BUBBLE_RADIUS[0]) * (count / largest) ** 0.5,
+            color='#3186cc', fill=True, fill_opacity=0.5, weight=1, tooltip=f"{name}: {count}건",
+        ).add_to(m)
+    return m
+
+
+def records_at(map_data, lat, lon, precision=6):
+    """클릭한 좌표에 있는 마커 행들 (같은 좌표의 기사가 여럿일 수 있음)"""
+    mask = (map_data['latitude'].round(precision) == round(lat, precision)) & (map_data['longitude'].round(precision) == round(lon, precision))
+    return map_data[mask]
+
+
+def main():
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="build_map_data가 마커 수에 따라 얼마나 걸리는지 측정합니다 (합성 데이터).")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="마커 수 목록 (기본값: 1000,10000,100000)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    for size in (int(s) for s in args.sizes.split(",")):
+        # 기사당 위치 2개, 위치 종류는 마커 수의 1/10 (실제 데이터처럼 같은 지명이 여러 기사에 반복)
+        locations = [f"국가{i % 30}, 도시{i}" for i in range(max(1, size // 10))]
+        articles = compact_articles(pd.DataFrame({'지역정보': [random.sample(locations, min(2, len(locations))) for _ in range(size // 2)]}))
+        location_coords = {loc: (random.uniform(-50, 30), random.uniform(-110, -30)) for loc in locations}
+        started = time.perf_counter()
+        map_data = build_map_data(articles, location_coords)
+        elapsed = time.perf_counter() - started
+        print(f"마커 {len(map_data):>7,}개: {elapsed * 1000:8.1f} ms ({elapsed / max(1, len(map_data)) * 1e6:.2f} µs/마커)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""처리 단계별 소요 시간, 외부 호출 수, 캐시 적중률, 실패 수 지표.
+
+프로세스 전역 REGISTRY 하나에 모은다. 시간은 고정 구간 히스토그램(Prometheus 방식)으로, 호출/적중/실패는 카운터로 센다.
+    with timer('stage', stage='search'): ...   →  newsmap_stage_seconds{stage="search"} 히스토그램
+                                                   (예외가 나면 newsmap_stage_failures_total{stage="search"} 증가)
+    increment('cache_requests', cache='query', result='hit')  →  newsmap_cache_requests_total{...}
+앱의 관리자 패널(주소 뒤에 ?admin=1)에서 표로 보고, Prometheus 텍스트 형식 파일(.cache/metrics.prom)로도
+주기적으로 내보내므로 node_exporter textfile collector 등으로 수집할 수 있다.
+
+지표 파일 출력: python metrics.py (현재 프로세스의 지표라 보통은 앱이 쓴 파일을 본다)
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+METRIC_PREFIX = "newsmap_"
+DEFAULT_METRICS_PATH = Path(".cache") / "metrics.prom"
+DEFAULT_WRITE_SECONDS = 15.0
+# 히스토그램 구간 상한 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'stage_seconds': "처리 단계별 소요 시간 (PDF 파싱, 데이터 로드, 검색, 좌표 변환, 지도 생성)",
+    'stage_failures_total': "처리 단계별 실패 수",
+    'external_call_seconds': "외부 API 호출 시간 (제공자, 호출 종류별)",
+    'external_call_failures_total': "외부 API 호출 실패 수",
+    'cache_requests_total': "캐시 조회 수 (result=hit|miss)",
+    'geocode_results_total': "새로 변환한 장소의 변환 방법별 수",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_key, extra=()):
+    pairs = [*label_key, *extra]
+    if not pairs: return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound: break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1; self.count += 1; self.sum += value
+
+    def quantile(self, q):
+        """q 분위수의 추정값 (해당 구간의 상한, 마지막 구간이면 None)"""
+        if not self.count: return None
+        target, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target: return bound
+        return None
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}  # (이름, 라벨) -> 값
+        self._histograms = {}  # (이름, 라벨) -> Histogram
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def increment(self, name, amount=1, **labels):
+        key = (f"{name}_total", _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = (f"{name}_seconds", _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None: histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with 블록 시간을 {name}_seconds에 기록하고, 예외가 나면 {name}_failures_total도 증가 (예외는 그대로 전달)"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment(f"{name}_failures", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_values(self, name):
+        """{라벨 dict를 튜플로: 값} (name은 _total을 뺀 이름)"""
+        with self._lock:
+            return {labels: value for (metric, labels), value in self._counters.items() if metric == f"{name}_total"}
+
+    def histogram_rows(self, name):
+        """관리자 패널용 행 목록: 라벨별 {라벨..., 'count', 'mean', 'p50', 'p95', 'failures'}"""
+        failures = self.counter_values(f"{name}_failures")
+        with self._lock:
+            items = [(labels, histogram) for (metric, labels), histogram in self._histograms.items() if metric == f"{name}_seconds"]
+            rows = [{**dict(labels), 'count': histogram.count, 'mean': histogram.sum / histogram.count,
+                     'p50': histogram.quantile(0.5), 'p95': histogram.quantile(0.95), 'failures': failures.pop(labels, 0)}
+                    for labels, histogram in sorted(items)]
+        # 시간이 기록되지 않고 실패만 센 라벨도 표시
+        rows += [{**dict(labels), 'count': 0, 'mean': None, 'p50': None, 'p95': None, 'failures': value} for labels, value in failures.items()]
+        return rows
+
+    def render(self):
+        """Prometheus 텍스트 형식"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            snapshot = [(key, (list(h.counts), h.count, h.sum)) for key, h in histograms]
+        described = set()
+
+        def describe(metric, kind):
+            if metric in described: return
+            described.add(metric)
+            name = metric[len(METRIC_PREFIX):]
+            if name in HELP: lines.append(f"# HELP {metric} {HELP[name]}")
+            lines.append(f"# TYPE {metric} {kind}")
+
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            describe(metric, "counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        for (name, labels), (counts, count, total) in snapshot:
+            metric = METRIC_PREFIX + name
+            describe(metric, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        lines.append(f"{METRIC_PREFIX}process_start_time_seconds {self.started_at:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=DEFAULT_METRICS_PATH):
+        """임시 파일에 쓴 뒤 교체하므로 수집기가 반쯤 쓴 파일을 읽지 않음"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def start_textfile_writer(self, path=DEFAULT_METRICS_PATH, interval_seconds=DEFAULT_WRITE_SECONDS):
+        """interval_seconds마다 지표 파일을 쓰는 데몬 스레드"""
+        def write_forever():
+            while True:
+                try:
+                    self.write_textfile(path)
+                except OSError as e:
+                    print(f"지표 파일 저장 중 오류: {e}")
+                time.sleep(interval_seconds)
+
+        thread = threading.Thread(target=write_forever, name="metrics-writer", daemon=True)
+        thread.start()
+        return thread
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear(); self._histograms.clear()
+
+
+REGISTRY = MetricsRegistry()
+increment = REGISTRY.increment
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="앱이 쓴 지표 파일을 출력합니다.")
+    parser.add_argument("path", nargs="?", default=str(DEFAULT_METRICS_PATH), help=f"지표 파일 경로 (기본값: {DEFAULT_METRICS_PATH})")
+    args = parser.parse_args()
+    path = Path(args.path)
+    if not path.exists(): print(f"'{path}' 파일이 없습니다. 앱을 실행하면 {DEFAULT_WRITE_SECONDS:.0f}초마다 갱신됩니다."); return
+    print(path.read_text(encoding="utf-8"), end="")
+
+
+if __name__ == "__main__":
+    main()
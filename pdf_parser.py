@@ -0,0 +1,341 @@
+import bisect
+import multiprocessing
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from metrics import increment, observe
+
+# 파서 출력 형식이 바뀌면 올려서 저장된 기사 인덱스를 다시 파싱하게 함
+PARSER_VERSION = 1
+
+# 이보다 파일이 적으면 프로세스 풀 기동 비용이 더 커서 순차 처리
+MIN_FILES_FOR_POOL = 8
+
+
+def extract_pdf_text(pdf_path, max_chars=None):
+    """PDF 페이지 텍스트를 이어붙여 반환. max_chars를 주면 그만큼 모인 뒤의 페이지는 읽지 않고 잘라서 반환"""
+    with fitz.open(pdf_path) as doc:
+        if max_chars is None: return "".join(page.get_text("text", sort=False) for page in doc)
+        parts = []; length = 0
+        for page in doc:
+            if length >= max_chars: break
+            parts.append(page.get_text("text", sort=False)); length += len(parts[-1])
+        return "".join(parts)[:max_chars]
+
+
+# --- 필드 추출: 패턴은 모듈 로드 시 한 번만 컴파일 ---
+# PDF 표는 '\n<번호>\n<필드 이름>\n<값>' 형태로 추출되고, 값은 다음 '\n<번호>\n' 또는 '\n--- PAGE' 직전에서 끝남
+FIELD_NAMES = {
+    '대분류': ["갈등 대분류"],
+    '중분류': ["갈등 중분류"],
+    '소분류': ["갈등 소분류"],
+    '위치': ["위치"],
+    '기사제목': ["제목"],
+    '이벤트': ["보도 일자"],
+    'original_title': ["원문 기사 제목", "원문 기사 제 목", "원문 기사 제\n목"],
+}
+URL_FIELD_NAME = "출처(URL)"
+
+# 경계 하나당 앞의 줄바꿈 하나만 소비하므로 '\n1\n2\n'처럼 겹친 경계도 모두 찾음
+_BOUNDARY_RE = re.compile(r'\n(?=(\d{1,2})\n|--- PAGE)')
+_WHITESPACE_NEWLINE_RE = re.compile(r'\s*\n\s*')
+_NON_SPACE_RE = re.compile(r'\S')
+
+# 쉼표/따옴표(CSV) 형식: 따옴표로 감싼 필드 이름이 있는 문서에서만 시도
+_CSV_FIELD_RES = {
+    name: re.compile(rf'"[^"]*"\s*,\s*"{re.escape(name)}"\s*,\s*"([^"]*)"')
+    for names in FIELD_NAMES.values() for name in names
+}
+_QUOTED_KEY_RE = re.compile('"(?=(' + '|'.join(re.escape(name) for name in [*_CSV_FIELD_RES, URL_FIELD_NAME]) + ')")')
+
+_URL_CSV_RE = re.compile(r'(https?://[^\s)]+)')
+_URL_NEWLINE_RE = re.compile(r'[^\n]*\n\((https?://[^\)]+)\)')
+
+_SUMMARY_KEY_RE = re.compile(
+    r'(기사 텍스트\s*\(\s*600자\s*이내\s*축약\s*\)|기사\s*텍스트\s*\(600자\s*이내\s*\n\s*축약\)|"관련 이벤트")',
+    re.DOTALL | re.IGNORECASE,
+)
+_SUMMARY_ARG_RE = re.compile(r'^\s*,\s*,(.*?)(?=\n"\d{1,2}"\s*,|\n,,"기사 텍스트")', re.DOTALL)
+_LEADING_COMMAS_RE = re.compile(r'^,,', re.MULTILINE)
+_LEADING_COMMAS_WS_RE = re.compile(r'^\s*,,', re.MULTILINE)
+
+
+class NumberedFieldLayout:
+    """문서를 한 번 훑어 번호 경계와 필드 이름 위치를 모아 두고, 필드 값은 위치 계산으로 꺼냄"""
+
+    def __init__(self, text):
+        self.text = text
+        self.boundaries = []  # 값의 끝이 될 수 있는 모든 경계 위치 (오름차순)
+        self.headers = {}  # 필드 이름 첫 줄 -> [(번호, 이름 시작 위치), ...] (문서 순서)
+        for match in _BOUNDARY_RE.finditer(text):
+            self.boundaries.append(match.start())
+            number = match.group(1)
+            if number is None: continue
+            start = match.start() + len(number) + 2
+            end = text.find('\n', start)
+            if end != -1: self.headers.setdefault(text[start:end], []).append((number, start))
+        # CSV 형식 필드 이름이 하나라도 있으면 그 이름들만 기록
+        self.quoted_keys = {m.group(1) for m in _QUOTED_KEY_RE.finditer(text)} if '"' in text else set()
+
+    def value_start(self, field_name, number=None):
+        """'\n<번호>\n<field_name>\n' 이 나오는 곳마다 그 바로 뒤(값 시작) 위치를 문서 순서대로 돌려줌"""
+        key = field_name + '\n'
+        for header_number, start in self.headers.get(field_name.split('\n', 1)[0], ()):
+            if number is not None and header_number != number: continue
+            if self.text.startswith(key, start): yield start + len(key)
+
+    def value_end(self, start):
+        i = bisect.bisect_left(self.boundaries, start)
+        return self.boundaries[i] if i < len(self.boundaries) else len(self.text)
+
+    def field_span(self, field_name_variations):
+        """(값, 값이 끝난 위치, 찾은 이름 변형 번호). 못 찾으면 ("정보 없음", None, None)"""
+        for variation, field_name in enumerate(field_name_variations):
+            # 1. 쉼표/따옴표 기반 패턴
+            if field_name in self.quoted_keys:
+                match_csv = _CSV_FIELD_RES[field_name].search(self.text)
+                if match_csv: return match_csv.group(1).strip().strip('""'), match_csv.end(), variation
+            # 2. 줄바꿈 기반 패턴
+            for start in self.value_start(field_name):
+                end = self.value_end(start)
+                return _WHITESPACE_NEWLINE_RE.sub(' ', self.text[start:end]).strip(), end, variation
+        return "정보 없음", None, None
+
+    def field(self, field_name_variations):
+        """(수정) 필드 이름(키)에 줄바꿈이 있는 경우도 처리"""
+        return self.field_span(field_name_variations)[0]
+
+    def url_span(self):
+        """(링크, 링크가 끝난 위치). 못 찾으면 ("링크 없음", None)"""
+        text = self.text
+        if URL_FIELD_NAME in self.quoted_keys:
+            key_end = text.index(f'"{URL_FIELD_NAME}"') + len(URL_FIELD_NAME) + 2
+            url_match = _URL_CSV_RE.search(text, key_end)
+            if url_match: return url_match.group(1).strip().strip(')"'), url_match.end()
+        for start in self.value_start(URL_FIELD_NAME, number='12'):
+            match_newline_url = _URL_NEWLINE_RE.match(text, start)
+            if match_newline_url: return match_newline_url.group(1).strip(), match_newline_url.end()
+        return "링크 없음", None
+
+    def url(self):
+        return self.url_span()[0]
+
+    def url_absent_settled(self):
+        """url_span()이 못 찾았을 때, 뒤 페이지를 더 읽어도 못 찾는지 (줄바꿈 형식의 12번 행이 모두 '(' 없이 끝남)"""
+        if self.quoted_keys: return False
+        for start in self.value_start(URL_FIELD_NAME, number='12'):
+            line_end = self.text.find('\n', start)
+            if line_end == -1 or line_end + 1 >= len(self.text) or self.text[line_end + 1] == '(': return False
+        return True
+
+
+def _is_summary_tail(text, end):
+    """'다.' 뒤가 공백 후 '\n<라틴 문자>' / '\n--- PAGE' / 문서 끝으로 이어지는지 (원문 스페인어 기사 시작)"""
+    after = end
+    while after < len(text) and text[after].isspace(): after += 1
+    if after == len(text): return True
+    if after == end or text[after - 1] != '\n': return False
+    char = text[after]
+    return 'A' <= char <= 'Z' or 'a' <= char <= 'z' or 'À' <= char <= 'ÿ' or text.startswith('--- PAGE', after)
+
+
+def find_summary(text, start):
+    """start 이후 공백을 건너뛴 곳부터, 원문 기사 직전에 오는 첫 '<한글>다.'까지의 구간 (없으면 None).
+
+    정규식 '^\\s*(.*?[가-힣]\\s*다\\.)\\s*(?=\\n[A-ZÀ-ÿa-z]|\\n--- PAGE|\\Z)'와 같은 결과를
+    '다.' 위치만 찾아가며 계산한다.
+    """
+    begin = start
+    while begin < len(text) and text[begin].isspace(): begin += 1
+    position = text.find('다.', begin)
+    while position != -1:
+        # '다' 앞의 공백을 건너뛴 글자가 한글 음절이어야 함
+        before = position - 1
+        while before >= begin and text[before].isspace(): before -= 1
+        if before >= begin and '\uAC00' <= text[before] <= '\uD7A3' and _is_summary_tail(text, position + 2):
+            return text[begin:position + 2]
+        position = text.find('다.', position + 1)
+    return None
+
+
+def summary_span(text):
+    """(요약, 문서를 더 읽어도 요약이 바뀌지 않는지). text가 문서 앞부분일 때 두 번째 값으로 확정 여부를 판단"""
+    summary = "요약 정보 없음"; settled = False
+    summary_key_match = _SUMMARY_KEY_RE.search(text)
+    if summary_key_match:
+        summary_content = find_summary(text, summary_key_match.end())
+        if summary_content is not None:
+            # 요약 뒤 공백이 text 끝까지 이어지면 다음 페이지에 따라 달라질 수 있음
+            summary_end = text.index(summary_content, summary_key_match.end()) + len(summary_content)
+            settled = _NON_SPACE_RE.search(text, summary_end) is not None
+            summary = _LEADING_COMMAS_RE.sub('', summary_content.strip()); summary = _WHITESPACE_NEWLINE_RE.sub(' ', summary); summary = summary.strip().strip('"')
+        elif '"관련 이벤트"' in summary_key_match.group(1):
+            summary_match_arg = _SUMMARY_ARG_RE.search(text[summary_key_match.end():])
+            if summary_match_arg:
+                summary_test = _LEADING_COMMAS_WS_RE.sub('', summary_match_arg.group(1)).strip().strip('"'); summary_test = _WHITESPACE_NEWLINE_RE.sub(' ', summary_test)
+                if summary_test.endswith('다.'): summary = summary_test; settled = True
+    return summary, settled
+
+
+def extract_summary(text):
+    return summary_span(text)[0]
+
+
+def parse_pdf_text(text, partial=False):
+    """추출한 텍스트에서 필드를 파싱.
+
+    partial=True는 text가 문서의 앞 페이지들뿐이라는 뜻으로, 뒤 페이지를 더 읽으면 결과가 달라질 수 있는
+    필드(못 찾았거나 text 끝에서 값이 끝남, 첫 번째 이름 변형이 아님 등)가 하나라도 있으면 None을 반환한다.
+    """
+    layout = NumberedFieldLayout(text)
+    data = {}; settled = True
+    # 메타데이터 표 다음에 오는 요약 행이 보이면 표는 이미 끝난 것 (뒤 페이지에 표 행이 더 나오지 않음)
+    table_end = _SUMMARY_KEY_RE.search(text) if partial else None
+    table_end = table_end.start() if table_end else None
+
+    def field(name):
+        nonlocal settled
+        value, end, variation = layout.field_span(FIELD_NAMES[name])
+        # 첫 번째 이름 변형이 아니면, 앞선 변형이 뒤에 나올 수 없도록 표가 끝났어야 확정
+        if end is None or end >= len(text) or (variation != 0 and (table_end is None or end > table_end)): settled = False
+        return value
+
+    data['대분류'] = field('대분류')
+    data['중분류'] = field('중분류')
+    data['소분류'] = field('소분류')
+
+    # 위치 정보 처리: 슬래시(/)로 분리하여 리스트로 저장
+    location_str = field('위치')
+    if location_str != "정보 없음" and "/" in location_str:
+        data['지역정보'] = [loc.strip() for loc in location_str.split('/') if loc.strip()]
+    elif location_str != "정보 없음":
+        data['지역정보'] = [location_str.strip()] # 단일 위치도 리스트로 저장
+    else:
+        data['지역정보'] = [] # 정보 없으면 빈 리스트
+
+    data['기사제목'] = field('기사제목')
+    data['이벤트'] = field('이벤트')
+    data['original_title'] = field('original_title')
+    data['기사링크'], url_end = layout.url_span()
+    data['요약'], summary_settled = summary_span(text); data['번역'] = data['요약']
+    if partial:
+        url_settled = url_end < len(text) if url_end is not None else (table_end is not None and layout.url_absent_settled())
+        if not (settled and summary_settled and url_settled): return None
+    for key, value in data.items():
+        # 지역정보는 리스트이므로 is False 대신 not value 사용
+        if key != '지역정보' and not value: data[key] = "정보 없음"
+        elif key == '지역정보' and not value: data[key] = [] # 빈 리스트 유지
+    return data
+
+
+def parse_pdf_pages(pdf_path):
+    """페이지를 앞에서부터 하나씩 추출하며 파싱하고, 모든 필드가 확정되면 나머지 페이지는 읽지 않음.
+
+    메타데이터 표와 요약은 앞 페이지에 있고 뒤는 대부분 원문 기사/이미지이므로 보통 첫 페이지에서 끝난다.
+    반환값: (데이터, 읽은 페이지 수, 추출한 글자 수)
+    """
+    with fitz.open(pdf_path) as doc:
+        text = ""
+        for page_number, page in enumerate(doc, 1):
+            text += page.get_text("text", sort=False)
+            if page_number < doc.page_count:
+                data = parse_pdf_text(text, partial=True)
+                if data is not None: return data, page_number, len(text)
+        return parse_pdf_text(text), doc.page_count, len(text)
+
+
+def parse_pdf_file(pdf_path):
+    """PDF 한 개를 추출+파싱. 프로세스 풀 워커에서도 쓰이므로 예외 대신 (데이터, 오류)를 반환"""
+    try:
+        article_data, _, _ = parse_pdf_pages(pdf_path)
+        article_data['filename'] = Path(pdf_path).name
+        return article_data, None
+    except Exception as e:
+        # PyMuPDF 예외 중 피클링이 안 되는 것은 메시지만 전달
+        try: pickle.dumps(e)
+        except Exception: e = RuntimeError(str(e))
+        return None, e
+
+
+def _parse_pdf_file_timed(pdf_path):
+    """parse_pdf_file + 소요 시간. 워커 프로세스의 지표는 부모에 보이지 않으므로 시간을 함께 돌려줌"""
+    started = time.perf_counter()
+    article_data, error = parse_pdf_file(pdf_path)
+    return article_data, error, time.perf_counter() - started
+
+
+def _record_parse(seconds, error):
+    observe('stage', seconds, stage='pdf_parse')
+    if error is not None: increment('stage_failures', stage='pdf_parse')
+
+
+def parse_pdf_files(pdf_paths, workers=None):
+    """여러 PDF를 프로세스 풀에서 병렬로 파싱하고 입력 순서대로 (경로, 데이터, 오류)를 하나씩 돌려줌.
+
+    workers가 None이면 CPU 개수만큼, 1 이하이거나 파일이 적으면 현재 프로세스에서 순차 처리한다.
+    파일별 파싱 시간과 실패는 지표(stage='pdf_parse')로 기록한다.
+    """
+    pdf_paths = list(pdf_paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(pdf_paths) < MIN_FILES_FOR_POOL:
+        for pdf_path in pdf_paths:
+            article_data, error, seconds = _parse_pdf_file_timed(pdf_path)
+            _record_parse(seconds, error)
+            yield pdf_path, article_data, error
+        return
+
+    workers = min(workers, len(pdf_paths))
+    chunksize = max(1, min(16, len(pdf_paths) // (workers * 4)))
+    # Streamlit 서버는 멀티스레드이므로 fork 대신 spawn으로 워커 생성
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for pdf_path, (article_data, error, seconds) in zip(pdf_paths, executor.map(_parse_pdf_file_timed, pdf_paths, chunksize=chunksize)):
+            _record_parse(seconds, error)
+            yield pdf_path, article_data, error
+
+
+def main():
+    import argparse
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description="parse_pdf_text 처리량을 측정합니다 (PDF 텍스트 추출 시간 제외).")
+    parser.add_argument("folder", nargs="?", default="sampledata", help="PDF 폴더 (기본값: sampledata)")
+    parser.add_argument("--repeat", type=int, default=20, help="전체 문서를 반복 파싱할 횟수 (기본값: 20)")
+    parser.add_argument("--extract", action="store_true", help="대신 추출+파싱 전체를 측정: 모든 페이지 추출 vs 필요한 페이지만 추출")
+    args = parser.parse_args()
+    pdf_paths = sorted(Path(args.folder).glob("*.pdf"))
+
+    if args.extract:
+        def full(pdf_path):
+            text = extract_pdf_text(pdf_path)
+            with fitz.open(pdf_path) as doc: pages = doc.page_count
+            return parse_pdf_text(text), pages, len(text)
+
+        for label, parse in (("전체 페이지", full), ("필요한 페이지만", parse_pdf_pages)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            pages = chars = 0
+            for pdf_path in pdf_paths:
+                _, page_count, char_count = parse(pdf_path); pages += page_count; chars += char_count
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+            print(f"{label}: {len(pdf_paths)}개 파일 {elapsed:.3f}s, {pages}페이지, {chars:,}글자 추출, Python 최대 메모리 {peak / 1e6:.1f}MB")
+        return
+
+    texts = [extract_pdf_text(pdf_path) for pdf_path in pdf_paths]
+    total_chars = sum(len(text) for text in texts)
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts: parse_pdf_text(text)
+    elapsed = time.perf_counter() - started
+    docs = len(texts) * args.repeat
+    print(f"{docs}개 문서 파싱 {elapsed:.3f}s: {docs / elapsed:,.0f} 문서/s, {total_chars * args.repeat / elapsed / 1e6:.1f}M 글자/s")
+
+
+if __name__ == "__main__":
+    main()
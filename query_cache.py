@@ -0,0 +1,104 @@
+"""검색어별 결과(검색된 기사, 마커 표, 만든 folium 지도) 캐시.
+
+Streamlit은 버튼 클릭 등 위젯 조작마다 스크립트 전체를 다시 실행하므로, 같은 (검색어, 데이터 버전, 지도 방식, 좌표 저장소의 성공 건수)이면
+검색·좌표 확인·지도 생성을 건너뛰고 저장된 결과를 그대로 쓴다.
+항목 수와 추정 메모리 합계가 한도를 넘으면 가장 오래 쓰지 않은 항목부터 버린다(LRU).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import increment
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# folium 지도 크기 추정치 (마커 하나가 렌더링된 HTML에서 차지하는 대략의 바이트 수)
+MAP_BYTES_PER_MARKER = {'detailed': 4_500, 'clustered': 250}
+
+
+def normalize_query(keyword):
+    """캐시 키용 검색어: 앞뒤/연속 공백을 정리하고 소문자로 (검색 연산자 'OR'는 그대로 유지)"""
+    return " ".join(word if word == "OR" else word.lower() for word in keyword.split())
+
+
+def estimate_result_bytes(filtered_df, map_data, map_mode=None):
+    """결과 하나의 대략적인 메모리 크기"""
+    size = int(filtered_df.memory_usage(deep=True).sum())
+    if map_data is not None:
+        size += int(map_data.memory_usage(deep=True).sum())
+        size += len(map_data) * MAP_BYTES_PER_MARKER.get(map_mode, MAP_BYTES_PER_MARKER['detailed'])
+    return size
+
+
+class QueryResultCache:
+    """여러 세션이 공유하는 LRU 캐시. 저장된 값은 읽기 전용으로 다룬다. 적중/실패는 name 이름으로 지표에 기록"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, name="query_result"):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size_bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        increment('cache_requests', cache=self.name, result='miss' if entry is None else 'hit')
+        return None if entry is None else entry[0]
+
+    def put(self, key, value, size_bytes):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size_bytes > self.max_bytes: return  # 한도보다 큰 결과는 저장하지 않음
+            self._entries[key] = (value, size_bytes)
+            self._bytes += size_bytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear(); self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+class TTLCache:
+    """만료 시간이 있는 작은 캐시 (외부 API 응답용). 만료된 항목은 조회 시 버리고, 가득 차면 오래된 항목부터 버린다.
+
+    name을 주면 적중/실패를 지표(metrics.py)에 기록한다.
+    """
+
+    def __init__(self, ttl_seconds, max_entries=256, name=None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (만료 시각, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]; entry = None
+        if self.name: increment('cache_requests', cache=self.name, result='miss' if entry is None else 'hit')
+        return default if entry is None else entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,190 @@
+"""키워드 검색용 역색인.
+
+분류/제목/원문 제목/지역정보/요약 필드의 글자 2-gram(1글자 검색어는 1-gram)으로 후보 기사를 좁힌 뒤
+후보에서만 부분 문자열을 확인하므로 한국어 부분 검색("리마" → "페루, 리마, Comas")도 기존 str.contains와 같이 동작한다.
+
+질의 문법: 공백으로 구분한 단어는 AND, 'OR' 또는 '|'는 OR, 큰따옴표는 공백 포함 구절.
+    예) 페루 시위 OR "도미니카 공화국"  →  (페루 AND 시위) OR 도미니카 공화국
+
+기사가 추가/변경/삭제되면 updated()로 바뀐 기사만 반영한 새 색인을 만든다. 처음 만든 색인 조각은 공유하고
+바뀐 기사만 담은 작은 조각과 빠진 위치 집합을 새로 만들며, 기존 색인은 그대로 두므로 이전 색인으로 검색 중인 세션에 영향을 주지 않는다.
+"""
+import re
+
+from article_table import PLACEHOLDER_VALUES, column_values, has_column
+
+# 필드별 순위 가중치 (검색어가 나온 필드의 가중치 합으로 순위를 매김)
+FIELD_WEIGHTS = {
+    '기사제목': 3.0,
+    'original_title': 2.0,
+    '대분류': 2.0,
+    '중분류': 2.0,
+    '소분류': 2.0,
+    '지역정보': 2.0,
+    '요약': 1.0,
+}
+
+NGRAM = 2
+
+
+def ngrams(text, n=NGRAM):
+    if len(text) < n: return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def parse_query(query):
+    """질의를 OR 그룹 목록(각 그룹은 AND로 묶인 소문자 검색어 목록)으로 변환"""
+    groups = [[]]
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        if word in ("OR", "|"): groups.append([]); continue
+        term = (phrase or word).strip().lower()
+        if term: groups[-1].append(term)
+    return [group for group in groups if group]
+
+
+class _Segment:
+    """색인 조각: offset부터 번호를 매긴 기사 위치별 필드 텍스트와 n-gram 목록. 만든 뒤에는 바꾸지 않는다."""
+
+    def __init__(self, fields, labels, texts, offset=0):
+        self.fields = fields
+        self.offset = offset
+        self.labels = labels  # offset + i 위치의 DataFrame 인덱스 라벨
+        self.texts = texts  # 필드 -> 위치별 소문자 텍스트
+        self.positions = {label: offset + i for i, label in enumerate(labels)}
+        self.postings = {}  # n-gram -> 해당 n-gram이 어느 필드에든 나오는 기사 위치 집합
+        self.unigrams = {}  # 1글자 검색어용
+        for i in range(len(labels)):
+            doc_text = "\n".join(texts[field][i] for field in fields)
+            for gram in ngrams(doc_text):
+                self.postings.setdefault(gram, set()).add(offset + i)
+            for char in set(doc_text):
+                self.unigrams.setdefault(char, set()).add(offset + i)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def rows(self, positions):
+        """위치들의 (라벨 목록, 필드별 텍스트 목록) (다른 조각을 만들 때 사용)"""
+        idx = [pos - self.offset for pos in positions]
+        return [self.labels[i] for i in idx], {field: [self.texts[field][i] for i in idx] for field in self.fields}
+
+    def candidates(self, term):
+        if len(term) < NGRAM:
+            return self.unigrams.get(term, set())
+        posting_lists = []
+        for gram in ngrams(term):
+            posting = self.postings.get(gram)
+            if not posting: return set()
+            posting_lists.append(posting)
+        # 가장 짧은 목록부터 교집합
+        posting_lists.sort(key=len)
+        result = set(posting_lists[0])
+        for posting in posting_lists[1:]:
+            result &= posting
+            if not result: break
+        return result
+
+
+class SearchIndex:
+    """DataFrame 한 번 읽어 만든 뒤 질의마다 재사용하는 n-gram 역색인.
+
+    처음 만든 기본 조각(base)과, 이후 추가/변경된 기사만 담은 작은 조각(delta), 기본 조각에서 빠진 위치 집합(removed)으로 이뤄진다.
+    updated()는 기본 조각을 공유하고 delta만 새로 만들므로 비용이 바뀐 기사 수(+누적 delta 크기)에 비례하고,
+    delta가 커지면 merged()로 한 조각으로 합친다.
+    """
+
+    def __init__(self, df, fields=None):
+        self.fields = [f for f in (fields or FIELD_WEIGHTS) if has_column(df, f)]
+        texts = {field: [self._field_text(value) for value in column_values(df, field)] for field in self.fields}
+        self.base = _Segment(self.fields, list(df.index), texts)
+        self.delta = _Segment(self.fields, [], {field: [] for field in self.fields}, offset=len(self.base))
+        self.removed = frozenset()  # 빠진 기본 조각 위치
+
+    @classmethod
+    def _from_parts(cls, fields, base, delta, removed):
+        index = object.__new__(cls)
+        index.fields, index.base, index.delta, index.removed = fields, base, delta, removed
+        return index
+
+    def __len__(self):
+        """살아 있는 기사 수"""
+        return len(self.base) - len(self.removed) + len(self.delta)
+
+    @property
+    def dead(self):
+        """기본 조각에서 빠져 비어 있는 위치 수"""
+        return len(self.removed)
+
+    def updated(self, removed_labels=(), added=None):
+        """removed_labels를 빼고 added(DataFrame) 행을 더한 새 색인 (같은 라벨이 양쪽에 있으면 내용 교체).
+
+        기본 조각은 그대로 공유하고, 기존 delta의 남은 기사 + added로 delta만 다시 만든다. 이 색인은 변경되지 않는다.
+        """
+        removed_labels = set(removed_labels)
+        if added is not None: removed_labels.update(added.index)
+        removed = self.removed | {pos for label in removed_labels if (pos := self.base.positions.get(label)) is not None}
+        labels, texts = self.delta.rows([pos for label, pos in self.delta.positions.items() if label not in removed_labels])
+        if added is not None:
+            labels += list(added.index)
+            for field in self.fields:
+                texts[field] += [self._field_text(value) for value in column_values(added, field)]
+        delta = _Segment(self.fields, labels, texts, offset=len(self.base))
+        return SearchIndex._from_parts(self.fields, self.base, delta, frozenset(removed))
+
+    def merged(self):
+        """기본 조각과 delta를 한 조각으로 합치고 빠진 위치를 정리한 새 색인 (DataFrame을 다시 읽지 않음)"""
+        base_labels, base_texts = self.base.rows([pos for pos in range(len(self.base)) if pos not in self.removed])
+        delta_labels, delta_texts = self.delta.rows(range(self.delta.offset, self.delta.offset + len(self.delta)))
+        texts = {field: base_texts[field] + delta_texts[field] for field in self.fields}
+        base = _Segment(self.fields, base_labels + delta_labels, texts)
+        return SearchIndex._from_parts(self.fields, base, _Segment(self.fields, [], {field: [] for field in self.fields}, offset=len(base)), frozenset())
+
+    def _segment(self, pos):
+        return self.base if pos < self.delta.offset else self.delta
+
+    def _label(self, pos):
+        segment = self._segment(pos)
+        return segment.labels[pos - segment.offset]
+
+    @staticmethod
+    def _field_text(value):
+        if isinstance(value, (list, tuple)): return "\n".join(str(v) for v in value).lower()
+        # 기본값 문구는 색인하지 않음 ('요약', '정보' 검색이 요약 없는 기사 전부와 맞지 않도록)
+        if value is None or value in PLACEHOLDER_VALUES: return ""
+        return str(value).lower()
+
+    def _candidates(self, term):
+        candidates = self.base.candidates(term)
+        if self.removed: candidates = candidates - self.removed
+        if self.delta.labels: candidates = candidates | self.delta.candidates(term)
+        return candidates
+
+    def _term_scores(self, term, fields):
+        """검색어가 실제로 들어 있는 기사 위치 -> 점수"""
+        scores = {}
+        base_end = self.delta.offset
+        # 후보마다 조각을 찾지 않도록 필드별 (가중치, 기본 조각 텍스트, delta 텍스트)를 미리 꺼내 둠
+        field_texts = [(FIELD_WEIGHTS.get(field, 1.0), self.base.texts[field], self.delta.texts[field]) for field in fields]
+        for pos in self._candidates(term):
+            if pos < base_end: score = sum(weight for weight, texts, _ in field_texts if term in texts[pos])
+            else: score = sum(weight for weight, _, texts in field_texts if term in texts[pos - base_end])
+            if score: scores[pos] = score
+        return scores
+
+    def search(self, query, fields=None):
+        """질의와 일치하는 DataFrame 인덱스 라벨을 점수 내림차순(동점이면 원래 순서)으로 반환"""
+        fields = [f for f in (fields or self.fields) if f in self.fields]
+        total = {}
+        for group in parse_query(query):
+            group_scores = None
+            for term in sorted(group, key=len, reverse=True):  # 긴(드문) 검색어부터 좁힘
+                term_scores = self._term_scores(term, fields)
+                if group_scores is None:
+                    group_scores = term_scores
+                else:
+                    group_scores = {pos: s + term_scores[pos] for pos, s in group_scores.items() if pos in term_scores}
+                if not group_scores: break
+            for pos, score in (group_scores or {}).items():
+                total[pos] = max(total.get(pos, 0), score)
+        ranked = sorted(total, key=lambda pos: (-total[pos], pos))
+        return [self._label(pos) for pos in ranked]
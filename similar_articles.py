@@ -0,0 +1,213 @@
+"""'AI로 유사 기사 더 알아보기' 흐름: 스페인어 번역 → Google(Serper) 검색 → GPT 추천 요약.
+
+서로 기다릴 필요 없는 호출은 스레드에서 동시에 실행한다. 한국어 검색은 번역을 기다리지 않고 바로 시작하고,
+스페인어 검색은 두 번역(키워드, 소분류)이 끝나는 대로 시작한다.
+Serper 호출은 연결을 재사용하는 requests.Session으로 보내고, 번역/검색 결과/요약은 TTL 캐시에 보관해
+같은 질의를 다시 요청하면 API를 호출하지 않는다.
+요약은 스트리밍으로 받아 stream()이 두 언어의 조각을 도착하는 대로 내보내므로 화면에 바로 채워 넣을 수 있다.
+stream()을 중간에 닫으면(Streamlit 재실행 등) 작업 스레드를 기다리지 않고 바로 돌아오며, 스레드는 다음 조각에서 멈춘다.
+"""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import observe, timer
+from query_cache import TTLCache
+
+SERPER_URL = "https://google.serper.dev/search"
+CHAT_MODEL = "gpt-4o"
+SEARCH_RESULT_LIMIT = 5
+# 번역/검색/요약 캐시 유지 시간 (초)
+DEFAULT_TTL_SECONDS = 60 * 60
+HTTP_POOL_SIZE = 8
+
+BASE_KO_QUERY = "라틴아메리카, 중남미, 뉴스, 기사"
+BASE_ES_TERMS = ["América Latina", "Latinoamérica", "noticias", "artículo"]
+LANGUAGE_LABELS = {'KO': '🇰🇷 한국어', 'ES': '🇪🇸 스페인어'}
+
+
+def make_http_session(pool_size=HTTP_POOL_SIZE):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter); session.mount("http://", adapter)
+    return session
+
+
+def korean_query(keyword):
+    return f"{BASE_KO_QUERY}, {keyword}".strip().strip(",")
+
+
+def spanish_query(keyword_es, sub_category_keywords_es):
+    return f"{', '.join(BASE_ES_TERMS)}, {keyword_es} " + " ".join(sub_category_keywords_es)
+
+
+def recommendation_prompt(keyword, results):
+    search_context = ""
+    for i, res in enumerate(results):
+        search_context += f"--- Result {i + 1} ---\nTitle: {res.get('title', '')}\nLink: {res.get('link', '')}\nSnippet: {res.get('snippet', '')}\n"
+    # 출력은 한국어 요약 유지 (스페인어 섹션도 한국어로 요약)
+    return f"""당신은 라틴아메리카 전문 뉴스 큐레이터입니다. 사용자가 '{keyword}' 키워드로 검색했으며, 아래는 Google 검색 결과입니다.
+<Google 검색 결과>
+{search_context}
+</Google 검색 결과>
+위 결과를 바탕으로 유사 기사 3개를 추천해주세요. 다음 형식을 지켜주세요.
+- **기사 제목:** [실제 제목]
+- **기사 링크:** [실제 링크]
+- **번역 및 요약:** [Snippet 바탕 AI 생성 한국어 요약]
+---"""
+
+
+def recommendation_messages(prompt):
+    return [
+        {"role": "system", "content": "You are a helpful assistant specializing in Latin American news."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+class SimilarArticleFinder:
+    """OpenAI 클라이언트와 Serper 키를 묶어 두고 세션/캐시를 재사용하는 검색기 (Streamlit에서는 프로세스당 하나)"""
+
+    def __init__(self, client, serper_api_key, session=None, serper_url=SERPER_URL, model=CHAT_MODEL, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.client = client
+        self.serper_api_key = serper_api_key
+        self.session = session or make_http_session()
+        self.serper_url = serper_url
+        self.model = model
+        self.translations = TTLCache(ttl_seconds, name="ai_translation")
+        self.searches = TTLCache(ttl_seconds, name="ai_search")
+        self.summaries = TTLCache(ttl_seconds, name="ai_summary")
+
+    def translate_to_es(self, text_list):
+        """한국어 항목들을 스페인어로 번역. 실패하면 원문을 그대로 반환 (실패 결과는 캐시하지 않음)"""
+        if not text_list: return []
+        key = tuple(text_list)
+        cached = self.translations.get(key)
+        if cached is not None: return cached
+        try:
+            msg = [
+                {"role": "system", "content": "You are a concise translator from Korean to Spanish."},
+                {"role": "user", "content": "다음 항목들을 스페인어로만 자연스럽게 번역해 주세요. 쉼표로 구분해서 반환: " + ", ".join(text_list)},
+            ]
+            with timer('external_call', provider='openai', call='translate'):
+                tr = self.client.chat.completions.create(model=self.model, messages=msg, temperature=0)
+            out = tr.choices[0].message.content or ""
+            translated = [t.strip() for t in out.split(",") if t.strip()] # 쉼표 기준 분리 & 공백 트리밍
+        except Exception:
+            return list(text_list)
+        self.translations.put(key, translated)
+        return translated
+
+    def google_search(self, query):
+        """Serper 검색 상위 결과 [{title, link, snippet}]. 네트워크 오류는 requests 예외로 전달"""
+        cached = self.searches.get(query)
+        if cached is not None: return cached
+        payload = json.dumps({"q": query, "gl": "us", "hl": "ko"})
+        headers = {'X-API-KEY': self.serper_api_key, 'Content-Type': 'application/json'}
+        with timer('external_call', provider='serper', call='search'):
+            response = self.session.post(self.serper_url, headers=headers, data=payload, timeout=10)
+            response.raise_for_status()
+        results = [{"title": item.get('title'), "link": item.get('link'), "snippet": item.get('snippet')}
+                   for item in response.json().get('organic', [])[:SEARCH_RESULT_LIMIT]]
+        self.searches.put(query, results)
+        return results
+
+    def summarize_stream(self, keyword, results):
+        """추천 요약을 조각 단위로 내보내는 제너레이터 (캐시된 요약은 한 번에). 끝까지 받은 요약만 캐시"""
+        prompt = recommendation_prompt(keyword, results)
+        cached = self.summaries.get(prompt)
+        if cached is not None:
+            yield cached; return
+        parts = []
+        started = time.perf_counter()
+        # 전체 시간과 별도로 첫 조각까지의 시간도 기록 (스트림을 끝까지 받지 않고 닫으면 실패로 세지 않음)
+        with timer('external_call', provider='openai', call='summary'):
+            response = self.client.chat.completions.create(model=self.model, messages=recommendation_messages(prompt), temperature=0.2, stream=True)
+            try:
+                for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not parts: observe('external_call_first_token', time.perf_counter() - started, provider='openai', call='summary')
+                        parts.append(delta); yield delta
+            finally:
+                response.close() # 중간에 닫히면 남은 응답을 받지 않고 연결을 놓음
+        self.summaries.put(prompt, "".join(parts))
+
+    def summarize(self, keyword, results):
+        return "".join(self.summarize_stream(keyword, results))
+
+    def _spanish_query(self, keyword, sub_category_keywords_ko, pool):
+        keyword_es_future = pool.submit(self.translate_to_es, [str(keyword)] if keyword else [])
+        sub_categories_es = self.translate_to_es(sub_category_keywords_ko)
+        keyword_es_list = keyword_es_future.result()
+        return spanish_query(keyword_es_list[0] if keyword_es_list else "", sub_categories_es)
+
+    def _stream_section(self, lang_label, keyword, make_query, emit, stop):
+        """한 언어의 검색 → 요약. stop이 설정되면 단계 사이와 요약 조각 사이에서 멈춤"""
+        try:
+            query = make_query()
+            if stop.is_set(): return
+            emit(lang_label, 'query', query)
+            try:
+                results = self.google_search(query)
+            except requests.exceptions.RequestException as e:
+                emit(lang_label, 'search_error', e); results = None
+            if not results:
+                emit(lang_label, 'no_results', None); return
+            emit(lang_label, 'results', results)
+            if stop.is_set(): return
+            deltas = self.summarize_stream(keyword, results)
+            try:
+                for delta in deltas:
+                    if stop.is_set(): break
+                    emit(lang_label, 'token', delta)
+            except Exception as e:
+                emit(lang_label, 'summary_error', e)
+            finally:
+                deltas.close()
+        finally:
+            emit(lang_label, 'done', None)
+
+    def stream(self, keyword, sub_category_keywords_ko):
+        """(언어, 종류, 값) 이벤트를 도착하는 순서대로 내보내는 제너레이터. 두 언어는 동시에 진행된다.
+
+        종류: 'query'(검색어), 'search_error'(예외), 'no_results', 'results'(검색 결과), 'token'(요약 조각),
+        'summary_error'(예외), 'done'(해당 언어 종료). 한국어 검색은 바로 시작하고 스페인어는 번역 후 시작한다.
+        """
+        events = queue.Queue()
+        emit = lambda *event: events.put(event)
+        stop = threading.Event()
+        # with 블록을 쓰면 중간에 닫힐 때 shutdown(wait=True)가 두 언어가 끝날 때까지 막으므로 직접 정리
+        pool = ThreadPoolExecutor(max_workers=3)
+        try:
+            pool.submit(self._stream_section, 'KO', keyword, lambda: korean_query(keyword), emit, stop)
+            pool.submit(self._stream_section, 'ES', keyword, lambda: self._spanish_query(keyword, sub_category_keywords_ko, pool), emit, stop)
+            remaining = 2
+            while remaining:
+                event = events.get()
+                if event[1] == 'done': remaining -= 1
+                yield event
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def find(self, keyword, sub_category_keywords_ko):
+        """stream()을 끝까지 모은 {'KO': 섹션, 'ES': 섹션}.
+
+        섹션: {query, results, summary, search_error, summary_error, first_content_seconds(첫 요약 조각까지 걸린 시간)}
+        """
+        started = time.perf_counter()
+        sections = {lang_label: {'query': None, 'results': None, 'summary': None, 'search_error': None,
+                                 'summary_error': None, 'first_content_seconds': None} for lang_label in LANGUAGE_LABELS}
+        for lang_label, kind, value in self.stream(keyword, sub_category_keywords_ko):
+            section = sections[lang_label]
+            if kind == 'token':
+                if section['first_content_seconds'] is None: section['first_content_seconds'] = time.perf_counter() - started
+                section['summary'] = (section['summary'] or "") + value
+            elif kind in ('query', 'results', 'search_error', 'summary_error'):
+                section[kind] = value
+        return sections
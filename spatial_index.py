@@ -0,0 +1,157 @@
+"""좌표 변환된 기사 위치의 공간 색인 (사각 범위 / 반경 검색).
+
+점(마커 표의 한 행 = 한 기사의 한 위치)을 cell_degrees 크기 격자 칸 번호 순으로 정렬해 둔다.
+칸 번호는 (위도 줄, 경도 칸) 순이므로 사각 범위에 걸친 칸들은 위도 줄마다 정렬 배열의 연속 구간 하나가 된다.
+질의는 줄마다 이진 탐색으로 구간을 찾고 그 후보만 정확히 비교하므로, 지도를 움직일 때마다 전체 행을 훑지 않는다.
+날짜변경선을 넘는 범위(west > east, Leaflet의 ±180 밖 경도)도 처리한다.
+
+성능 측정: python spatial_index.py
+"""
+import math
+
+import numpy as np
+
+DEFAULT_CELL_DEGREES = 1.0
+EARTH_RADIUS_KM = 6371.0088
+# 격자 후보가 전체 점의 이 비율을 넘으면 후보를 모으지 않고 전체를 한 번에 비교.
+# 후보 위치를 모아 정렬하는 비용이 후보 수에 비례하므로, 국가/대륙 화면처럼 점 대부분을 덮으면 전체 비교가 더 빠르다
+# (python spatial_index.py, 점 100만 개: 결과가 점의 31%면 질의당 전체 비교 3.9 ms 대 격자 후보 8.8 ms, 79%면 4.9 ms 대 24.2 ms,
+#  2%면 격자 후보가 0.7 ms로 빠름.
+#  benchmark.py의 area_*와 area_*_cells 항목으로 같은 비교를 기록)
+SCAN_FRACTION = 0.1
+
+
+def haversine_km(lat, lon, lats, lons):
+    """(lat, lon)에서 각 점까지의 대원 거리 (km)"""
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def lon_ranges(west, east):
+    """경도 범위를 [-180, 180] 안의 (west, east) 구간 목록으로 (날짜변경선을 넘으면 두 구간)"""
+    if east - west >= 360: return [(-180.0, 180.0)]
+    west = (west + 180) % 360 - 180; east = (east + 180) % 360 - 180
+    if west <= east: return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+class SpatialIndex:
+    """points(DataFrame, latitude/longitude 열)에 대한 정적 격자 색인. 만든 뒤에는 바꾸지 않는다.
+
+    질의 결과는 points의 행들(원래 순서)이다. 앱에서는 map_render.build_map_data의 마커 표를 넣는다.
+    scan_fraction은 전체 비교로 바꾸는 후보 비율 (math.inf면 항상 격자 후보만 비교, 0이면 항상 전체 비교).
+    """
+
+    def __init__(self, points, cell_degrees=DEFAULT_CELL_DEGREES, scan_fraction=SCAN_FRACTION):
+        self.points = points
+        self.cell_degrees = cell_degrees
+        self.scan_fraction = scan_fraction
+        self.rows = math.ceil(180 / cell_degrees)
+        self.cols = math.ceil(360 / cell_degrees)
+        self.point_lats = points['latitude'].to_numpy(dtype=float)  # points 행 순서 (전체 비교용)
+        self.point_lons = points['longitude'].to_numpy(dtype=float)
+        cells = self._row(self.point_lats) * self.cols + self._col(self.point_lons)
+        self.order = np.argsort(cells, kind='stable')  # 정렬 위치 -> points 행 위치
+        self.cells = cells[self.order]
+        self.lats = self.point_lats[self.order]
+        self.lons = self.point_lons[self.order]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _row(self, lats):
+        return np.clip(((np.asarray(lats) + 90) // self.cell_degrees).astype(np.int64), 0, self.rows - 1)
+
+    def _col(self, lons):
+        return np.clip(((np.asarray(lons) + 180) // self.cell_degrees).astype(np.int64), 0, self.cols - 1)
+
+    def _slices(self, south, west, north, east):
+        """격자 칸으로 고른 후보 구간들 (west <= east, [-180, 180] 범위). 위도 줄마다 정렬 배열의 [start, end)"""
+        rows = np.arange(self._row(south), self._row(north) + 1)
+        starts = np.searchsorted(self.cells, rows * self.cols + self._col(west), side='left')
+        ends = np.searchsorted(self.cells, rows * self.cols + self._col(east), side='right')
+        return starts, ends - starts
+
+    def bbox_positions(self, south, west, north, east):
+        """사각 범위 안의 points 행 위치 (오름차순)"""
+        south, north = max(-90.0, min(south, north)), min(90.0, max(south, north))
+        ranges = [(lo, hi, *self._slices(south, lo, north, hi)) for lo, hi in lon_ranges(west, east)]
+        if sum(int(counts.sum()) for *_, counts in ranges) > len(self.points) * self.scan_fraction:
+            # 범위가 점 대부분을 덮으면 후보를 모으는 것보다 한 번에 비교하는 편이 빠름
+            lats = self.point_lats; lons = self.point_lons
+            inside = np.zeros(len(lats), dtype=bool)
+            for lo, hi, *_ in ranges: inside |= (lons >= lo) & (lons <= hi)
+            return np.flatnonzero(inside & (lats >= south) & (lats <= north))
+        found = []
+        for lo, hi, starts, counts in ranges:
+            # 줄마다의 구간 [start, start + count)를 이어 붙인 위치
+            candidates = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+            lats, lons = self.lats[candidates], self.lons[candidates]
+            inside = (lats >= south) & (lats <= north) & (lons >= lo) & (lons <= hi)
+            found.append(self.order[candidates[inside]])
+        return np.sort(np.concatenate(found))  # 두 경도 구간은 겹치지 않으므로 중복 없음
+
+    def bbox(self, south, west, north, east):
+        """사각 범위(남, 서, 북, 동 경계 포함) 안의 점들"""
+        return self.points.iloc[self.bbox_positions(south, west, north, east)]
+
+    def radius(self, lat, lon, km):
+        """(lat, lon)에서 km 이내의 점들을 가까운 순으로. distance_km 열을 덧붙인다."""
+        dlat = math.degrees(km / EARTH_RADIUS_KM)
+        if abs(lat) + dlat >= 90:
+            west, east = -180.0, 180.0  # 극을 넘는 원은 모든 경도
+        else:
+            dlon = dlat / math.cos(math.radians(abs(lat) + dlat))
+            west, east = (lon - dlon, lon + dlon) if dlon < 180 else (-180.0, 180.0)
+        positions = self.bbox_positions(lat - dlat, west, lat + dlat, east)
+        points = self.points.iloc[positions]
+        distances = haversine_km(lat, lon, points['latitude'].to_numpy(dtype=float), points['longitude'].to_numpy(dtype=float))
+        within = distances <= km
+        order = np.argsort(distances[within], kind='stable')
+        return points[within].iloc[order].assign(distance_km=distances[within][order])
+
+
+def main():
+    import argparse
+    import random
+    import time
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="사각 범위 질의를 전체 훑기, 격자 후보만 비교, 기본 색인(SCAN_FRACTION 전환)으로 비교합니다 (합성 데이터).")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="점 개수 목록 (기본값: 1000,10000,100000)")
+    parser.add_argument("--queries", type=int, default=200, help="크기별 질의 수 (기본값: 200)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    for size in (int(s) for s in args.sizes.split(",")):
+        # 라틴아메리카 범위에 몰린 점들
+        points = pd.DataFrame({'latitude': [random.uniform(-55, 30) for _ in range(size)],
+                               'longitude': [random.uniform(-118, -34) for _ in range(size)]})
+        started = time.perf_counter(); index = SpatialIndex(points); build = time.perf_counter() - started
+        cells_only = SpatialIndex(points, scan_fraction=math.inf)
+        print(f"점 {size:>9,}개: 색인 생성 {build * 1000:.1f} ms")
+        lats, lons = points['latitude'].to_numpy(), points['longitude'].to_numpy()
+        # 지도 화면 크기별 (세로 span도, 가로 2*span도)
+        for span in (0.5, 2, 10, 40, 90):
+            boxes = []
+            for _ in range(args.queries):
+                lat, lon = random.uniform(-55, 30), random.uniform(-118, -34)
+                boxes.append((lat - span / 2, lon - span, lat + span / 2, lon + span))
+            started = time.perf_counter()
+            scanned = [np.flatnonzero((lats >= s) & (lats <= n) & (lons >= w) & (lons <= e)) for s, w, n, e in boxes]
+            scan = time.perf_counter() - started
+            started = time.perf_counter()
+            from_cells = [cells_only.bbox_positions(*box) for box in boxes]
+            cells = time.perf_counter() - started
+            started = time.perf_counter()
+            indexed = [index.bbox_positions(*box) for box in boxes]
+            query = time.perf_counter() - started
+            assert all(np.array_equal(a, b) and np.array_equal(a, c) for a, b, c in zip(scanned, indexed, from_cells))
+            found = sum(map(len, indexed)) / len(boxes)
+            print(f"  범위 {span:>4}° (평균 {found:>9,.0f}개): 질의당 전체 훑기 {scan / len(boxes) * 1000:7.3f} ms / "
+                  f"격자 후보만 {cells / len(boxes) * 1000:7.3f} ms / 색인 {query / len(boxes) * 1000:7.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# 앱 모듈은 저장소 루트에 평평하게 있으므로 루트를 import 경로에 추가
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path: sys.path.insert(0, str(ROOT))
@@ -0,0 +1,59 @@
+"""aggregation.ArticleAggregates 테스트 (sampledata 기사 표 사용): 추가/삭제 후 updated()가 다시 센 집계와 같은지."""
+import random
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from aggregation import ArticleAggregates, count_articles
+from article_store import ArticleStore
+from article_table import LOCATION_COUNT, LOCATION_START, compact_articles, concat_articles, prepare_articles, searchable_articles
+from date_index import DATE_COLUMN
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sampledata"
+CATEGORIES = ["국내(정치)", "국내(사회)", "국제(국제관계)"]
+
+
+@pytest.fixture(scope="module")
+def articles(tmp_path_factory):
+    store = ArticleStore(tmp_path_factory.mktemp("store") / "articles.sqlite")
+    store.sync(SAMPLE_DIR, workers=1)
+    return searchable_articles(compact_articles(prepare_articles(store.load_dataframe(SAMPLE_DIR))))
+
+
+def assert_same_tables(aggregates, df):
+    expected = count_articles(df)
+    for name, counts in aggregates.tables.items():
+        pd.testing.assert_series_equal(counts.sort_index(), expected[name][expected[name] > 0].sort_index(), check_names=False, obj=name)
+
+
+def changed_copies(articles, labels, rng, step):
+    """labels 기사를 분류/보도 일자/지역을 바꾼 새 버전으로 (지역은 다른 기사의 구간을 빌려 씀)"""
+    added = articles.loc[labels].copy()
+    donors = articles.loc[rng.sample(list(articles.index), len(labels))]
+    added['대분류'] = pd.Categorical([rng.choice(CATEGORIES) for _ in labels])
+    added[DATE_COLUMN] = [f"20{10 + step % 10}-{rng.randint(1, 12):02d}-15" for _ in labels]
+    added[LOCATION_START] = donors[LOCATION_START].to_numpy()
+    added[LOCATION_COUNT] = donors[LOCATION_COUNT].to_numpy()
+    return added
+
+
+def test_updated_matches_full_recount(articles):
+    rng = random.Random(0)
+    aggregates, current = ArticleAggregates(articles), articles
+    for step in range(20):
+        removed = rng.sample(list(current.index), 3)
+        added = changed_copies(articles, rng.sample(list(articles.index), 4), rng, step)
+        dropped = [label for label in {*removed, *added.index} if label in current.index]
+        aggregates = aggregates.updated(removed=current.loc[dropped], added=added)
+        current = concat_articles([current.drop(index=dropped), added], articles.attrs['locations'])
+        assert_same_tables(aggregates, current)
+        assert aggregates.total() == len(current)
+        assert aggregates.by_country().equals(ArticleAggregates(current).by_country())
+
+
+def test_removing_everything_leaves_empty_tables(articles):
+    aggregates = ArticleAggregates(articles).updated(removed=articles)
+    assert aggregates.total() == 0
+    assert all(counts.empty for counts in aggregates.tables.values())
+    assert aggregates.updated(added=articles).total() == len(articles)
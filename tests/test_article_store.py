@@ -0,0 +1,72 @@
+"""article_store.ArticleStore 동기화 테스트 (sampledata PDF를 임시 폴더에 복사해 사용)."""
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from article_store import ArticleStore
+from article_table import prepare_articles, searchable_articles
+from data_watcher import LiveArticles
+
+SAMPLE_PDFS = sorted((Path(__file__).resolve().parent.parent / "sampledata").glob("*.pdf"))[:3]
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "pdfs"
+    folder.mkdir()
+    for pdf_path in SAMPLE_PDFS: shutil.copy(pdf_path, folder)
+    return folder
+
+
+def break_pdf(path):
+    # 크기와 mtime이 모두 바뀌도록 덮어씀
+    stat = path.stat()
+    path.write_bytes(b"not a pdf")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_sync_parses_only_changed_files(folder, tmp_path):
+    store = ArticleStore(tmp_path / "articles.sqlite")
+    assert store.sync(folder, workers=1)['parsed'] == 3
+    stats = store.sync(folder, workers=1)
+    assert (stats['parsed'], stats['unchanged'], stats['failed']) == (0, 3, 0)
+    (folder / SAMPLE_PDFS[0].name).unlink()
+    stats = store.sync(folder, workers=1)
+    assert stats['removed_files'] == [SAMPLE_PDFS[0].name]
+    assert list(store.load_dataframe(folder).index) == [p.name for p in SAMPLE_PDFS[1:]]
+
+
+def test_failed_reparse_drops_stale_article_and_is_not_retried(folder, tmp_path):
+    store = ArticleStore(tmp_path / "articles.sqlite")
+    store.sync(folder, workers=1)
+    broken = folder / SAMPLE_PDFS[0].name
+    break_pdf(broken)
+
+    errors = []
+    stats = store.sync(folder, workers=1, on_error=lambda name, e: errors.append(name))
+    assert stats['failed'] == 1 and errors == [broken.name]
+    assert stats['removed_files'] == [broken.name]
+    assert broken.name not in store.load_dataframe(folder).index
+
+    # 파일이 그대로면 다시 파싱하지 않음
+    stats = store.sync(folder, workers=1, on_error=lambda name, e: errors.append(name))
+    assert (stats['failed'], stats['parsed'], stats['removed_files']) == (0, 0, [])
+    assert errors == [broken.name]
+
+    # 고쳐지면 다시 파싱
+    shutil.copy(SAMPLE_PDFS[0], broken)
+    stats = store.sync(folder, workers=1)
+    assert stats['parsed_files'] == [broken.name]
+    assert broken.name in store.load_dataframe(folder).index
+
+
+def test_live_articles_drop_article_whose_pdf_breaks(folder, tmp_path):
+    live = LiveArticles(folder, ArticleStore(tmp_path / "articles.sqlite"), prepare=prepare_articles, searchable=searchable_articles)
+    broken = folder / SAMPLE_PDFS[0].name
+    assert broken.name in live.snapshot().df.index
+    break_pdf(broken)
+    live.refresh()
+    assert broken.name not in live.snapshot().df.index
+    assert live.refresh()['failed'] == 0
@@ -0,0 +1,90 @@
+"""article_table 압축 형식 테스트: 지역명 사전/int32 번호가 원래 지역정보 열과 같게 복원되는지 (압축, 갱신, 다시 채우기 후)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from article_table import (
+    column_values, compact_articles, concat_articles, explode_locations, location_lists, repack_locations, unique_locations,
+)
+
+LOCATIONS = {
+    "a.pdf": ["페루, 리마", "칠레"],
+    "b.pdf": [],
+    "c.pdf": ["칠레", "칠레, 산티아고", "페루, 리마"],
+    "d.pdf": ["브라질"],
+    "e.pdf": ["페루, 리마"],
+}
+
+
+def raw_articles(locations):
+    """ArticleStore.load_dataframe 형식(리스트 셀)의 작은 기사 표"""
+    labels = list(locations)
+    return pd.DataFrame({
+        '대분류': ["국내(정치)" if i % 2 else "국내(사회)" for i in range(len(labels))],
+        '기사제목': [f"제목 {label}" for label in labels],
+        '지역정보': [list(locs) for locs in locations.values()],
+        '요약': [f"요약 {label}" for label in labels],
+        '번역': [f"요약 {label}" for label in labels],
+    }, index=pd.Index(labels, name='filename'))
+
+
+def expected_unique(locations, labels):
+    return list(dict.fromkeys(name for label in labels for name in locations[label]))
+
+
+def assert_matches(df, locations):
+    """압축 표의 지역 열이 {라벨: 지역명 리스트}와 같은지"""
+    assert column_values(df, '지역정보').to_dict() == {label: locations[label] for label in df.index}
+    assert location_lists(df) == [locations[label] for label in df.index]
+    assert unique_locations(df) == expected_unique(locations, df.index)
+    exploded = explode_locations(df)
+    assert list(zip(exploded['article'], exploded['location'])) == [(label, name) for label in df.index for name in locations[label]]
+    table = df.attrs['locations']
+    assert table.ids.dtype == np.int32
+    assert len(set(table.names)) == len(table.names)  # 같은 지역명은 번호 하나
+    assert all(table.codes[name] == code for code, name in enumerate(table.names))
+
+
+def update(df, changed, removed):
+    """LiveArticles.refresh와 같은 순서: 바뀐 기사는 기존 지역 표 뒤에 덧붙이고, 빠진 기사는 행만 지움"""
+    added = compact_articles(raw_articles(changed), locations=df.attrs['locations'])
+    dropped = [label for label in [*changed, *removed] if label in df.index]
+    return concat_articles([df.drop(index=dropped), added], added.attrs['locations']).sort_index()
+
+
+def test_compact_round_trips_locations():
+    df = compact_articles(raw_articles(LOCATIONS))
+    assert_matches(df, LOCATIONS)
+    assert '지역정보' not in df.columns and '번역' not in df.columns
+    assert list(df.attrs['locations'].names) == ["페루, 리마", "칠레", "칠레, 산티아고", "브라질"]
+    # 행을 골라도 구간 열과 지역 표가 함께 따라감
+    assert_matches(df.loc[["e.pdf", "c.pdf"]], LOCATIONS)
+    assert_matches(df[df['대분류'] == "국내(정치)"], LOCATIONS)
+
+
+@pytest.mark.parametrize("repack", [False, True])
+def test_update_and_repack_keep_label_location_mapping(repack):
+    df = compact_articles(raw_articles(LOCATIONS))
+    changed = {"c.pdf": ["아르헨티나, 부에노스아이레스", "칠레"], "f.pdf": ["멕시코", "페루, 리마"], "g.pdf": []}
+    removed = ["a.pdf", "d.pdf"]
+    expected = {label: locs for label, locs in LOCATIONS.items() if label not in removed} | changed
+    df = update(df, changed, removed)
+    assert list(df.index) == sorted(expected)
+    assert_matches(df, expected)
+    # 기존 지역명은 번호를 다시 쓰고 새 지역명만 사전 뒤에 붙음
+    table = df.attrs['locations']
+    assert list(table.names[:4]) == ["페루, 리마", "칠레", "칠레, 산티아고", "브라질"]
+    assert list(table.names[4:]) == ["아르헨티나, 부에노스아이레스", "멕시코"]
+
+    if repack:
+        df = repack_locations(df)
+        assert_matches(df, expected)
+        # 빠진 기사의 번호와 더 이상 쓰지 않는 지역명은 걷어냄
+        table = df.attrs['locations']
+        assert len(table.ids) == sum(map(len, expected.values()))
+        assert set(table.names) == {name for locs in expected.values() for name in locs}
+
+    # 한 번 더 갱신해도 유지
+    more = {"b.pdf": ["브라질", "칠레, 산티아고"]}
+    expected |= more
+    assert_matches(update(df, more, ["e.pdf"]), {label: locs for label, locs in expected.items() if label != "e.pdf"})
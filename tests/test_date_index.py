@@ -0,0 +1,26 @@
+"""date_index.DateIndex 기간 질의 테스트."""
+import pandas as pd
+import pytest
+
+from date_index import DateIndex
+
+DATES = {"a": "2015-06-08", "b": "2016-01-01", "c": "2015-06-30", "d": "정보 없음", "e": "2020-12-31", "f": "2016-01-01"}
+
+
+@pytest.fixture
+def index():
+    return DateIndex(pd.DataFrame({'이벤트': list(DATES.values())}, index=list(DATES)))
+
+
+def test_range_labels_are_date_ordered_and_inclusive(index):
+    assert index.range_labels("2015-06-08", "2016-01-01") == ["a", "c", "b", "f"]
+    assert index.range_labels("2021-01-01", "2022-01-01") == []
+
+
+@pytest.mark.parametrize("labels", [["e", "d", "b", "a"], list(DATES), ["f"], []])
+@pytest.mark.parametrize("start, end", [("2015-01-01", "2015-12-31"), ("2000-01-01", "2030-01-01"), ("2016-01-01", "2016-01-01"), ("2017-01-01", "2018-01-01")])
+def test_filter_keeps_result_order_and_drops_undated(index, labels, start, end):
+    # 구간이 결과보다 작은 경우(교집합)와 큰 경우(경계 비교) 모두 날짜 비교와 같은 결과
+    dates = pd.to_datetime(pd.Series(DATES).reindex(labels), errors='coerce')
+    expected = [label for label in labels if pd.Timestamp(start) <= dates[label] <= pd.Timestamp(end)] if labels else []
+    assert index.filter(labels, start, end) == expected
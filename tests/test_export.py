@@ -0,0 +1,64 @@
+"""export.export_bundle 테스트 (sampledata 기사 + 수동 좌표만 사용, 네트워크 없음)."""
+import json
+from pathlib import Path
+
+import pytest
+
+import export
+from article_store import ArticleStore
+from article_table import compact_articles, prepare_articles, unique_locations
+from geocoding import MANUAL_LOCATION_CACHE, country_of
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sampledata"
+
+
+@pytest.fixture(scope="module")
+def articles(tmp_path_factory):
+    store = ArticleStore(tmp_path_factory.mktemp("store") / "articles.sqlite")
+    store.sync(SAMPLE_DIR, workers=1)
+    return compact_articles(prepare_articles(store.load_dataframe(SAMPLE_DIR)))
+
+
+@pytest.fixture(scope="module")
+def coords(articles):
+    # 지역마다 국가의 수동 좌표를 사용
+    return {loc: MANUAL_LOCATION_CACHE[country_of(loc)] for loc in unique_locations(articles) if country_of(loc) in MANUAL_LOCATION_CACHE}
+
+
+def read_latest(out_dir):
+    latest = json.loads((out_dir / "latest.json").read_text(encoding="utf-8"))
+    return latest, json.loads((out_dir / latest['path']).read_text(encoding="utf-8"))
+
+
+def test_export_writes_bundle_and_skips_same_version(articles, coords, tmp_path):
+    manifest = export.export_bundle(articles, coords, tmp_path, queries=["페루"])
+    latest, on_disk = read_latest(tmp_path)
+    assert latest['version'] == manifest['version'] == on_disk['version']
+    bundle = tmp_path / latest['bundle']
+    collection = json.loads((bundle / "articles.geojson").read_text(encoding="utf-8"))
+    assert len(collection['features']) == manifest['locations'] > 0
+    assert (bundle / manifest['queries']["페루"]['path']).is_file()
+    assert set(manifest['sizes']) >= {"articles.geojson", *manifest['categories'].values()}
+
+    again = export.export_bundle(articles, coords, tmp_path, queries=["페루"])
+    assert again['created'] == manifest['created']
+
+
+def test_forced_rebuild_switches_latest_before_removing_old_bundle(articles, coords, tmp_path, monkeypatch):
+    first = export.export_bundle(articles, coords, tmp_path, queries=["페루"])
+    old_dir = tmp_path / first['bundle']
+
+    # 새 묶음을 옮겨 놓는 순간에도 latest.json이 가리키는 묶음은 온전해야 함
+    real_replace = export.os.replace
+    def checked_replace(src, dst):
+        latest, _ = read_latest(tmp_path)
+        assert (tmp_path / latest['bundle'] / "articles.geojson").is_file()
+        real_replace(src, dst)
+    monkeypatch.setattr(export.os, "replace", checked_replace)
+
+    second = export.export_bundle(articles, coords, tmp_path, queries=["페루"], force=True)
+    latest, _ = read_latest(tmp_path)
+    assert second['version'] == first['version'] and second['bundle'] != first['bundle']
+    assert latest['bundle'] == second['bundle'] and (tmp_path / second['bundle'] / "manifest.json").is_file()
+    assert not old_dir.exists()
+    assert export.bundle_dirs(tmp_path, first['version']) == [tmp_path / second['bundle']]
@@ -0,0 +1,101 @@
+"""좌표 변환 단계(geocoding.RESOLVE_STAGES)와 동기/비동기 변환기 테스트 (가짜 제공자 사용)."""
+import threading
+import time
+
+import pytest
+
+from geo_resolver import AsyncResolver
+from geocoding import Gazetteer, GeocodeStore, resolve_location
+
+# 검색어 -> 좌표. 없는 검색어는 '찾지 못함'(None), 'boom'이 들어간 검색어는 예외
+NOMINATIM = {"페루, 쿠스코": (-13.5, -72.0), "가상국": (1.0, 2.0)}
+OPENAI = {"칠레, 어딘가 & 다른 곳": (-33.0, -70.0)}
+BUDGET = (1000.0, 1000)
+
+
+class FakeProvider:
+    def __init__(self, answers):
+        self.answers = answers
+        self.queries = []
+
+    def __call__(self, query):
+        self.queries.append(query)
+        if "boom" in query: raise RuntimeError("provider down")
+        return self.answers.get(query)
+
+
+CASES = {
+    "페루, 쿠스코": (-13.5, -72.0, 'nominatim'),
+    "칠레, 어딘가 & 다른 곳": (-33.0, -70.0, 'openai'),        # Nominatim은 '&' 앞부분으로 조회해 실패 → OpenAI
+    "칠레, 모르는 곳": (-35.6751, -71.5430, 'country'),       # 국가명 수동 좌표
+    "가상국, boom": (1.0, 2.0, 'country'),                    # 제공자 예외 후 국가명을 Nominatim으로
+    "없는나라, 없는곳": (None, None, 'failed'),
+    "페루": (-9.1900, -75.0152, 'manual'),
+}
+
+
+def make_providers():
+    return FakeProvider(NOMINATIM), FakeProvider(OPENAI)
+
+
+@pytest.mark.parametrize("location_str, expected", CASES.items())
+def test_resolve_location_stage_order(location_str, expected):
+    nominatim, openai = make_providers()
+    assert resolve_location(location_str, nominatim=nominatim, openai=openai) == expected
+
+
+def test_async_resolver_matches_sync_chain(tmp_path):
+    nominatim, openai = make_providers()
+    gazetteer = Gazetteer(GeocodeStore(tmp_path / "geocode.sqlite"))
+    resolver = AsyncResolver(gazetteer, nominatim=nominatim, openai=openai, nominatim_budget=BUDGET, openai_budget=BUDGET)
+    assert resolver.resolve(list(CASES)) == CASES
+    # 성공/실패 모두 저장되어 다시 변환하지 않음
+    assert gazetteer.pending(CASES) == []
+    assert gazetteer.store.get("칠레, 어딘가 & 다른 곳")[:3] == CASES["칠레, 어딘가 & 다른 곳"]
+
+
+def test_resolve_async_reuses_batch_records_for_stored_locations(tmp_path, monkeypatch):
+    nominatim, openai = make_providers()
+    gazetteer = Gazetteer(GeocodeStore(tmp_path / "geocode.sqlite"))
+    resolver = AsyncResolver(gazetteer, nominatim=nominatim, openai=openai, nominatim_budget=BUDGET, openai_budget=BUDGET)
+    resolver.resolve(list(CASES))
+    calls = len(nominatim.queries) + len(openai.queries)
+
+    def no_single_lookups(*args): raise AssertionError("장소별 저장소 조회")
+    monkeypatch.setattr(gazetteer.store, "get", no_single_lookups)
+    monkeypatch.setattr(gazetteer, "lookup", no_single_lookups)
+    seen = []
+    assert resolver.resolve(list(CASES), on_result=lambda loc, *result: seen.append(loc)) == CASES
+    assert sorted(seen) == sorted(CASES)
+    assert len(nominatim.queries) + len(openai.queries) == calls
+
+
+def test_concurrent_resolve_calls_share_one_provider_budget(tmp_path):
+    # 두 스레드가 동시에 resolve해도 제공자 호출 빈도는 해석기 하나의 nominatim_budget 안에 머묾
+    rate, capacity = 20.0, 2
+    answers = {f"페루, 마을{i}": (-13.0, -72.0 - i) for i in range(24)}
+    call_times = []
+    lock = threading.Lock()
+
+    def nominatim(query):
+        with lock: call_times.append(time.monotonic())
+        return answers.get(query)
+
+    gazetteer = Gazetteer(GeocodeStore(tmp_path / "geocode.sqlite"))
+    resolver = AsyncResolver(gazetteer, nominatim=nominatim, nominatim_budget=(rate, capacity))
+    locations = list(answers)
+    results = [None, None]
+
+    def resolve(i):
+        results[i] = resolver.resolve(locations[i::2])
+    threads = [threading.Thread(target=resolve, args=(i,)) for i in range(2)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert results[0] | results[1] == {loc: (*coords, 'nominatim') for loc, coords in answers.items()}
+    call_times.sort()
+    assert len(call_times) == len(answers)
+    # 어느 구간이든 호출 수 <= capacity + rate * 구간 길이 (약간의 타이머 오차 허용)
+    for i in range(len(call_times)):
+        for j in range(i + 1, len(call_times)):
+            assert j - i + 1 <= capacity + rate * (call_times[j] - call_times[i]) + 0.5
@@ -0,0 +1,65 @@
+"""metrics 테스트: 히스토그램 구간, 카운터 라벨, timer의 실패 집계, Prometheus 텍스트 파일 출력."""
+import pytest
+
+from metrics import Histogram, MetricsRegistry
+
+BUCKETS = (0.1, 1.0, 10.0)
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(buckets=BUCKETS)
+
+
+def test_histogram_buckets_are_upper_inclusive():
+    histogram = Histogram(BUCKETS)
+    for value in (0.05, 0.1, 0.5, 1.0, 3.0, 60.0): histogram.observe(value)
+    assert histogram.counts == [2, 2, 1, 1]  # 마지막 칸은 +Inf
+    assert histogram.count == 6 and histogram.sum == pytest.approx(64.65)
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) is None  # +Inf 구간
+    assert Histogram(BUCKETS).quantile(0.5) is None
+
+
+def test_counters_are_kept_per_label_set(registry):
+    registry.increment('cache_requests', cache='query', result='hit')
+    registry.increment('cache_requests', 3, result='hit', cache='query')  # 라벨 순서는 상관없음
+    registry.increment('cache_requests', cache='query', result='miss')
+    registry.increment('geocode_results', method='nominatim')
+    assert registry.counter_values('cache_requests') == {
+        (('cache', 'query'), ('result', 'hit')): 4,
+        (('cache', 'query'), ('result', 'miss')): 1,
+    }
+
+
+def test_timer_records_time_and_failures(registry):
+    with registry.timer('stage', stage='search'): pass
+    with pytest.raises(ValueError):
+        with registry.timer('stage', stage='search'): raise ValueError("boom")
+    registry.increment('stage_failures', stage='geocode')  # 시간 없이 실패만 있는 라벨
+    rows = {row['stage']: row for row in registry.histogram_rows('stage')}
+    assert rows['search']['count'] == 2 and rows['search']['failures'] == 1
+    assert rows['search']['p50'] == 0.1
+    assert rows['geocode'] == {'stage': 'geocode', 'count': 0, 'mean': None, 'p50': None, 'p95': None, 'failures': 1}
+
+
+def test_textfile_output_is_prometheus_text(registry, tmp_path):
+    registry.increment('cache_requests', cache='q"1', result='hit')
+    for seconds in (0.05, 0.5, 20.0): registry.observe('stage', seconds, stage='search')
+    path = tmp_path / "metrics" / "newsmap.prom"
+    registry.write_textfile(path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert list(tmp_path.joinpath("metrics").iterdir()) == [path]  # 임시 파일은 남지 않음
+    assert "# TYPE newsmap_cache_requests_total counter" in lines
+    assert 'newsmap_cache_requests_total{cache="q\\"1",result="hit"} 1' in lines
+    assert "# TYPE newsmap_stage_seconds histogram" in lines
+    # 구간 값은 누적
+    assert [line for line in lines if line.startswith("newsmap_stage_seconds_bucket")] == [
+        'newsmap_stage_seconds_bucket{stage="search",le="0.1"} 1',
+        'newsmap_stage_seconds_bucket{stage="search",le="1.0"} 2',
+        'newsmap_stage_seconds_bucket{stage="search",le="10.0"} 2',
+        'newsmap_stage_seconds_bucket{stage="search",le="+Inf"} 3',
+    ]
+    assert 'newsmap_stage_seconds_sum{stage="search"} 20.550000' in lines
+    assert 'newsmap_stage_seconds_count{stage="search"} 3' in lines
+    assert lines[-1].startswith("newsmap_process_start_time_seconds ")
@@ -0,0 +1,51 @@
+"""pdf_parser 골든 출력 회귀 테스트.
+
+golden/sampledata_articles.json은 sampledata/*.pdf 각각에 대해 원래(정규식 여러 번 검색) 파서가 낸 결과다.
+전체 텍스트 파싱(parse_pdf_text)과 페이지 단위 조기 종료 파싱(parse_pdf_pages) 모두 같은 dict를 내야 한다.
+파서 출력을 의도적으로 바꿨다면 확인 후 다시 만든다: python tests/test_pdf_parser.py --update
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from pdf_parser import extract_pdf_text, parse_pdf_pages, parse_pdf_text
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_DIR = ROOT / "sampledata"
+GOLDEN_PATH = Path(__file__).resolve().parent / "golden" / "sampledata_articles.json"
+GOLDEN = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+SAMPLE_PDFS = sorted(SAMPLE_DIR.glob("*.pdf"))
+
+
+def test_golden_covers_every_sample():
+    assert sorted(GOLDEN) == [p.name for p in SAMPLE_PDFS]
+
+
+@pytest.mark.parametrize("pdf_path", SAMPLE_PDFS, ids=lambda p: p.name)
+def test_parse_pdf_text_matches_golden(pdf_path):
+    assert parse_pdf_text(extract_pdf_text(pdf_path)) == GOLDEN[pdf_path.name]
+
+
+@pytest.mark.parametrize("pdf_path", SAMPLE_PDFS, ids=lambda p: p.name)
+def test_parse_pdf_pages_matches_golden(pdf_path):
+    data, pages_read, _ = parse_pdf_pages(pdf_path)
+    assert data == GOLDEN[pdf_path.name]
+    assert pages_read >= 1
+
+
+def test_partial_text_is_not_settled_early():
+    # 표 중간(위치 행 앞)에서 잘린 텍스트는 확정하지 않음 (뒤 페이지에 값이 더 있을 수 있음)
+    text = extract_pdf_text(SAMPLE_PDFS[0])
+    assert parse_pdf_text(text[:text.index("\n위치\n")], partial=True) is None
+
+
+def update_golden():
+    golden = {p.name: parse_pdf_text(extract_pdf_text(p)) for p in SAMPLE_PDFS}
+    GOLDEN_PATH.write_text(json.dumps(golden, ensure_ascii=False, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"{GOLDEN_PATH} 갱신 ({len(golden)}개)")
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv: update_golden()
@@ -0,0 +1,94 @@
+"""query_cache 테스트: 검색어 정규화, 결과 크기 추정, LRU(항목 수/메모리 한도)와 TTL 만료."""
+import pandas as pd
+import pytest
+
+import query_cache
+from query_cache import MAP_BYTES_PER_MARKER, QueryResultCache, TTLCache, estimate_result_bytes, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_normalize_query_keeps_or_operator():
+    assert normalize_query("  Peru   OR  리마 ") == "peru OR 리마"
+    assert normalize_query("peru or lima") == "peru or lima"
+
+
+def test_estimate_result_bytes_counts_frames_and_markers():
+    filtered_df = pd.DataFrame({'기사제목': ["가", "나", "다"]})
+    map_data = pd.DataFrame({'lat': [1.0, 2.0], 'lon': [3.0, 4.0]})
+    frames = int(filtered_df.memory_usage(deep=True).sum()) + int(map_data.memory_usage(deep=True).sum())
+    assert estimate_result_bytes(filtered_df, None) == int(filtered_df.memory_usage(deep=True).sum())
+    assert estimate_result_bytes(filtered_df, map_data, 'clustered') == frames + 2 * MAP_BYTES_PER_MARKER['clustered']
+    # 모르는 지도 방식은 더 큰 상세 지도 추정치 사용
+    assert estimate_result_bytes(filtered_df, map_data) == frames + 2 * MAP_BYTES_PER_MARKER['detailed']
+
+
+def test_byte_limit_evicts_least_recently_used_first():
+    cache = QueryResultCache(max_entries=10, max_bytes=100)
+    for key in "abc": cache.put(key, key.upper(), 30)
+    assert cache.get("a") == "A"  # a가 가장 최근 사용으로
+    cache.put("d", "D", 30)        # 120 > 100 → 가장 오래 쓰지 않은 b부터 버림
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    cache.put("e", "E", 70)        # c, a 순서로 더 버려야 한도 안
+    assert [cache.get(key) for key in "acde"] == [None, None, "D", "E"]
+    assert cache.stats()['bytes'] == 100 and cache.stats()['entries'] == 2
+
+
+def test_entry_limit_evicts_oldest():
+    cache = QueryResultCache(max_entries=2, max_bytes=1000)
+    for key in "abc": cache.put(key, key, 1)
+    assert [cache.get(key) for key in "abc"] == [None, "b", "c"]
+
+
+def test_replacing_a_key_updates_value_and_size():
+    cache = QueryResultCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 30)
+    cache.put("a", 3, 10)  # 이전 크기를 빼고 다시 셈 (b를 버리지 않음)
+    assert cache.stats()['bytes'] == 40 and cache.stats()['entries'] == 2
+    assert cache.get("a") == 3 and cache.get("b") == 2
+    cache.put("a", 4, 500)  # 한도보다 큰 결과는 저장하지 않고 이전 값도 남기지 않음
+    assert cache.get("a") is None
+    assert cache.stats()['bytes'] == 30
+
+
+def test_hit_and_miss_counts():
+    cache = QueryResultCache()
+    cache.get("a"); cache.put("a", 1, 1); cache.get("a"); cache.get("a")
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (2, 1)
+
+
+def test_ttl_entries_expire(clock):
+    cache = TTLCache(ttl_seconds=10)
+    cache.put("a", 1)
+    clock.now += 10
+    assert cache.get("a") == 1  # 만료 시각까지는 유효
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert cache.get("a", "기본값") == "기본값"
+
+
+def test_ttl_put_refreshes_expiry_and_order(clock):
+    cache = TTLCache(ttl_seconds=10, max_entries=2)
+    cache.put("a", 1)
+    clock.now += 5
+    cache.put("b", 2)
+    cache.put("a", 3)  # 다시 넣으면 만료 시각과 순서가 새로 정해짐
+    cache.put("c", 4)  # 가득 차면 가장 오래된 b를 버림
+    assert cache.get("b") is None
+    clock.now += 9
+    assert (cache.get("a"), cache.get("c")) == (3, 4)
@@ -0,0 +1,70 @@
+"""search_index.SearchIndex 테스트 (sampledata 기사 표 사용)."""
+import random
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from article_store import ArticleStore
+from article_table import compact_articles, prepare_articles, searchable_articles
+from search_index import SearchIndex
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sampledata"
+
+QUERIES = ["페루", "시위 OR 칠레", "리마", "정", '"도미니카 공화국"', "국내 정치", "브라질 경제", "zzz"]
+
+
+@pytest.fixture(scope="module")
+def articles(tmp_path_factory):
+    store = ArticleStore(tmp_path_factory.mktemp("store") / "articles.sqlite")
+    store.sync(SAMPLE_DIR, workers=1)
+    return searchable_articles(compact_articles(prepare_articles(store.load_dataframe(SAMPLE_DIR))))
+
+
+def test_search_matches_substring_scan(articles):
+    index = SearchIndex(articles)
+    titles = articles['기사제목'].astype(str).str.lower()
+    expected = set(articles.index[titles.str.contains("페루", regex=False)])
+    assert expected and expected <= set(index.search("페루", fields=['기사제목']))
+
+
+def test_updated_matches_full_rebuild(articles):
+    rng = random.Random(0)
+    index, current = SearchIndex(articles), articles
+    for step in range(20):
+        removed = rng.sample(list(current.index), 3)
+        added = articles.loc[rng.sample(list(articles.index), 4)].copy()
+        added['기사제목'] = added['기사제목'].astype(str) + f" 변경{step}"
+        current = pd.concat([current.drop(index=[label for label in {*removed, *added.index} if label in current.index]), added])
+        index = index.updated(removed_labels=removed, added=added)
+        if step % 7 == 6: index = index.merged()
+        rebuilt = SearchIndex(current)
+        assert len(index) == len(current)
+        for query in [*QUERIES, f"변경{step}"]:
+            assert sorted(index.search(query)) == sorted(rebuilt.search(query)), (step, query)
+
+
+def test_updated_shares_base_and_leaves_old_index_unchanged(articles):
+    index = SearchIndex(articles)
+    before = index.search("페루")
+    label = before[0]
+    new = index.updated(removed_labels=[label])
+    assert new.base is index.base and new.dead == 1
+    assert label not in new.search("페루")
+    assert index.search("페루") == before
+
+
+def test_placeholder_defaults_are_not_indexed(articles):
+    df = pd.DataFrame({
+        '기사제목': ["페루 시위", "칠레 정보 공개"],
+        '대분류': ["정보 없음", "국내(정치)"],
+        '요약': ["요약 정보 없음", "칠레 정부가 정보를 공개했다."],
+    }, index=['a', 'b'])
+    index = SearchIndex(df)
+    assert index.search("요약") == []
+    assert index.search("없음") == []
+    assert index.search("정보") == ['b']
+
+    no_summary = set(articles.index[articles['요약'].astype(str) == "요약 정보 없음"])
+    assert no_summary
+    assert not no_summary & set(SearchIndex(articles).search("요약 OR 없음"))
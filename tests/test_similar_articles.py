@@ -0,0 +1,217 @@
+"""similar_articles.SimilarArticleFinder 테스트.
+
+Serper는 로컬 http.server 스텁으로, OpenAI는 chat.completions.create만 흉내 내는 가짜 클라이언트로 대신한다.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from similar_articles import SimilarArticleFinder, korean_query
+
+
+class SerperStub:
+    """POST 본문의 q마다 검색 결과를 돌려주는 로컬 Serper 스텁. 받은 요청을 (시각, q, API 키)로 기록"""
+
+    def __init__(self, delay_seconds=0.0, status=200):
+        self.delay_seconds = delay_seconds
+        self.status = status
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock: stub.requests.append((time.perf_counter(), body['q'], self.headers.get('X-API-KEY')))
+                time.sleep(stub.delay_seconds)
+                organic = [{'title': f"{body['q']} {i}", 'link': f"https://example.com/{i}", 'snippet': f"snippet {i}"} for i in range(7)]
+                payload = json.dumps({'organic': organic} if stub.status == 200 else {'message': 'error'}).encode()
+                self.send_response(stub.status)
+                self.send_header('Content-Type', 'application/json'); self.send_header('Content-Length', str(len(payload)))
+                self.end_headers(); self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown(); self.server.server_close()
+
+
+class FakeOpenAI:
+    """client.chat.completions.create 대역. 번역은 '<원문>-es'를 쉼표로 이어 반환하고,
+    요약(stream=True)은 summary_chunks를 chunk_delay_seconds 간격으로 내보낸다. 호출은 (종류, 시작, 끝)으로 기록"""
+
+    def __init__(self, translate_delay_seconds=0.0, fail_translations=0, summary_chunks=("추천 ", "기사 ", "요약"), chunk_delay_seconds=0.0):
+        self.translate_delay_seconds = translate_delay_seconds
+        self.fail_translations = fail_translations
+        self.summary_chunks = summary_chunks
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.calls = []
+        self.chunks_sent = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def count(self, kind):
+        with self._lock: return sum(1 for call in self.calls if call[0] == kind)
+
+    def create(self, model, messages, temperature=None, stream=False):
+        if stream: return self._stream()
+        started = time.perf_counter()
+        time.sleep(self.translate_delay_seconds)
+        with self._lock:
+            self.calls.append(('translate', started, time.perf_counter()))
+            if self.fail_translations:
+                self.fail_translations -= 1
+                raise RuntimeError("mock translation failure")
+        terms = messages[-1]['content'].split(": ", 1)[1].split(", ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=", ".join(f"{t}-es" for t in terms)))])
+
+    def _stream(self):
+        with self._lock: self.calls.append(('summary', time.perf_counter(), None))
+        for text in self.summary_chunks:
+            time.sleep(self.chunk_delay_seconds)
+            with self._lock: self.chunks_sent += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+@pytest.fixture
+def serper():
+    stub = SerperStub()
+    yield stub
+    stub.close()
+
+
+def make_finder(serper, client, **kwargs):
+    return SimilarArticleFinder(client, "test-key", serper_url=serper.url, **kwargs)
+
+
+def test_find_returns_both_sections(serper):
+    client = FakeOpenAI()
+    sections = make_finder(serper, client).find("칠레", ["시위", "개혁"])
+    assert sections['KO']['query'] == korean_query("칠레")
+    assert "칠레-es" in sections['ES']['query'] and "시위-es" in sections['ES']['query']
+    for section in sections.values():
+        assert len(section['results']) == 5  # SEARCH_RESULT_LIMIT
+        assert section['summary'] == "추천 기사 요약"
+        assert section['search_error'] is None and section['summary_error'] is None
+    assert {key for _, _, key in serper.requests} == {"test-key"}
+
+
+def test_repeat_find_is_served_from_cache(serper):
+    client = FakeOpenAI()
+    finder = make_finder(serper, client)
+    first = finder.find("칠레", ["시위"])
+    calls = (len(serper.requests), client.count('translate'), client.count('summary'))
+    second = finder.find("칠레", ["시위"])
+    assert (len(serper.requests), client.count('translate'), client.count('summary')) == calls
+    assert {k: s['summary'] for k, s in second.items()} == {k: s['summary'] for k, s in first.items()}
+    assert {k: s['results'] for k, s in second.items()} == {k: s['results'] for k, s in first.items()}
+
+
+def test_cache_entries_expire_after_ttl(serper):
+    client = FakeOpenAI()
+    finder = make_finder(serper, client, ttl_seconds=0.2)
+    finder.find("칠레", ["시위"])
+    calls = (len(serper.requests), client.count('translate'), client.count('summary'))
+    time.sleep(0.3)
+    finder.find("칠레", ["시위"])
+    assert (len(serper.requests), client.count('translate'), client.count('summary')) == tuple(2 * n for n in calls)
+
+
+def test_translation_and_search_run_concurrently(serper):
+    # 번역 두 개는 서로 겹쳐 실행되고, 한국어 검색은 번역을 기다리지 않는다
+    client = FakeOpenAI(translate_delay_seconds=0.3)
+    started = time.perf_counter()
+    make_finder(serper, client).find("칠레", ["시위"])
+    elapsed = time.perf_counter() - started
+    (_, start_a, end_a), (_, start_b, end_b) = [call for call in client.calls if call[0] == 'translate']
+    assert start_a < end_b and start_b < end_a
+    ko_requested = next(t for t, q, _ in serper.requests if q == korean_query("칠레"))
+    assert ko_requested < min(end_a, end_b)
+    assert elapsed < 0.55  # 순차 실행이면 번역만 0.6초
+
+
+def test_failed_translation_falls_back_and_is_not_cached(serper):
+    client = FakeOpenAI(fail_translations=1)
+    finder = make_finder(serper, client)
+    assert finder.translate_to_es(["칠레", "시위"]) == ["칠레", "시위"]
+    assert finder.translate_to_es(["칠레", "시위"]) == ["칠레-es", "시위-es"]
+    assert finder.translate_to_es(["칠레", "시위"]) == ["칠레-es", "시위-es"]
+    assert client.count('translate') == 2
+
+
+def test_serper_http_error_is_raised_and_not_cached():
+    stub = SerperStub(status=500)
+    try:
+        client = FakeOpenAI()
+        finder = make_finder(stub, client)
+        with pytest.raises(requests.exceptions.HTTPError):
+            finder.google_search("칠레")
+        sections = finder.find("칠레", ["시위"])
+        for section in sections.values():
+            assert isinstance(section['search_error'], requests.exceptions.HTTPError)
+            assert section['results'] is None and section['summary'] is None
+        assert client.count('summary') == 0
+        requests_before = len(stub.requests)
+        stub.status = 200
+        assert len(finder.google_search("칠레")) == 5
+        assert len(stub.requests) == requests_before + 1
+    finally:
+        stub.close()
+
+
+def test_stream_first_content_under_a_second_and_languages_interleave():
+    # 로컬 가짜 모델이 조각을 50ms 간격으로 보낼 때 첫 조각은 1초 안에, 두 언어 조각은 섞여서 도착
+    stub = SerperStub(delay_seconds=0.05)
+    try:
+        client = FakeOpenAI(translate_delay_seconds=0.1, summary_chunks=[f"조각{i} " for i in range(10)], chunk_delay_seconds=0.05)
+        started = time.perf_counter()
+        first_token_seconds = None
+        tokens = []
+        for lang_label, kind, value in make_finder(stub, client).stream("칠레", ["시위"]):
+            if kind == 'token':
+                if first_token_seconds is None: first_token_seconds = time.perf_counter() - started
+                tokens.append(lang_label)
+        assert first_token_seconds < 1.0
+        assert tokens.count('KO') == tokens.count('ES') == 10
+        # 한 언어가 끝나기 전에 다른 언어 조각이 나옴
+        assert tokens.index('ES') < len(tokens) - 1 - tokens[::-1].index('KO')
+        assert tokens.index('KO') < len(tokens) - 1 - tokens[::-1].index('ES')
+    finally:
+        stub.close()
+
+
+def test_find_reports_first_content_seconds(serper):
+    client = FakeOpenAI(summary_chunks=["a", "b"], chunk_delay_seconds=0.05)
+    sections = make_finder(serper, client).find("칠레", ["시위"])
+    for section in sections.values():
+        assert 0 < section['first_content_seconds'] < 1.0
+        assert section['summary'] == "ab"
+
+
+def test_closing_stream_early_returns_promptly_and_stops_workers(serper):
+    # 첫 조각을 받고 닫으면(Streamlit 재실행, 오류 후 break) 남은 요약을 기다리지 않고 돌아오고 작업 스레드도 멈춤
+    client = FakeOpenAI(summary_chunks=[f"조각{i} " for i in range(12)], chunk_delay_seconds=0.1)
+    finder = make_finder(serper, client)
+    events = finder.stream("칠레", ["시위"])
+    next(event for event in events if event[1] == 'token')
+    started = time.perf_counter()
+    events.close()
+    assert time.perf_counter() - started < 0.2  # 끝까지 받으면 언어마다 1.2초
+    time.sleep(0.3)
+    sent = client.chunks_sent
+    time.sleep(0.3)
+    assert client.chunks_sent == sent < 8
+    # 끝까지 받지 않은 요약은 캐시하지 않음
+    assert finder.find("칠레", ["시위"])['KO']['summary'] == "".join(client.summary_chunks)
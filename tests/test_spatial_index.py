@@ -0,0 +1,78 @@
+"""spatial_index 테스트: 격자 색인 질의를 임의의 점에 대한 전체 비교(사각 범위/haversine)와 맞춰 본다."""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_index import SCAN_FRACTION, SpatialIndex, haversine_km, lon_ranges
+
+# 기본 색인(SCAN_FRACTION 전환), 항상 전체 비교, 항상 격자 후보만
+SCAN_FRACTIONS = [SCAN_FRACTION, 0.0, math.inf]
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(0)
+    # 전 세계 + 날짜변경선/극 근처에 몰린 점, 같은 좌표에 여러 기사
+    lats = np.concatenate([rng.uniform(-90, 90, 3000), rng.uniform(-20, 20, 500), rng.uniform(85, 90, 200), np.full(20, 10.0)])
+    lons = np.concatenate([rng.uniform(-180, 180, 3000), rng.uniform(175, 180, 250), rng.uniform(-180, -175, 250),
+                           rng.uniform(-180, 180, 200), np.full(20, 180.0)])
+    return pd.DataFrame({'latitude': lats, 'longitude': lons})
+
+
+def brute_bbox(points, south, west, north, east):
+    lats, lons = points['latitude'].to_numpy(), points['longitude'].to_numpy()
+    south, north = min(south, north), max(south, north)
+    inside = np.zeros(len(points), dtype=bool)
+    for lo, hi in lon_ranges(west, east): inside |= (lons >= lo) & (lons <= hi)
+    return np.flatnonzero(inside & (lats >= south) & (lats <= north))
+
+
+@pytest.mark.parametrize("west, east, expected", [
+    (-10, 20, [(-10, 20)]),
+    (170, 190, [(170, 180), (-180, -170)]),     # Leaflet이 ±180 밖 경도를 줌
+    (170, -170, [(170, 180), (-180, -170)]),    # 서쪽 경계가 동쪽보다 큼
+    (-200, -170, [(160, 180), (-180, -170)]),
+    (-190, 190, [(-180, 180)]),                  # 한 바퀴 이상
+    (190, 200, [(-170, -160)]),
+])
+def test_lon_ranges_wraps_antimeridian(west, east, expected):
+    assert lon_ranges(west, east) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("scan_fraction", SCAN_FRACTIONS)
+def test_bbox_matches_brute_force(points, scan_fraction):
+    index = SpatialIndex(points, scan_fraction=scan_fraction)
+    rng = np.random.default_rng(1)
+    boxes = [(-30, 170, 30, 190), (-30, 170, 30, -170), (80, -180, 90, 180), (9, 179, 11, 181), (-90, -180, 90, 180)]
+    for _ in range(200):
+        lat, lon, span = rng.uniform(-90, 90), rng.uniform(-200, 200), rng.choice([0.5, 5, 30, 120])
+        boxes.append((lat - span / 2, lon - span, lat + span / 2, lon + span))
+    for box in boxes:
+        positions = index.bbox_positions(*box)
+        np.testing.assert_array_equal(positions, brute_bbox(points, *box), err_msg=str(box))
+    assert index.bbox(*boxes[0]).equals(points.iloc[brute_bbox(points, *boxes[0])])
+
+
+@pytest.mark.parametrize("scan_fraction", SCAN_FRACTIONS)
+def test_radius_matches_haversine(points, scan_fraction):
+    index = SpatialIndex(points, scan_fraction=scan_fraction)
+    lats, lons = points['latitude'].to_numpy(), points['longitude'].to_numpy()
+    rng = np.random.default_rng(2)
+    centers = [(0.0, 179.9, 500), (0.0, -179.9, 500), (89.0, 0.0, 300), (-88.0, 45.0, 800), (10.0, 180.0, 1)]
+    centers += [(rng.uniform(-90, 90), rng.uniform(-180, 180), rng.choice([50, 500, 3000])) for _ in range(100)]
+    for lat, lon, km in centers:
+        found = index.radius(lat, lon, km)
+        distances = haversine_km(lat, lon, lats, lons)
+        expected = np.flatnonzero(distances <= km)
+        assert sorted(found.index) == sorted(points.index[expected]), (lat, lon, km)
+        assert np.all(np.diff(found['distance_km'].to_numpy()) >= 0)  # 가까운 순
+        np.testing.assert_allclose(found['distance_km'].to_numpy(), distances[points.index.get_indexer(found.index)])
+
+
+def test_empty_index():
+    index = SpatialIndex(pd.DataFrame({'latitude': [], 'longitude': []}))
+    assert len(index) == 0
+    assert len(index.bbox_positions(-10, -10, 10, 10)) == 0
+    assert index.radius(0, 0, 100).empty